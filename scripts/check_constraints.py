@@ -5,6 +5,7 @@ Check parsed constraints against market prices to find arbitrage opportunities.
 
 import argparse
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timezone
 from typing import Dict, List, Optional
@@ -16,6 +17,11 @@ except ImportError:
     print("pip install polars")
     sys.exit(1)
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
 
 def load_parsed_propositions(data_dir: Path) -> tuple[List[dict], List[dict]]:
     """Load all LLM-parsed propositions and constraints."""
@@ -24,10 +30,12 @@ def load_parsed_propositions(data_dir: Path) -> tuple[List[dict], List[dict]]:
     all_props = []
     all_constraints = []
     
-    for f in parsed_dir.glob("*.json"):
-        data = json.loads(f.read_text())
-        all_props.extend(data.get("propositions", []))
-        all_constraints.extend(data.get("constraints", []))
+    # Overlap the many small reads; results come back in glob order
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        parsed = pool.map(lambda f: json_loads(f.read_bytes()), parsed_dir.glob("*.json"))
+        for data in parsed:
+            all_props.extend(data.get("propositions", []))
+            all_constraints.extend(data.get("constraints", []))
     
     return all_props, all_constraints
 
@@ -36,75 +44,116 @@ def load_prices(data_dir: Path, venue: str, date: str) -> Dict[str, float]:
     """Load latest prices from snapshots."""
     snap_dir = data_dir / "orderbook_snapshots" / f"venue={venue}" / f"date={date}"
     
-    prices = {}
-    if not snap_dir.exists():
-        return prices
-    
-    for pq in snap_dir.glob("**/*.parquet"):
-        try:
-            df = pl.read_parquet(pq)
-            for row in df.iter_rows(named=True):
-                mid = row.get("mid")
-                if mid is not None:
-                    prices[row["market_id"]] = mid
-        except:
-            pass
-    
-    return prices
-
-
-def check_time_ladder(constraint: dict, prices: Dict[str, float]) -> Optional[dict]:
-    """Check if a time ladder constraint is violated."""
-    market_ids = constraint.get("market_ids", [])
-    
-    # Get prices for all markets in ladder
-    ladder_prices = []
-    for mid in market_ids:
-        if mid in prices:
-            ladder_prices.append((mid, prices[mid]))
-    
-    if len(ladder_prices) < 2:
-        return None
-    
-    # Check monotonicity (prices should be non-decreasing for time ladders)
-    violations = []
-    for i in range(len(ladder_prices) - 1):
-        if ladder_prices[i][1] > ladder_prices[i+1][1] + 0.01:  # 1% tolerance
-            violations.append({
-                "earlier_market": ladder_prices[i][0],
-                "earlier_price": ladder_prices[i][1],
-                "later_market": ladder_prices[i+1][0],
-                "later_price": ladder_prices[i+1][1],
-                "violation_magnitude": ladder_prices[i][1] - ladder_prices[i+1][1],
-            })
-    
-    if violations:
-        return {
-            "constraint_type": "time_ladder",
-            "group": constraint.get("group"),
-            "relation": constraint.get("relation"),
-            "violations": violations,
-        }
-    return None
-
-
-def check_exhaustive_partition(constraint: dict, prices: Dict[str, float]) -> Optional[dict]:
-    """Check if bucket probabilities sum to ~1."""
-    market_ids = constraint.get("market_ids", [])
-    
-    total = 0.0
-    found = 0
-    for mid in market_ids:
-        if mid in prices:
-            total += prices[mid]
-            found += 1
-    
-    if found < len(market_ids) * 0.8:  # Need at least 80% of markets
-        return None
-    
-    # Should sum to ~1 (within 5%)
-    if abs(total - 1.0) > 0.05:
-        return {
+    if not snap_dir.exists() or next(snap_dir.glob("**/*.parquet"), None) is None:
+        return {}
+    
+    latest = (
+        pl.scan_parquet(str(snap_dir / "**" / "*.parquet"))
+        .select(["market_id", "mid", "ts_recv"])
+        .drop_nulls("mid")
+        .group_by("market_id")
+        .agg(pl.col("mid").sort_by("ts_recv").last())
+        .collect(engine="streaming")
+    )
+    return dict(zip(latest["market_id"].to_list(), latest["mid"].to_list()))
+
+
+def explode_constraint_prices(constraints: List[dict], prices: Dict[str, float]) -> pl.DataFrame:
+    """One row per (constraint index, market) in list order, with the market's price (null if unpriced)."""
+    market_ids = [c.get("market_ids", []) for c in constraints]
+    return (
+        pl.DataFrame(
+            {"cidx": list(range(len(constraints))), "market_id": market_ids},
+            schema={"cidx": pl.UInt32, "market_id": pl.List(pl.Utf8)},
+        )
+        .explode("market_id")
+        .with_columns(
+            pl.col("market_id")
+            .replace_strict(prices, default=None, return_dtype=pl.Float64)
+            .alias("price")
+        )
+    )
+
+
+def check_time_ladders(constraints: List[dict], prices: Dict[str, float]) -> Dict[int, dict]:
+    """Check time ladder constraints; returns {constraint index: violation}."""
+    if not constraints:
+        return {}
+    
+    # Compare each priced market with the next priced market in the same ladder;
+    # prices should be non-decreasing (1% tolerance)
+    pairs = (
+        explode_constraint_prices(constraints, prices)
+        .drop_nulls("price")
+        .with_columns(
+            pl.col("market_id").shift(-1).over("cidx").alias("later_market"),
+            pl.col("price").shift(-1).over("cidx").alias("later_price"),
+        )
+        .filter(
+            pl.col("later_price").is_not_null()
+            & pl.col("price").is_not_nan()
+            & pl.col("later_price").is_not_nan()
+            & (pl.col("price") > pl.col("later_price") + 0.01)
+        )
+    )
+    
+    results: Dict[int, dict] = {}
+    for cidx, earlier_market, earlier_price, later_market, later_price in pairs.select(
+        ["cidx", "market_id", "price", "later_market", "later_price"]
+    ).iter_rows():
+        if cidx not in results:
+            constraint = constraints[cidx]
+            results[cidx] = {
+                "constraint_type": "time_ladder",
+                "group": constraint.get("group"),
+                "relation": constraint.get("relation"),
+                "violations": [],
+            }
+        results[cidx]["violations"].append({
+            "earlier_market": earlier_market,
+            "earlier_price": earlier_price,
+            "later_market": later_market,
+            "later_price": later_price,
+            "violation_magnitude": earlier_price - later_price,
+        })
+    return results
+
+
+def check_exhaustive_partitions(constraints: List[dict], prices: Dict[str, float]) -> Dict[int, dict]:
+    """Check that bucket probabilities sum to ~1; returns {constraint index: violation}."""
+    if not constraints:
+        return {}
+    
+    found = (
+        explode_constraint_prices(constraints, prices)
+        .group_by("cidx")
+        .agg(
+            pl.col("price").sum().alias("total"),
+            pl.col("price").count().alias("found"),
+        )
+    )
+    sums = (
+        pl.DataFrame(
+            {
+                "cidx": list(range(len(constraints))),
+                "n_markets": [len(c.get("market_ids", [])) for c in constraints],
+            },
+            schema={"cidx": pl.UInt32, "n_markets": pl.UInt32},
+        )
+        .join(found, on="cidx", how="left")
+        .with_columns(pl.col("total").fill_null(0.0), pl.col("found").fill_null(0))
+        # Need at least 80% of markets, and should sum to ~1 (within 5%)
+        .filter(
+            (pl.col("found") >= pl.col("n_markets") * 0.8)
+            & pl.col("total").is_not_nan()
+            & ((pl.col("total") - 1.0).abs() > 0.05)
+        )
+    )
+    
+    results: Dict[int, dict] = {}
+    for cidx, total in sums.select(["cidx", "total"]).iter_rows():
+        constraint = constraints[cidx]
+        results[cidx] = {
             "constraint_type": "exhaustive_partition",
             "group": constraint.get("group"),
             "relation": constraint.get("relation"),
@@ -113,7 +162,7 @@ def check_exhaustive_partition(constraint: dict, prices: Dict[str, float]) -> Op
             "violation_magnitude": abs(total - 1.0),
             "arbitrage_direction": "BUY_ALL" if total < 1.0 else "SELL_ALL",
         }
-    return None
+    return results
 
 
 def check_implied_threshold(constraint: dict, prices: Dict[str, float]) -> Optional[dict]:
@@ -161,19 +210,20 @@ def main():
     prices = load_prices(data_dir, args.venue, args.date)
     print(f"Loaded prices for {len(prices)} markets")
     
-    # Check each constraint
+    # Check each constraint; ladder and partition checks run batched per type
+    ladders = [(i, c) for i, c in enumerate(constraints) if c.get("constraint_type") == "time_ladder"]
+    partitions = [(i, c) for i, c in enumerate(constraints) if c.get("constraint_type") == "exhaustive_partition"]
+    found: Dict[int, dict] = {}
+    for group, check in ((ladders, check_time_ladders), (partitions, check_exhaustive_partitions)):
+        batch = check([c for _, c in group], prices)
+        found.update((group[j][0], v) for j, v in batch.items())
+    
     violations = []
-    for constraint in constraints:
-        ctype = constraint.get("constraint_type")
-        
-        if ctype == "time_ladder":
-            v = check_time_ladder(constraint, prices)
-        elif ctype == "exhaustive_partition":
-            v = check_exhaustive_partition(constraint, prices)
-        elif ctype == "implied_threshold":
+    for i, constraint in enumerate(constraints):
+        if constraint.get("constraint_type") == "implied_threshold":
             v = check_implied_threshold(constraint, prices)
         else:
-            v = None
+            v = found.get(i)
         
         if v:
             violations.append(v)
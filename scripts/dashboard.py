@@ -10,12 +10,15 @@ import json
 import time
 import signal
 import argparse
+import heapq
 import re
 import shutil
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional, Dict, List, Tuple
-from collections import defaultdict
+from typing import Optional, Dict, List, Set, Tuple
+from collections import OrderedDict, defaultdict
 
 try:
     import polars as pl
@@ -23,6 +26,28 @@ except ImportError:
     print("ERROR: polars not installed. Install with: pip install polars")
     sys.exit(1)
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+
+PAGE_SIZE = os.sysconf('SC_PAGESIZE') if hasattr(os, 'sysconf') else 4096
+# ANSI erase display + cursor home
+CLEAR_SCREEN = "\x1b[2J\x1b[H"
+
+# Snapshot columns read by the top-markets and market-detail queries
+TOP_COLS = ['market_id', 'outcome_id', 'spread', 'best_bid_sz', 'best_ask_sz', 'ts_recv']
+DETAIL_COLS = TOP_COLS + ['best_bid_px', 'best_ask_px', 'mid']
+
+# Collector log lines shown on the overview, as one alternation; the matching
+# group number (Match.lastindex) selects the field
+JOURNAL_MARKERS = re.compile(r'(WebSocket metrics:)|(WARM cursor start=)|(Scheduler for .*HOT.*WARM)')
+JOURNAL_FIELDS = {1: 'metrics', 2: 'cursor', 3: 'sizes'}
+
+# Formatted TOP MARKETS lines kept across frames (LRU)
+ROW_CACHE_SIZE = 4096
+
 
 class Dashboard:
     def __init__(self, venue: str = "polymarket", date: Optional[str] = None, refresh_interval: int = 5):
@@ -35,7 +60,38 @@ class Dashboard:
         self.markets = []
         self.market_stats = {}
         self.market_titles = {}  # market_id -> title mapping from all universe files
+        self._title_by_id: Dict[str, str] = {}  # market_id -> title for the current universe
+        self._universe_sig: Optional[Tuple[int, int]] = None
+        self._universe_cache: List[Dict] = []
+        self._stats_mtime: Optional[int] = None
+        self._stats_cache: Dict[str, Dict] = {}
+        self._collector_pid: Optional[str] = None
+        self._journal_primed = False
+        self._journal_latest: Dict[str, str] = {}
         self.data_dir = Path("data")
+        # Incremental snapshot index: file path -> (size, mtime, hour)
+        self._file_cache: Dict[str, Tuple[int, float, str]] = {}
+        self._hour_dir_mtime: Dict[str, int] = {}
+        self._hour_dirs: Set[str] = set()
+        self._total_size = 0
+        self._hour_counts: Dict[str, int] = {}
+        self._recent_files: Dict[str, float] = {}
+        # Running top-markets totals: (market_id, outcome_id) ->
+        # [updates, sum_spread, sum_bid_sz, sum_ask_sz, last_update], and the files folded in
+        self._agg_state: Dict[Tuple[str, str], List] = {}
+        self._agg_files: Set[str] = set()
+        self._old_tty = None  # saved termios settings while in cbreak mode
+        self._redraw = False
+        self._stdin_eof = False
+        self._frame_sig: Optional[int] = None
+        self._last_render_sig: Optional[Tuple[str, Optional[int]]] = None
+        # Tick data is loaded on a background thread while input is serviced;
+        # _io_lock guards the incremental caches it shares with the detail view
+        self._io_pool = ThreadPoolExecutor(max_workers=1)
+        self._io_lock = threading.Lock()
+        self._pending: Optional[Future] = None
+        self._tick: Optional[Dict] = None
+        self._row_cache: "OrderedDict[Tuple, str]" = OrderedDict()
         
         # Register signal handler for graceful exit
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -44,30 +100,46 @@ class Dashboard:
     def _signal_handler(self, signum, frame):
         """Handle Ctrl+C gracefully"""
         self.running = False
+        self._restore_tty()
         self.clear_screen()
         print("\nDashboard stopped.")
         sys.exit(0)
     
     def clear_screen(self):
         """Clear terminal screen"""
-        os.system('clear' if os.name != 'nt' else 'cls')
+        sys.stdout.write(CLEAR_SCREEN)
+        sys.stdout.flush()
     
     def load_universe(self) -> List[Dict]:
-        """Load market universe from JSONL file"""
+        """Load market universe from JSONL file (re-parsed only when the file changes)"""
         universe_file = self.data_dir / "metadata" / f"venue={self.venue}" / f"date={self.date}" / "universe.jsonl"
-        markets = []
-        
-        if universe_file.exists():
-            with open(universe_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line:
-                        try:
-                            market = json.loads(line)
-                            markets.append(market)
-                        except json.JSONDecodeError:
-                            continue
         
+        try:
+            st = universe_file.stat()
+        except OSError:
+            self._universe_sig = None
+            self._universe_cache = []
+            return []
+        
+        sig = (st.st_mtime_ns, st.st_size)
+        if sig == self._universe_sig:
+            return self._universe_cache
+        
+        try:
+            # Whole-file parse in Rust; the universe schema is regular
+            markets = pl.read_ndjson(universe_file, infer_schema_length=None).to_dicts()
+        except Exception:
+            # Malformed lines: fall back to per-line parsing, skipping bad records
+            markets = []
+            for line in universe_file.read_bytes().split(b'\n'):
+                if line.strip():
+                    try:
+                        markets.append(json_loads(line))
+                    except json.JSONDecodeError:
+                        continue
+        
+        self._universe_sig = sig
+        self._universe_cache = markets
         return markets
     
     def load_market_titles(self) -> Dict[str, str]:
@@ -103,83 +175,132 @@ class Dashboard:
         return titles
     
     def load_stats(self) -> Dict[str, Dict]:
-        """Load market statistics from stats cache"""
+        """Load market statistics from stats cache (re-read only when the file changes)"""
         stats_file = self.data_dir / "stats" / f"venue={self.venue}" / f"date={self.date}" / "stats.csv"
-        stats = {}
         
-        if stats_file.exists():
-            try:
-                df = pl.read_csv(stats_file)
-                for row in df.iter_rows(named=True):
-                    key = f"{row['market_id']}|{row['outcome_id']}"
-                    stats[key] = {
-                        'avg_depth': row.get('avg_depth', 0),
-                        'avg_spread': row.get('avg_spread', 0),
-                        'update_count': row.get('update_count', 0)
-                    }
-            except Exception as e:
-                pass
+        try:
+            mtime = stats_file.stat().st_mtime_ns
+        except OSError:
+            return {}
+        if mtime == self._stats_mtime:
+            return self._stats_cache
         
+        stats = {}
+        try:
+            lf = pl.scan_csv(stats_file)
+            names = lf.collect_schema().names()
+            # A stat the file doesn't have reads as 0
+            df = lf.select(
+                [pl.col('market_id'), pl.col('outcome_id')]
+                + [pl.col(c) if c in names else pl.lit(0).alias(c)
+                   for c in ('avg_depth', 'avg_spread', 'update_count')]
+            ).collect()
+            for market_id, outcome_id, avg_depth, avg_spread, update_count in zip(
+                df.get_column('market_id').to_list(),
+                df.get_column('outcome_id').to_list(),
+                df.get_column('avg_depth').to_list(),
+                df.get_column('avg_spread').to_list(),
+                df.get_column('update_count').to_list(),
+            ):
+                stats[f"{market_id}|{outcome_id}"] = {
+                    'avg_depth': avg_depth,
+                    'avg_spread': avg_spread,
+                    'update_count': update_count
+                }
+        except Exception as e:
+            # Not cached, so the next refresh tries the file again
+            return stats
+        
+        self._stats_mtime = mtime
+        self._stats_cache = stats
         return stats
     
     def get_collector_status(self) -> Tuple[bool, Optional[Dict]]:
         """Check if collector is running"""
-        import subprocess
-        try:
-            result = subprocess.run(['pgrep', '-f', 'surveillance_collect'], 
-                                  capture_output=True, text=True)
-            is_running = result.returncode == 0
-            
-            info = {}
-            if is_running:
-                pid = result.stdout.strip().split('\n')[0]
-                try:
-                    # Get memory usage
-                    result = subprocess.run(['ps', '-p', pid, '-o', 'rss='], 
-                                          capture_output=True, text=True)
-                    if result.returncode == 0:
-                        rss_kb = int(result.stdout.strip())
-                        info['pid'] = pid
-                        info['memory_mb'] = rss_kb / 1024
-                except:
-                    pass
-            
-            return is_running, info if info else None
-        except:
+        pid = self._collector_pid
+        if pid is None or not os.path.exists(f"/proc/{pid}"):
+            pid = self._collector_pid = self._find_collector_via_proc()
+        if pid is None:
             return False, None
+        
+        info = {}
+        try:
+            # Resident set size: second field of statm, in pages
+            with open(f"/proc/{pid}/statm") as f:
+                rss_kb = int(f.read().split()[1]) * PAGE_SIZE // 1024
+            info['pid'] = pid
+            info['memory_mb'] = rss_kb / 1024
+        except (OSError, ValueError, IndexError):
+            pass
+        
+        return True, info if info else None
+    
+    @staticmethod
+    def _find_collector_via_proc() -> Optional[str]:
+        """Find the collector pid by scanning /proc cmdlines (pgrep -f equivalent)"""
+        own_pid = str(os.getpid())
+        try:
+            pids = sorted((e.name for e in os.scandir('/proc') if e.name.isdigit()), key=int)
+        except OSError:
+            return None
+        for pid in pids:
+            if pid == own_pid:
+                continue
+            try:
+                with open(f"/proc/{pid}/cmdline", 'rb') as f:
+                    if b'surveillance_collect' in f.read():
+                        return pid
+            except OSError:
+                continue
+        return None
 
     def get_journal_lines(self, limit: int = 200) -> List[str]:
-        """Fetch recent journald lines for collector"""
+        """Fetch recent journald lines for collector.
+        
+        The first call backfills the last `limit` lines; later calls only ask for
+        the last few refresh intervals, since older matches are already held in
+        `_journal_latest`.
+        """
         import subprocess
+        if self._journal_primed:
+            window = ["--since", f"-{self.refresh_interval * 4}s"]
+        else:
+            window = ["-n", str(limit)]
         try:
             result = subprocess.run(
-                ["journalctl", "-u", "surveillance-collect", "-n", str(limit), "--no-pager"],
+                ["journalctl", "-u", "surveillance-collect", *window, "--no-pager"],
                 capture_output=True,
                 text=True,
             )
             if result.returncode != 0:
                 return []
+            self._journal_primed = True
             return [line for line in result.stdout.splitlines() if line.strip()]
         except Exception:
             return []
 
-    def parse_latest_metrics(self, lines: List[str]) -> Optional[str]:
+    def _parse_journal(self, lines: List[str]) -> Dict[str, str]:
+        """Extract the latest metrics, WARM cursor and scheduler sizes in one backward pass"""
+        found = {}
         for line in reversed(lines):
-            if "WebSocket metrics:" in line:
-                return line.split("WebSocket metrics:", 1)[-1].strip()
-        return None
-
-    def parse_latest_warm_cursor(self, lines: List[str]) -> Optional[str]:
-        for line in reversed(lines):
-            if "WARM cursor start=" in line:
-                return line.split("INFO", 1)[-1].strip()
-        return None
+            m = JOURNAL_MARKERS.search(line)
+            if m is None:
+                continue
+            key = JOURNAL_FIELDS[m.lastindex]
+            if key in found:
+                continue
+            if key == 'metrics':
+                found[key] = line[m.end():].strip()
+            else:
+                found[key] = line.split("INFO", 1)[-1].strip()
+            if len(found) == 3:
+                break
+        return found
 
-    def parse_latest_scheduler_sizes(self, lines: List[str]) -> Optional[str]:
-        for line in reversed(lines):
-            if "Scheduler for" in line and "HOT" in line and "WARM" in line:
-                return line.split("INFO", 1)[-1].strip()
-        return None
+    def get_journal_status(self) -> Dict[str, str]:
+        """Latest collector log fields, keeping older values when the window has none"""
+        self._journal_latest.update(self._parse_journal(self.get_journal_lines()))
+        return self._journal_latest
     
     def get_data_stats(self) -> Dict:
         """Get data collection statistics"""
@@ -192,27 +313,75 @@ class Dashboard:
         }
         
         if snapshot_dir.exists():
-            parquet_files = list(snapshot_dir.rglob("*.parquet"))
-            stats['total_files'] = len(parquet_files)
-            
-            total_size = sum(f.stat().st_size for f in parquet_files)
-            stats['total_size_gb'] = total_size / (1024**3)
+            self._refresh_file_cache(snapshot_dir)
+            stats['total_files'] = len(self._file_cache)
+            stats['total_size_gb'] = self._total_size / (1024**3)
             
             # Count recent files (last 10 minutes)
             ten_min_ago = time.time() - 600
-            stats['recent_files'] = sum(1 for f in parquet_files if f.stat().st_mtime > ten_min_ago)
+            for path, mtime in list(self._recent_files.items()):
+                if mtime <= ten_min_ago:
+                    del self._recent_files[path]
+            stats['recent_files'] = len(self._recent_files)
             
             # Get hours with data
-            for f in parquet_files:
-                parts = f.parts
-                for i, part in enumerate(parts):
-                    if part.startswith("hour="):
-                        hour = part.replace("hour=", "")
-                        stats['hours_with_data'].add(hour)
+            stats['hours_with_data'] = set(self._hour_counts)
         
         stats['hours_with_data'] = sorted(stats['hours_with_data'])
         return stats
     
+    def _refresh_file_cache(self, snapshot_dir: Path):
+        """Rescan only hour=HH directories whose mtime changed since the last tick.
+        
+        Creating or renaming a file in a directory bumps its mtime, so unchanged
+        directories cannot hold new snapshots and are skipped without a listing.
+        """
+        now_ns = time.time_ns()
+        live_dirs = set()
+        for hour_entry in os.scandir(snapshot_dir):
+            if not hour_entry.name.startswith("hour=") or not hour_entry.is_dir():
+                continue
+            live_dirs.add(hour_entry.path)
+            dir_mtime = hour_entry.stat().st_mtime_ns
+            if self._hour_dir_mtime.get(hour_entry.path) == dir_mtime:
+                continue
+            hour = hour_entry.name[len("hour="):]
+            prefix = hour_entry.path + os.sep
+            seen = set()
+            for entry in os.scandir(hour_entry.path):
+                if not entry.name.endswith(".parquet"):
+                    continue
+                seen.add(entry.path)
+                if entry.path in self._file_cache:
+                    continue
+                st = entry.stat()
+                self._file_cache[entry.path] = (st.st_size, st.st_mtime, hour)
+                self._total_size += st.st_size
+                self._hour_counts[hour] = self._hour_counts.get(hour, 0) + 1
+                self._recent_files[entry.path] = st.st_mtime
+            self._drop_cached_files([p for p in self._file_cache if p.startswith(prefix) and p not in seen])
+            # A directory modified within the last second may still change
+            # without its mtime moving (timestamp granularity); rescan it next tick.
+            if now_ns - dir_mtime > 1_000_000_000:
+                self._hour_dir_mtime[hour_entry.path] = dir_mtime
+        
+        # Forget hour directories that were removed entirely
+        gone = self._hour_dirs - live_dirs
+        self._hour_dirs = live_dirs
+        if gone:
+            for dir_path in gone:
+                self._hour_dir_mtime.pop(dir_path, None)
+            self._drop_cached_files([p for p in self._file_cache if os.path.dirname(p) in gone])
+    
+    def _drop_cached_files(self, paths: List[str]):
+        for path in paths:
+            size, _, hour = self._file_cache.pop(path)
+            self._total_size -= size
+            self._hour_counts[hour] -= 1
+            if not self._hour_counts[hour]:
+                del self._hour_counts[hour]
+            self._recent_files.pop(path, None)
+    
     def get_top_markets(self, limit: int = 10) -> List[Dict]:
         """Get top markets by update count"""
         snapshot_dir = self.data_dir / "orderbook_snapshots" / f"venue={self.venue}" / f"date={self.date}"
@@ -220,91 +389,127 @@ class Dashboard:
         if not snapshot_dir.exists():
             return []
         
-        try:
-            # Read recent parquet files
-            parquet_files = list(snapshot_dir.rglob("*.parquet"))
-            if not parquet_files:
-                return []
-            
-            # Read all files (this might be slow for large datasets, consider limiting)
-            dfs = []
-            for pf in parquet_files[:50]:  # Limit to 50 most recent files for performance
+        self._refresh_file_cache(snapshot_dir)
+        if self._agg_files - self._file_cache.keys():
+            # Files were removed; their rows cannot be subtracted back out
+            self._agg_state.clear()
+            self._agg_files.clear()
+        new_files = [p for p in self._file_cache if p not in self._agg_files]
+        if new_files:
+            try:
+                partial = self._partial_top(new_files)
+            except Exception:
+                # A corrupt or half-written file fails the whole scan; fold in
+                # the readable files and mark the bad ones as done so they are
+                # not rescanned on every refresh
+                readable = []
+                for path in new_files:
+                    try:
+                        pl.scan_parquet(path).select(TOP_COLS).collect()
+                        readable.append(path)
+                    except Exception:
+                        self._agg_files.add(path)
                 try:
-                    df = pl.read_parquet(pf)
-                    dfs.append(df)
-                except:
-                    continue
-            
-            if not dfs:
-                return []
-            
-            combined = pl.concat(dfs)
-            
-            # Group by market_id and outcome_id
-            top_markets = combined.group_by(['market_id', 'outcome_id']).agg([
+                    partial = self._partial_top(readable) if readable else None
+                except Exception:
+                    partial = None
+                new_files = readable
+            if partial is not None:
+                # Fold only the newly arrived files into the running totals
+                for market_id, outcome_id, updates, sum_spread, sum_bid, sum_ask, last in partial.iter_rows():
+                    acc = self._agg_state.get((market_id, outcome_id))
+                    if acc is None:
+                        self._agg_state[(market_id, outcome_id)] = [updates, sum_spread, sum_bid, sum_ask, last]
+                    else:
+                        acc[0] += updates
+                        acc[1] += sum_spread
+                        acc[2] += sum_bid
+                        acc[3] += sum_ask
+                        acc[4] = max(acc[4], last)
+                self._agg_files.update(new_files)
+        
+        top = heapq.nlargest(limit, self._agg_state.items(), key=lambda item: item[1][0])
+        return [
+            {
+                'market_id': market_id,
+                'outcome_id': outcome_id,
+                'updates': updates,
+                'avg_spread': sum_spread / updates,
+                'avg_depth': (sum_bid + sum_ask) / updates,
+                'last_update': last,
+            }
+            for (market_id, outcome_id), (updates, sum_spread, sum_bid, sum_ask, last) in top
+        ]
+    
+    @staticmethod
+    def _partial_top(parquet_files: List[str]) -> pl.DataFrame:
+        """Per-(market_id, outcome_id) running-total terms over parquet_files"""
+        return (
+            pl.scan_parquet(parquet_files)
+            .select(TOP_COLS)
+            .group_by(['market_id', 'outcome_id'])
+            .agg([
                 pl.len().alias('updates'),
-                pl.mean('spread').alias('avg_spread'),
-                (pl.mean('best_bid_sz') + pl.mean('best_ask_sz')).alias('avg_depth'),
+                pl.sum('spread').alias('sum_spread'),
+                pl.sum('best_bid_sz').alias('sum_bid_sz'),
+                pl.sum('best_ask_sz').alias('sum_ask_sz'),
                 pl.max('ts_recv').alias('last_update'),
-            ]).sort('updates', descending=True).head(limit)
-            
-            # Convert to list of dicts
-            result = []
-            for row in top_markets.iter_rows(named=True):
-                result.append({
-                    'market_id': row['market_id'],
-                    'outcome_id': row['outcome_id'],
-                    'updates': row['updates'],
-                    'avg_spread': row['avg_spread'],
-                    'avg_depth': row['avg_depth'],
-                    'last_update': row['last_update']
-                })
-            
-            return result
-        except Exception as e:
-            return []
+            ])
+            .collect(engine="streaming")
+        )
     
     def get_market_detail(self, market_id: str, outcome_id: str = "0") -> Optional[Dict]:
         """Get detailed data for a specific market"""
+        return self.get_market_details(market_id, [outcome_id]).get(outcome_id)
+    
+    def get_market_details(self, market_id: str, outcome_ids: List[str]) -> Dict[str, Dict]:
+        """Get detailed data for several outcomes of a market in one pass over the snapshots"""
         snapshot_dir = self.data_dir / "orderbook_snapshots" / f"venue={self.venue}" / f"date={self.date}"
         
         if not snapshot_dir.exists():
-            return None
+            return {}
+        
+        # Reuse the scandir file index rather than having Polars glob the tree
+        with self._io_lock:
+            self._refresh_file_cache(snapshot_dir)
+            files = list(self._file_cache)
+        if not files:
+            return {}
         
         try:
-            parquet_files = list(snapshot_dir.rglob("*.parquet"))
-            
-            # Filter for this market
-            dfs = []
-            for pf in parquet_files[:100]:  # Check up to 100 files
-                try:
-                    df = pl.read_parquet(pf)
-                    filtered = df.filter(
-                        (pl.col('market_id') == market_id) & 
-                        (pl.col('outcome_id') == outcome_id)
-                    )
-                    if len(filtered) > 0:
-                        dfs.append(filtered)
-                except:
-                    continue
-            
-            if not dfs:
-                return None
-            
-            combined = pl.concat(dfs)
-            
-            # Get latest snapshot
-            latest = combined.sort('ts_recv', descending=True).head(1)
-            
-            if len(latest) == 0:
-                return None
-            
-            row = latest.iter_rows(named=True)[0]
-            
-            return {
+            # The market/outcome filter is pushed into the scan, so row groups
+            # whose statistics exclude this market are skipped
+            lf = (
+                pl.scan_parquet(files)
+                .select(DETAIL_COLS)
+                .filter(
+                    (pl.col('market_id') == market_id) & 
+                    (pl.col('outcome_id').is_in(outcome_ids))
+                )
+            )
+            stats_lf = lf.group_by('outcome_id').agg([
+                pl.len().alias('snapshots'),
+                pl.col('spread').mean().alias('avg_spread'),
+                (pl.col('best_bid_sz') + pl.col('best_ask_sz')).mean().alias('avg_depth'),
+                pl.col('spread').min().alias('min_spread'),
+                pl.col('spread').max().alias('max_spread'),
+            ])
+            latest_lf = lf.group_by('outcome_id').agg(
+                pl.exclude('outcome_id').sort_by('ts_recv', descending=True).first()
+            )
+            # Both plans share the filtered scan, which collect_all runs once
+            stats_df, latest_df = pl.collect_all([stats_lf, latest_lf])
+        except Exception as e:
+            return {}
+        
+        stats_by_outcome = {row['outcome_id']: row for row in stats_df.iter_rows(named=True)}
+        details = {}
+        for row in latest_df.iter_rows(named=True):
+            stats = stats_by_outcome[row['outcome_id']]
+            details[row['outcome_id']] = {
                 'market_id': row['market_id'],
                 'outcome_id': row['outcome_id'],
-                'snapshots': len(combined),
+                'snapshots': stats['snapshots'],
                 'latest': {
                     'ts_recv': row['ts_recv'],
                     'best_bid_px': row.get('best_bid_px'),
@@ -315,28 +520,37 @@ class Dashboard:
                     'spread': row.get('spread'),
                 },
                 'stats': {
-                    'avg_spread': combined['spread'].mean(),
-                    'avg_depth': (combined['best_bid_sz'] + combined['best_ask_sz']).mean(),
-                    'min_spread': combined['spread'].min(),
-                    'max_spread': combined['spread'].max(),
+                    'avg_spread': stats['avg_spread'],
+                    'avg_depth': stats['avg_depth'],
+                    'min_spread': stats['min_spread'],
+                    'max_spread': stats['max_spread'],
                 }
             }
-        except Exception as e:
-            return None
+        return details
     
-    def render_overview(self):
+    def render_overview(self, buf: List[str]):
         """Render overview screen"""
-        collector_running, collector_info = self.get_collector_status()
-        data_stats = self.get_data_stats()
-        top_markets = self.get_top_markets(limit=10)
-        journal_lines = self.get_journal_lines()
-        latest_metrics = self.parse_latest_metrics(journal_lines)
-        latest_cursor = self.parse_latest_warm_cursor(journal_lines)
-        latest_sizes = self.parse_latest_scheduler_sizes(journal_lines)
+        collector_running, collector_info = self._tick['collector']
+        data_stats = self._tick['data_stats']
+        top_markets = self._tick['top_markets']
+        journal = self._tick['journal']
+        latest_metrics = journal.get('metrics')
+        latest_cursor = journal.get('cursor')
+        latest_sizes = journal.get('sizes')
         now_str = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
         
         term_width = shutil.get_terminal_size((120, 40)).columns
         col_width = max(40, (term_width - 3) // 2)
+        
+        # Everything shown on this screen except the clock; run() skips the
+        # redraw while it is unchanged
+        self._frame_sig = hash((
+            term_width, collector_running, collector_info and collector_info.get('pid'),
+            len(self.markets), data_stats['total_files'], data_stats['total_size_gb'],
+            data_stats['recent_files'], tuple(data_stats['hours_with_data']),
+            tuple((m['market_id'], m['outcome_id'], m['updates']) for m in top_markets),
+            latest_metrics, latest_cursor, latest_sizes,
+        ))
 
         def block(title: str, lines: List[str]) -> List[str]:
             header = f"{title}".ljust(col_width)
@@ -348,10 +562,10 @@ class Dashboard:
             f"Market Surveillance Dashboard | {self.venue.upper()} | {self.date} | "
             f"refresh={self.refresh_interval}s | {now_str}"
         )
-        print("=" * min(term_width, len(header)))
-        print(header)
-        print("=" * min(term_width, len(header)))
-        print()
+        buf.append("=" * min(term_width, len(header)))
+        buf.append(header)
+        buf.append("=" * min(term_width, len(header)))
+        buf.append("")
 
         # Left column blocks
         health_lines = []
@@ -398,43 +612,61 @@ class Dashboard:
         right_blocks.extend([" " * col_width] * (max_rows - len(right_blocks)))
 
         for l, r in zip(left_blocks, right_blocks):
-            print(f"{l} | {r}")
+            buf.append(f"{l} | {r}")
 
-        print()
-        print("TOP MARKETS (updates)")
-        print("-" * min(term_width, 80))
+        buf.append("")
+        buf.append("TOP MARKETS (updates)")
+        buf.append("-" * min(term_width, 80))
         if top_markets:
-            print(f"{'Title':<50} {'Out':<4} {'Upd':<6} {'Spr':<10} {'Depth':<10}")
-            print("-" * min(term_width, 80))
+            buf.append(f"{'Title':<50} {'Out':<4} {'Upd':<6} {'Spr':<10} {'Depth':<10}")
+            buf.append("-" * min(term_width, 80))
             for m in top_markets[:10]:
-                # First check market_titles (all dates), then fall back to current universe
-                market_title = self.market_titles.get(m['market_id'])
-                if not market_title:
-                    market_title = next((mkt['title'] for mkt in self.markets if mkt['market_id'] == m['market_id']), None)
-                if not market_title:
-                    # Show truncated market_id if no title found
-                    market_title = f"[{m['market_id'][:40]}...]"
-                if len(market_title) > 48:
-                    market_title = market_title[:45] + "..."
-                print(
-                    f"{market_title:<50} {m['outcome_id']:<4} {m['updates']:<6} "
-                    f"{m['avg_spread']:<10.6f} {m['avg_depth']:<10.2f}"
-                )
+                buf.append(self._format_top_market_row(m))
         else:
-            print("No market data available yet")
-        print()
+            buf.append("No market data available yet")
+        buf.append("")
     
-    def render_markets_list(self):
+    def _format_top_market_row(self, m: Dict) -> str:
+        """Format one TOP MARKETS line, reusing the string while the row is unchanged"""
+        # First check market_titles (all dates), then fall back to current universe
+        market_title = self.market_titles.get(m['market_id']) or self._title_by_id.get(m['market_id'])
+        avg_spread, avg_depth = m['avg_spread'], m['avg_depth']
+        # NaN never compares equal, so key it as None
+        key = (
+            m['market_id'], market_title, m['outcome_id'], m['updates'],
+            round(avg_spread, 6) if avg_spread == avg_spread else None,
+            round(avg_depth, 2) if avg_depth == avg_depth else None,
+        )
+        line = self._row_cache.get(key)
+        if line is not None:
+            self._row_cache.move_to_end(key)
+            return line
+        
+        if not market_title:
+            # Show truncated market_id if no title found
+            market_title = f"[{m['market_id'][:40]}...]"
+        if len(market_title) > 48:
+            market_title = market_title[:45] + "..."
+        line = (
+            f"{market_title:<50} {m['outcome_id']:<4} {m['updates']:<6} "
+            f"{avg_spread:<10.6f} {avg_depth:<10.2f}"
+        )
+        self._row_cache[key] = line
+        if len(self._row_cache) > ROW_CACHE_SIZE:
+            self._row_cache.popitem(last=False)
+        return line
+    
+    def render_markets_list(self, buf: List[str]):
         """Render markets list screen"""
-        print("=" * 80)
-        print(f"  Markets List - {self.venue.upper()} | {self.date}")
-        print("=" * 80)
-        print()
+        buf.append("=" * 80)
+        buf.append(f"  Markets List - {self.venue.upper()} | {self.date}")
+        buf.append("=" * 80)
+        buf.append("")
         
         if not self.markets:
-            print("No markets found. Run scanner to discover markets.")
-            print()
-            print("Press 'b' to go back | 'q' to quit")
+            buf.append("No markets found. Run scanner to discover markets.")
+            buf.append("")
+            buf.append("Press 'b' to go back | 'q' to quit")
             return
         
         # Show markets with stats if available
@@ -442,8 +674,8 @@ class Dashboard:
         start_idx = max(0, min(self.selected_market_index - page_size // 2, len(self.markets) - page_size))
         end_idx = min(len(self.markets), start_idx + page_size)
         
-        print(f"Showing markets {start_idx + 1}-{end_idx} of {len(self.markets)} (selected: {self.selected_market_index + 1})")
-        print("-" * 80)
+        buf.append(f"Showing markets {start_idx + 1}-{end_idx} of {len(self.markets)} (selected: {self.selected_market_index + 1})")
+        buf.append("-" * 80)
         
         # Display markets (scrollable window)
         for i in range(start_idx, end_idx):
@@ -465,152 +697,226 @@ class Dashboard:
             title = market['title'][:65] + "..." if len(market['title']) > 65 else market['title']
             status_icon = "🟢" if market.get('status') == 'active' else "🔴"
             
-            print(f"{marker}{status_icon} {title}")
-            print(f"    ID: {market['market_id'][:55]}...")
+            buf.append(f"{marker}{status_icon} {title}")
+            buf.append(f"    ID: {market['market_id'][:55]}...")
             if market.get('outcome_ids'):
-                print(f"    Outcomes: {', '.join(market.get('outcome_ids', []))}")
+                buf.append(f"    Outcomes: {', '.join(market.get('outcome_ids', []))}")
             if stats_info:
-                print(f"    Stats: {stats_info}")
-            print()
+                buf.append(f"    Stats: {stats_info}")
+            buf.append("")
         
-        print("-" * 80)
-        print("↑/↓ or j/k: Navigate | Enter: View details | 'b': Back | 'q': Quit")
+        buf.append("-" * 80)
+        buf.append("↑/↓ or j/k: Navigate | Enter: View details | 'b': Back | 'q': Quit")
     
-    def render_market_detail(self, market_index: int):
+    def render_market_detail(self, market_index: int, buf: List[str]):
         """Render detailed view for a specific market"""
         if market_index < 0 or market_index >= len(self.markets):
             return
         
         market = self.markets[market_index]
         
-        print("=" * 80)
-        print(f"  Market Details")
-        print("=" * 80)
-        print()
-        print(f"Title: {market['title']}")
-        print(f"Market ID: {market['market_id']}")
-        print(f"Status: {market.get('status', 'N/A')}")
-        print(f"Outcomes: {', '.join(market.get('outcome_ids', []))}")
+        buf.append("=" * 80)
+        buf.append(f"  Market Details")
+        buf.append("=" * 80)
+        buf.append("")
+        buf.append(f"Title: {market['title']}")
+        buf.append(f"Market ID: {market['market_id']}")
+        buf.append(f"Status: {market.get('status', 'N/A')}")
+        buf.append(f"Outcomes: {', '.join(market.get('outcome_ids', []))}")
         if market.get('tags'):
-            print(f"Tags: {', '.join(market['tags'])}")
+            buf.append(f"Tags: {', '.join(market['tags'])}")
         if market.get('close_ts'):
             close_dt = datetime.fromtimestamp(market['close_ts'] / 1000)
-            print(f"Close Date: {close_dt.strftime('%Y-%m-%d %H:%M:%S UTC')}")
-        print()
-        
-        # Show data for each outcome
-        for outcome_id in market.get('outcome_ids', ['0']):
-            print(f"-" * 80)
-            print(f"Outcome: {outcome_id}")
-            print("-" * 80)
+            buf.append(f"Close Date: {close_dt.strftime('%Y-%m-%d %H:%M:%S UTC')}")
+        buf.append("")
+        
+        # Show data for each outcome (fetched together in one query)
+        outcome_ids = market.get('outcome_ids', ['0'])
+        details = self.get_market_details(market['market_id'], outcome_ids)
+        for outcome_id in outcome_ids:
+            buf.append(f"-" * 80)
+            buf.append(f"Outcome: {outcome_id}")
+            buf.append("-" * 80)
             
-            detail = self.get_market_detail(market['market_id'], outcome_id)
+            detail = details.get(outcome_id)
             if detail:
-                print(f"Snapshots collected: {detail['snapshots']}")
-                print()
-                print("Latest Snapshot:")
+                buf.append(f"Snapshots collected: {detail['snapshots']}")
+                buf.append("")
+                buf.append("Latest Snapshot:")
                 if detail['latest']:
                     latest = detail['latest']
-                    print(f"  Timestamp: {datetime.fromtimestamp(latest['ts_recv']/1000).strftime('%Y-%m-%d %H:%M:%S UTC')}")
-                    print(f"  Best Bid: {latest.get('best_bid_px', 0):.6f} @ {latest.get('best_bid_sz', 0):.2f}")
-                    print(f"  Best Ask: {latest.get('best_ask_px', 0):.6f} @ {latest.get('best_ask_sz', 0):.2f}")
-                    print(f"  Mid Price: {latest.get('mid', 0):.6f}")
-                    print(f"  Spread: {latest.get('spread', 0):.6f}")
-                print()
-                print("Statistics:")
+                    buf.append(f"  Timestamp: {datetime.fromtimestamp(latest['ts_recv']/1000).strftime('%Y-%m-%d %H:%M:%S UTC')}")
+                    buf.append(f"  Best Bid: {latest.get('best_bid_px', 0):.6f} @ {latest.get('best_bid_sz', 0):.2f}")
+                    buf.append(f"  Best Ask: {latest.get('best_ask_px', 0):.6f} @ {latest.get('best_ask_sz', 0):.2f}")
+                    buf.append(f"  Mid Price: {latest.get('mid', 0):.6f}")
+                    buf.append(f"  Spread: {latest.get('spread', 0):.6f}")
+                buf.append("")
+                buf.append("Statistics:")
                 stats = detail['stats']
-                print(f"  Avg Spread: {stats['avg_spread']:.6f}")
-                print(f"  Min Spread: {stats['min_spread']:.6f}")
-                print(f"  Max Spread: {stats['max_spread']:.6f}")
-                print(f"  Avg Depth: {stats['avg_depth']:.2f}")
+                buf.append(f"  Avg Spread: {stats['avg_spread']:.6f}")
+                buf.append(f"  Min Spread: {stats['min_spread']:.6f}")
+                buf.append(f"  Max Spread: {stats['max_spread']:.6f}")
+                buf.append(f"  Avg Depth: {stats['avg_depth']:.2f}")
             else:
-                print("No data collected yet for this outcome")
-            print()
+                buf.append("No data collected yet for this outcome")
+            buf.append("")
         
-        print("-" * 80)
-        print("Press 'b' to go back | 'q' to quit")
+        buf.append("-" * 80)
+        buf.append("Press 'b' to go back | 'q' to quit")
     
-    def handle_input(self) -> bool:
-        """Handle keyboard input (non-blocking)"""
+    def _enter_raw_mode(self):
+        """Put the terminal in cbreak mode for the lifetime of the dashboard"""
+        self._old_tty = None
         try:
-            import select
             import tty
             import termios
             
-            old_settings = termios.tcgetattr(sys.stdin)
-            try:
-                tty.setcbreak(sys.stdin.fileno())
+            fd = sys.stdin.fileno()
+            old_settings = termios.tcgetattr(fd)
+            tty.setcbreak(fd)
+            self._old_tty = old_settings
+        except Exception:
+            # No termios (Windows, etc.) or stdin is not a terminal
+            pass
+    
+    def _restore_tty(self):
+        """Restore the terminal settings saved by _enter_raw_mode"""
+        if self._old_tty is None:
+            return
+        import termios
+        termios.tcsetattr(sys.stdin, termios.TCSADRAIN, self._old_tty)
+        self._old_tty = None
+    
+    def handle_input(self, timeout: float = 0.0) -> bool:
+        """Wait up to `timeout` seconds for a keypress and handle it.
+        
+        Sets `_redraw` when a key was handled so the loop redraws without
+        waiting for the next refresh. Once stdin hits EOF it is no longer
+        polled; the call just waits out the timeout.
+        """
+        if self._stdin_eof:
+            time.sleep(timeout)
+            return True
+        try:
+            import select
+            
+            if select.select([sys.stdin], [], [], timeout)[0]:
+                char = sys.stdin.read(1)
+                if char == '':
+                    # EOF: stdin stays readable forever, so stop selecting on it
+                    self._stdin_eof = True
+                    time.sleep(timeout)
+                    return True
                 
-                if select.select([sys.stdin], [], [], 0.0)[0]:
-                    char = sys.stdin.read(1)
-                    
-                    if char == 'q':
-                        return False
-                    elif char == 'r':
-                        # Refresh
-                        return True
-                    elif char == 'm' and self.current_view == "overview":
+                if char == 'q':
+                    return False
+                elif char == 'r':
+                    # Refresh
+                    self._redraw = True
+                    return True
+                elif char == 'm' and self.current_view == "overview":
+                    self.current_view = "markets"
+                    self.selected_market_index = 0
+                elif char == 'b' and self.current_view != "overview":
+                    if self.current_view == "market_detail":
                         self.current_view = "markets"
-                        self.selected_market_index = 0
-                    elif char == 'b' and self.current_view != "overview":
-                        if self.current_view == "market_detail":
-                            self.current_view = "markets"
-                        else:
-                            self.current_view = "overview"
-                    elif char == '\n' and self.current_view == "markets":
-                        # Enter key - view market detail
-                        self.current_view = "market_detail"
-                    elif char == 'k' and self.current_view == "markets":  # Up (vi-style)
-                        self.selected_market_index = max(0, self.selected_market_index - 1)
-                    elif char == 'j' and self.current_view == "markets":  # Down (vi-style)
-                        self.selected_market_index = min(len(self.markets) - 1, self.selected_market_index + 1)
-                    elif char == '\x1b':  # ESC sequence (arrow keys)
-                        # Handle arrow keys
-                        if select.select([sys.stdin], [], [], 0.0)[0]:
-                            seq = sys.stdin.read(2)
-                            if seq == '[A' and self.current_view == "markets":  # Up arrow
-                                self.selected_market_index = max(0, self.selected_market_index - 1)
-                            elif seq == '[B' and self.current_view == "markets":  # Down arrow
-                                self.selected_market_index = min(len(self.markets) - 1, self.selected_market_index + 1)
-                    
-            finally:
-                termios.tcsetattr(sys.stdin, termios.TCSADRAIN, old_settings)
+                    else:
+                        self.current_view = "overview"
+                elif char == '\n' and self.current_view == "markets":
+                    # Enter key - view market detail
+                    self.current_view = "market_detail"
+                elif char == 'k' and self.current_view == "markets":  # Up (vi-style)
+                    self.selected_market_index = max(0, self.selected_market_index - 1)
+                elif char == 'j' and self.current_view == "markets":  # Down (vi-style)
+                    self.selected_market_index = min(len(self.markets) - 1, self.selected_market_index + 1)
+                elif char == '\x1b':  # ESC sequence (arrow keys)
+                    # Handle arrow keys
+                    if select.select([sys.stdin], [], [], 0.0)[0]:
+                        seq = sys.stdin.read(2)
+                        if seq == '[A' and self.current_view == "markets":  # Up arrow
+                            self.selected_market_index = max(0, self.selected_market_index - 1)
+                        elif seq == '[B' and self.current_view == "markets":  # Down arrow
+                            self.selected_market_index = min(len(self.markets) - 1, self.selected_market_index + 1)
+                else:
+                    # Unbound key: nothing to redraw
+                    return True
+                self._redraw = True
         except (ImportError, OSError):
             # Fallback for systems without termios (Windows, etc.)
-            # Just continue without input handling
-            pass
+            # Just wait out the refresh without input handling
+            time.sleep(timeout)
         
         return True
     
+    def _collect_tick_data(self) -> Dict:
+        """Load everything a frame needs (runs on the I/O thread)"""
+        with self._io_lock:
+            markets = self.load_universe()
+            return {
+                'markets': markets,
+                'title_by_id': {m['market_id']: m['title'] for m in markets if m.get('title')},
+                'market_stats': self.load_stats(),
+                'market_titles': self.load_market_titles(),
+                'collector': self.get_collector_status(),
+                'data_stats': self.get_data_stats(),
+                'top_markets': self.get_top_markets(limit=10),
+                'journal': dict(self.get_journal_status()),
+            }
+    
     def run(self):
         """Main dashboard loop"""
         next_refresh = time.monotonic()
-        while self.running:
-            now = time.monotonic()
-            if now >= next_refresh:
-                # Load data
-                self.markets = self.load_universe()
-                self.market_stats = self.load_stats()
-                self.market_titles = self.load_market_titles()
-
-                # Clear and render
-                self.clear_screen()
-
-                if self.current_view == "overview":
-                    self.render_overview()
-                elif self.current_view == "markets":
-                    self.render_markets_list()
-                elif self.current_view == "market_detail":
-                    self.render_market_detail(self.selected_market_index)
-
-                next_refresh = now + self.refresh_interval
-
-            # Handle input (non-blocking)
-            if not self.handle_input():
-                break
-
-            time.sleep(0.05)
+        self._enter_raw_mode()
+        try:
+            while self.running:
+                now = time.monotonic()
+                if now >= next_refresh and self._pending is None:
+                    self._pending = self._io_pool.submit(self._collect_tick_data)
+                
+                fresh = False
+                if self._pending is not None and self._pending.done():
+                    self._tick = self._pending.result()
+                    self._pending = None
+                    self.markets = self._tick['markets']
+                    self._title_by_id = self._tick['title_by_id']
+                    self.market_stats = self._tick['market_stats']
+                    self.market_titles = self._tick['market_titles']
+                    fresh = True
+                    next_refresh = now + self.refresh_interval
+                
+                # Keypresses redraw from the last loaded data without waiting on I/O
+                forced = self._redraw
+                if (fresh or forced) and self._tick is not None:
+                    self._redraw = False
+                    # Build the whole frame, then clear and draw it in a single write
+                    buf: List[str] = []
+                    if self.current_view == "overview":
+                        self.render_overview(buf)
+                    else:
+                        if self.current_view == "markets":
+                            self.render_markets_list(buf)
+                        elif self.current_view == "market_detail":
+                            self.render_market_detail(self.selected_market_index, buf)
+                        self._frame_sig = hash(tuple(buf))
+                    
+                    # Skip the clear and redraw when nothing visible changed
+                    sig = (self.current_view, self._frame_sig)
+                    if forced or sig != self._last_render_sig:
+                        sys.stdout.write(CLEAR_SCREEN + "\n".join(buf) + "\n")
+                        sys.stdout.flush()
+                        self._last_render_sig = sig
 
+                # Sleep until a keypress or the next refresh, whichever comes first;
+                # poll briefly while a load is in flight
+                if self._pending is not None:
+                    timeout = 0.05
+                else:
+                    timeout = max(0.0, next_refresh - time.monotonic())
+                if not self.handle_input(timeout):
+                    break
+        finally:
+            self._restore_tty()
+            self._io_pool.shutdown(wait=False, cancel_futures=True)
 
 def main():
     parser = argparse.ArgumentParser(description="Live Dashboard for Market Surveillance System")
@@ -620,6 +926,10 @@ def main():
     
     args = parser.parse_args()
     
+    if os.name == 'nt':
+        # Enables VT escape processing on the Windows console
+        os.system('')
+    
     dashboard = Dashboard(
         venue=args.venue,
         date=args.date,
@@ -2,20 +2,31 @@
 """
 HTML Dashboard for Market Surveillance System
 Lightweight HTTP server with auto-refreshing view.
+
+"/" serves a static page that polls "/data" (JSON); "/html" serves the
+same view rendered server-side for clients without JavaScript.
 """
 
 from __future__ import annotations
 
 import argparse
+import gzip
+import hashlib
+import heapq
 import json
 import html
 import os
 import re
 import subprocess
-from datetime import datetime, timezone
-from http.server import BaseHTTPRequestHandler, HTTPServer
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Deque, Dict, List, Optional, Set, Tuple
 
 try:
     import polars as pl
@@ -23,19 +34,166 @@ except ImportError:
     print("ERROR: polars not installed. Install with: pip install polars")
     raise
 
+try:
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj: object) -> bytes:
+        return json.dumps(obj).encode()
+
+try:
+    from systemd import journal as systemd_journal
+except ImportError:
+    systemd_journal = None
+
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+# Top markets are ranked over this many most recent snapshot files
+TOP_MARKETS_FILES = 50
+TOP_MARKETS_COLUMNS = ["market_id", "outcome_id", "spread", "best_bid_sz", "best_ask_sz"]
+# market_id -> title map over all dates, cached next to the date= dirs
+TITLES_CACHE_NAME = "_titles_cache.json"
+COLLECTOR_UNIT = "surveillance-collect.service"
+COLLECTOR_CGROUP_PROCS = Path("/sys/fs/cgroup/system.slice") / COLLECTOR_UNIT / "cgroup.procs"
+
+# Journal markers for the latest metrics / WARM cursor / scheduler size lines.
+# The WARM cursor line also starts with "Scheduler for", so the sizes
+# alternative must see HOT and WARM to win; Match.lastindex says which matched.
+LATEST_MARKERS = re.compile(r"(WebSocket metrics:)|(WARM cursor start=)|(Scheduler for .*HOT.*WARM)")
+METRICS_GROUP, CURSOR_GROUP, SIZES_GROUP = 1, 2, 3
+
+# Journal line timestamp, e.g. 2026-01-17T02:19:02.614473Z
+TIMESTAMP_RE = re.compile(r"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{6}Z)")
+METRICS_FIELDS_RE = re.compile(
+    r"msg_rate=(?P<msg_rate>[0-9.]+)/s, update_rate=(?P<update_rate>[0-9.]+)/s, "
+    r"queue_depth=(?P<queue_depth>[0-9]+), total_msg=(?P<total_msg>[0-9]+), total_updates=(?P<total_updates>[0-9]+)"
+)
+SIZES_FIELDS_RE = re.compile(r"HOT [0-9]+->(?P<hot_size>[0-9]+).*WARM [0-9]+->(?P<warm_size>[0-9]+)")
+CURSOR_FIELDS_RE = re.compile(
+    r"WARM cursor start=(?P<cursor_start>[0-9]+) next=(?P<cursor_next>[0-9]+) "
+    r"\((?P<cursor_remaining>[0-9]+) remaining, capacity (?P<cursor_capacity>[0-9]+), (?P<cursor_pct>[0-9.]+)% through\)"
+)
+
+
+def content_etag(content: bytes) -> str:
+    return '"' + hashlib.blake2b(content, digest_size=16).hexdigest() + '"'
+
 
 def utc_now_str() -> str:
     return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
 
 
+def line_timestamp(line: str) -> Optional[str]:
+    """Return the ISO timestamp embedded in a journal line, if it has one.
+
+    The collector's lines start with it, so check that fixed slot before
+    falling back to a regex search (e.g. when ANSI colour codes come first).
+    """
+    if line[26:27] == "Z" and line[10:11] == "T" and line[4:5] == "-" and line[:4].isdigit():
+        return line[:27]
+    match = TIMESTAMP_RE.search(line)
+    return match.group(1) if match else None
+
+
+def _top_markets_query(parquet_files: List[str], limit: int) -> pl.LazyFrame:
+    """Top (market_id, outcome_id) pairs by update count over parquet_files."""
+    # Lazy scan so only the aggregated columns are read and the group_by
+    # runs without materializing an intermediate concat of every file.
+    return (
+        pl.scan_parquet(parquet_files)
+        .select(TOP_MARKETS_COLUMNS)
+        # Filter out rows with NaN spread before aggregation
+        .filter(pl.col("spread").is_not_nan())
+        .group_by(["market_id", "outcome_id"])
+        .agg(
+            [
+                pl.len().alias("updates"),
+                pl.mean("spread").alias("avg_spread"),
+                (pl.mean("best_bid_sz") + pl.mean("best_ask_sz")).alias("avg_depth"),
+            ]
+        )
+        .sort("updates", descending=True)
+        .head(limit)
+    )
+
+
 class DashboardData:
     def __init__(self, venue: str, date: str, data_dir: str, refresh: int) -> None:
         self.venue = venue
         self.date = date
         self.data_dir = Path(data_dir)
         self.refresh = refresh
+        self._cache: Optional[Dict] = None
+        self._cache_ts = 0.0
+        self._json_bytes = b""
+        self._json_etag = ""
+        self._html_bytes: Optional[bytes] = None
+        self._html_etag = ""
+        self._lock = threading.Lock()
+        self._journal: Deque[str] = deque(maxlen=200)
+        self._journal_cursor: Optional[str] = None
+        self._journal_reader = None
+        self._collector_pid: Optional[str] = None
+        self._uni_key: Optional[Tuple] = None
+        # Incremental snapshot file index: path -> (hour, size, mtime)
+        self._file_index: Dict[str, Tuple[str, int, float]] = {}
+        self._total_size = 0
+        self._hour_counts: Dict[str, int] = {}
+        self._recent_files: Dict[str, float] = {}
+        self._hour_dir_mtime: Dict[str, int] = {}
+        self._hour_dirs: Set[str] = set()
+        self._top_key: Optional[Tuple] = None
+        self._top_rows: List[Dict] = []
+        self._listing_ts = float("-inf")
+        self._uni: List[Dict] = []
+        self._today_key: Optional[Tuple] = None
+        self._uni_with_tokens = 0
+        self._title_map: Dict[str, str] = {}
+
+    def _universe_signature(self) -> Tuple:
+        """(name, mtime_ns, size) of every universe file for the venue."""
+        metadata_dir = self.data_dir / "metadata" / f"venue={self.venue}"
+        signature = []
+        try:
+            entries = list(os.scandir(metadata_dir))
+        except OSError:
+            return ()
+        for entry in entries:
+            if not entry.name.startswith("date="):
+                continue
+            try:
+                st = os.stat(os.path.join(entry.path, "universe.jsonl"))
+            except OSError:
+                continue
+            signature.append((entry.name, st.st_mtime_ns, st.st_size))
+        return tuple(sorted(signature))
+
+    def load_universe_with_titles(self) -> Tuple[List[Dict], Dict[str, str]]:
+        """Return (markets, title_map), re-parsing only when a universe file changed."""
+        signature = self._universe_signature()
+        if signature != self._uni_key:
+            # Only re-parse the current date's file if it is the one that changed
+            today_key = next((entry[1:] for entry in signature if entry[0] == f"date={self.date}"), None)
+            if today_key is None or today_key != self._today_key:
+                self._uni = self._parse_universe()
+                self._uni_with_tokens = sum(1 for m in self._uni if m.get("token_ids"))
+                self._today_key = today_key
+            markets = self._uni
+            # Load titles from all available universe files (including previous days)
+            title_map = self.load_cached_market_titles(signature, markets)
+            # Add any titles from current universe that might not be in the map
+            for m in markets:
+                if m.get("market_id") and m.get("title"):
+                    title_map.setdefault(m["market_id"], m["title"])
+            self._uni_key = signature
+            self._title_map = title_map
+        return self._uni, self._title_map
 
     def load_universe(self) -> List[Dict]:
+        return self.load_universe_with_titles()[0]
+
+    def _parse_universe(self) -> List[Dict]:
         universe_file = (
             self.data_dir
             / "metadata"
@@ -45,141 +203,262 @@ class DashboardData:
         )
         markets = []
         if universe_file.exists():
-            for line in universe_file.read_text().splitlines():
-                if not line.strip():
-                    continue
-                try:
-                    markets.append(json.loads(line))
-                except json.JSONDecodeError:
-                    continue
+            with universe_file.open("rb") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        markets.append(json_loads(line))
+                    except json.JSONDecodeError:
+                        continue
         return markets
 
-    def load_all_market_titles(self) -> Dict[str, str]:
-        """Load market_id -> title mapping from all available universe files"""
+    def load_cached_market_titles(self, signature: Tuple, current: Optional[List[Dict]] = None) -> Dict[str, str]:
+        """load_all_market_titles, persisted on disk keyed by the universe file signature.
+
+        Survives restarts, so a fresh server does not re-parse every past day.
+        """
+        cache_file = self.data_dir / "metadata" / f"venue={self.venue}" / TITLES_CACHE_NAME
+        # JSON round-trips the signature tuples as lists
+        key = [list(entry) for entry in signature]
+        try:
+            cached = json_loads(cache_file.read_bytes())
+            titles = cached["titles"]
+            if cached["key"] == key and isinstance(titles, dict):
+                return titles
+        except Exception:
+            # Missing, unreadable or stale-format cache: rebuild it
+            pass
+
+        titles = self.load_all_market_titles(current)
+        if signature:
+            tmp_file = cache_file.with_name(cache_file.name + ".tmp")
+            try:
+                tmp_file.write_bytes(json_dumps({"key": key, "titles": titles}))
+                os.replace(tmp_file, cache_file)
+            except OSError:
+                pass
+        return titles
+
+    def load_all_market_titles(self, current: Optional[List[Dict]] = None) -> Dict[str, str]:
+        """Load market_id -> title mapping from all available universe files
+
+        `current`, if given, is the already-parsed universe for self.date and is
+        used instead of reading that day's file again.
+        """
         titles = {}
         metadata_dir = self.data_dir / "metadata" / f"venue={self.venue}"
         
         if not metadata_dir.exists():
             return titles
         
-        # Load from all date directories to get comprehensive mapping
-        for date_dir in sorted(metadata_dir.iterdir(), reverse=True):
-            if not date_dir.is_dir() or not date_dir.name.startswith("date="):
+        # Load from all date directories (newest first) to get comprehensive mapping
+        date_dirs = sorted(
+            (e.path for e in os.scandir(metadata_dir) if e.name.startswith("date=") and e.is_dir()),
+            reverse=True,
+        )
+        current_dir = os.path.join(metadata_dir, f"date={self.date}")
+        for date_dir in date_dirs:
+            if current is not None and date_dir == current_dir:
+                for market in current:
+                    market_id = market.get("market_id")
+                    title = market.get("title")
+                    if market_id and title and market_id not in titles:
+                        titles[market_id] = title
                 continue
-            universe_file = date_dir / "universe.jsonl"
-            if universe_file.exists():
+            universe_file = os.path.join(date_dir, "universe.jsonl")
+            if os.path.exists(universe_file):
                 try:
-                    for line in universe_file.read_text().splitlines():
-                        if not line.strip():
-                            continue
-                        try:
-                            market = json.loads(line)
-                            market_id = market.get("market_id")
-                            title = market.get("title")
-                            if market_id and title and market_id not in titles:
-                                titles[market_id] = title
-                        except json.JSONDecodeError:
-                            continue
+                    with open(universe_file, "rb") as f:
+                        for line in f:
+                            if not line.strip():
+                                continue
+                            try:
+                                market = json_loads(line)
+                                market_id = market.get("market_id")
+                                title = market.get("title")
+                                if market_id and title and market_id not in titles:
+                                    titles[market_id] = title
+                            except json.JSONDecodeError:
+                                continue
                 except Exception:
                     continue
         
         return titles
 
-    def get_collector_status(self) -> Dict:
-        status = {"running": False, "pid": None, "memory_mb": None}
+    @staticmethod
+    def _read_rss_mb(pid: str) -> Optional[float]:
+        """Resident memory of pid in MB, from /proc/<pid>/statm."""
         try:
-            result = subprocess.run(
-                ["systemctl", "is-active", "surveillance-collect"],
-                capture_output=True,
-                text=True,
-            )
-            if result.returncode == 0 and result.stdout.strip() == "active":
-                status["running"] = True
-                pid_result = subprocess.run(
-                    ["systemctl", "show", "-p", "MainPID", "--value", "surveillance-collect"],
-                    capture_output=True,
-                    text=True,
-                )
-                if pid_result.returncode == 0:
-                    pid = pid_result.stdout.strip()
-                    status["pid"] = pid
-                    mem_result = subprocess.run(
-                        ["ps", "-p", pid, "-o", "rss="],
-                        capture_output=True,
-                        text=True,
-                    )
-                    if mem_result.returncode == 0 and mem_result.stdout.strip():
-                        status["memory_mb"] = round(int(mem_result.stdout.strip()) / 1024, 1)
-                return status
-        except Exception:
-            pass
+            with open(f"/proc/{pid}/statm") as f:
+                pages = int(f.read().split()[1])
+        except (OSError, ValueError, IndexError):
+            return None
+        return round(pages * PAGE_SIZE / (1024 * 1024), 1)
 
+    @staticmethod
+    def _find_unit_pid() -> Optional[str]:
+        """First pid in the collector unit's cgroup; None if the unit has no processes."""
         try:
-            result = subprocess.run(["pgrep", "-f", "surveillance_collect"], capture_output=True, text=True)
-            if result.returncode == 0:
-                pid = result.stdout.strip().split("\n")[0]
-                status["running"] = True
-                status["pid"] = pid
-                mem_result = subprocess.run(["ps", "-p", pid, "-o", "rss="], capture_output=True, text=True)
-                if mem_result.returncode == 0 and mem_result.stdout.strip():
-                    status["memory_mb"] = round(int(mem_result.stdout.strip()) / 1024, 1)
-        except Exception:
+            with open(COLLECTOR_CGROUP_PROCS) as f:
+                for line in f:
+                    if line.strip():
+                        return line.strip()
+        except OSError:
             pass
-        return status
+        return None
 
-    def get_journal_lines(self, limit: int = 200) -> List[str]:
+    @staticmethod
+    def _find_collector_pid() -> Optional[str]:
+        """Scan /proc cmdlines for the collector binary (pgrep -f equivalent)."""
+        own_pid = str(os.getpid())
         try:
-            result = subprocess.run(
-                ["journalctl", "-u", "surveillance-collect", "-n", str(limit), "--no-pager"],
-                capture_output=True,
-                text=True,
+            entries = sorted(
+                (e.name for e in os.scandir("/proc") if e.name.isdigit() and e.name != own_pid),
+                key=int,
             )
-            if result.returncode != 0:
-                return []
-            return [line for line in result.stdout.splitlines() if line.strip()]
+        except OSError:
+            return None
+        for pid in entries:
+            try:
+                with open(f"/proc/{pid}/cmdline", "rb") as f:
+                    if b"surveillance_collect" in f.read():
+                        return pid
+            except OSError:
+                continue
+        return None
+
+    def get_collector_status(self) -> Dict:
+        status = {"running": False, "pid": None, "memory_mb": None}
+        # Keep the discovered pid until its /proc entry goes away (exit/restart)
+        pid = self._collector_pid
+        if pid is None or not os.path.exists(f"/proc/{pid}"):
+            pid = self._collector_pid = self._find_unit_pid() or self._find_collector_pid()
+        if pid:
+            status["running"] = True
+            status["pid"] = pid
+            status["memory_mb"] = self._read_rss_mb(pid)
+        return status
+
+    def get_journal_lines(self) -> List[str]:
+        """Return the most recent collector log lines, fetching only new entries.
+
+        The journal is append-only, so after the first call only records after
+        the last seen cursor are read and appended to a bounded deque. Uses
+        libsystemd directly when python-systemd is installed, else journalctl.
+        """
+        try:
+            if systemd_journal is not None:
+                self._read_journal_native()
+            else:
+                self._read_journal_subprocess()
         except Exception:
-            return []
+            pass
+        return list(self._journal)
+
+    def _append_journal_entry(self, cursor: Optional[str], message: object) -> None:
+        if cursor:
+            self._journal_cursor = cursor
+        if isinstance(message, (bytes, list)):
+            # Non-UTF-8 messages come back as bytes (or a byte array from journalctl)
+            message = bytes(message).decode("utf-8", "replace")
+        if message and message.strip():
+            self._journal.append(message)
+
+    def _read_journal_native(self) -> None:
+        reader = self._journal_reader
+        if reader is None:
+            reader = systemd_journal.Reader()
+            reader.add_match(_SYSTEMD_UNIT=COLLECTOR_UNIT)
+            # process() only picks up rotated/new journal files once an fd exists
+            reader.fileno()
+            self._journal_reader = reader
+        reader.process()
+        if self._journal_cursor is None:
+            reader.seek_tail()
+            tail = []
+            while len(tail) < self._journal.maxlen:
+                entry = reader.get_previous()
+                if not entry:
+                    break
+                tail.append(entry)
+            entries = reversed(tail)
+        else:
+            reader.seek_cursor(self._journal_cursor)
+            # The entry at the cursor itself was already read
+            reader.get_next()
+            entries = reader
+        for entry in entries:
+            self._append_journal_entry(entry.get("__CURSOR"), entry.get("MESSAGE"))
+
+    def _read_journal_subprocess(self) -> None:
+        # Only MESSAGE is needed; __CURSOR is always included in JSON output
+        cmd = ["journalctl", "-u", COLLECTOR_UNIT, "--no-pager", "--output=json", "--output-fields=MESSAGE"]
+        if self._journal_cursor:
+            cmd.append(f"--after-cursor={self._journal_cursor}")
+        else:
+            cmd += ["-n", str(self._journal.maxlen)]
+        result = subprocess.run(cmd, capture_output=True)
+        if result.returncode != 0:
+            return
+        for raw in result.stdout.splitlines():
+            try:
+                entry = json_loads(raw)
+            except json.JSONDecodeError:
+                continue
+            self._append_journal_entry(entry.get("__CURSOR"), entry.get("MESSAGE"))
 
     @staticmethod
-    def parse_latest_metrics(lines: List[str]) -> tuple[Optional[str], Optional[str]]:
-        """Return (metrics_string, timestamp_string)"""
-        import re
+    def _line_timestamp(line: str) -> Optional[str]:
+        """Return the log line's timestamp as HH:MM:SS, if it has one."""
+        timestamp = line_timestamp(line)
+        return timestamp[11:19] if timestamp else None
+
+    @classmethod
+    def parse_latest(
+        cls, lines: List[str]
+    ) -> tuple[tuple[Optional[str], Optional[str]], tuple[Optional[str], Optional[str]], Optional[str]]:
+        """Return ((metrics, timestamp), (cursor, timestamp), sizes) in one reverse pass."""
+        metrics = metrics_ts = cursor = cursor_ts = sizes = None
         for line in reversed(lines):
-            if "WebSocket metrics:" in line:
-                metrics = line.split("WebSocket metrics:", 1)[-1].strip()
-                # Extract timestamp from log line
-                timestamp_match = re.search(r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{6}Z)', line)
-                if timestamp_match:
-                    # Convert to readable format
-                    try:
-                        dt = datetime.fromisoformat(timestamp_match.group(1).replace('Z', '+00:00'))
-                        timestamp = dt.strftime("%H:%M:%S")
-                        return metrics, timestamp
-                    except ValueError:
-                        pass
-                return metrics, None
-        return None, None
+            # One C-level scan for all three markers instead of three `in` tests
+            match = LATEST_MARKERS.search(line)
+            if match is None:
+                continue
+            marker = match.lastindex
+            if marker == METRICS_GROUP:
+                if metrics is None:
+                    metrics = line[match.end():].strip()
+                    metrics_ts = cls._line_timestamp(line)
+            elif marker == CURSOR_GROUP:
+                if cursor is None:
+                    cursor = line.split("INFO", 1)[-1].strip()
+                    cursor_ts = cls._line_timestamp(line)
+            elif sizes is None:
+                sizes = line.split("INFO", 1)[-1].strip()
+            if metrics is not None and cursor is not None and sizes is not None:
+                break
+        return (metrics, metrics_ts), (cursor, cursor_ts), sizes
 
     @staticmethod
     def get_recent_activity(lines: List[str], minutes: int = 5) -> Dict[str, int]:
         """Count activity in the last N minutes from journal lines."""
-        import re
-        from datetime import datetime, timezone, timedelta
+        # Fixed-width UTC ISO timestamps order the same as strings, so compare
+        # them directly instead of building a datetime per line
+        cutoff = (datetime.now(timezone.utc) - timedelta(minutes=minutes)).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
 
-        cutoff = datetime.now(timezone.utc) - timedelta(minutes=minutes)
-        activity = {"subscriptions": 0, "rotations": 0, "writes": 0}
-
-        for line in lines:
+        # The journal tail is in time order: walk back only to the first line
+        # older than the cutoff instead of testing every line
+        start = len(lines)
+        while start > 0:
             # Extract timestamp from log line (format: 2026-01-17T02:19:02.614473Z)
-            timestamp_match = re.search(r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{6}Z)', line)
-            if timestamp_match:
-                try:
-                    line_time = datetime.fromisoformat(timestamp_match.group(1).replace('Z', '+00:00'))
-                    if line_time < cutoff:
-                        continue
-                except ValueError:
-                    continue
+            timestamp = line_timestamp(lines[start - 1])
+            if timestamp is not None and timestamp < cutoff:
+                break
+            start -= 1
 
+        activity = {"subscriptions": 0, "rotations": 0, "writes": 0}
+        for line in lines[start:]:
             if "Subscription update" in line:
                 activity["subscriptions"] += 1
             elif "Rotating subscriptions" in line:
@@ -189,79 +468,20 @@ class DashboardData:
 
         return activity
 
-    @staticmethod
-    def parse_latest_cursor(lines: List[str]) -> tuple[Optional[str], Optional[str]]:
-        """Return (cursor_string, timestamp_string)"""
-        import re
-        for line in reversed(lines):
-            if "WARM cursor start=" in line:
-                cursor = line.split("INFO", 1)[-1].strip()
-                # Extract timestamp from log line
-                timestamp_match = re.search(r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{6}Z)', line)
-                if timestamp_match:
-                    try:
-                        dt = datetime.fromisoformat(timestamp_match.group(1).replace('Z', '+00:00'))
-                        timestamp = dt.strftime("%H:%M:%S")
-                        return cursor, timestamp
-                    except ValueError:
-                        pass
-                return cursor, None
-        return None, None
-
-    @staticmethod
-    def parse_latest_sizes(lines: List[str]) -> Optional[str]:
-        for line in reversed(lines):
-            if "Scheduler for" in line and "HOT" in line and "WARM" in line:
-                return line.split("INFO", 1)[-1].strip()
-        return None
-
     @staticmethod
     def parse_metrics_fields(metrics: Optional[str]) -> Dict[str, str]:
-        if not metrics:
-            return {}
-        match = re.search(
-            r"msg_rate=([0-9.]+)/s, update_rate=([0-9.]+)/s, queue_depth=([0-9]+), total_msg=([0-9]+), total_updates=([0-9]+)",
-            metrics,
-        )
-        if not match:
-            return {}
-        return {
-            "msg_rate": match.group(1),
-            "update_rate": match.group(2),
-            "queue_depth": match.group(3),
-            "total_msg": match.group(4),
-            "total_updates": match.group(5),
-        }
+        match = METRICS_FIELDS_RE.search(metrics) if metrics else None
+        return match.groupdict() if match else {}
 
     @staticmethod
     def parse_sizes_fields(sizes: Optional[str]) -> Dict[str, str]:
-        if not sizes:
-            return {}
-        match = re.search(
-            r"HOT [0-9]+->([0-9]+).*WARM [0-9]+->([0-9]+)",
-            sizes,
-        )
-        if not match:
-            return {}
-        return {"hot_size": match.group(1), "warm_size": match.group(2)}
+        match = SIZES_FIELDS_RE.search(sizes) if sizes else None
+        return match.groupdict() if match else {}
 
     @staticmethod
     def parse_cursor_fields(cursor: Optional[str]) -> Dict[str, str]:
-        if not cursor:
-            return {}
-        match = re.search(
-            r"WARM cursor start=([0-9]+) next=([0-9]+) \(([0-9]+) remaining, capacity ([0-9]+), ([0-9.]+)% through\)",
-            cursor,
-        )
-        if not match:
-            return {}
-        return {
-            "cursor_start": match.group(1),
-            "cursor_next": match.group(2),
-            "cursor_remaining": match.group(3),
-            "cursor_capacity": match.group(4),
-            "cursor_pct": match.group(5),
-        }
+        match = CURSOR_FIELDS_RE.search(cursor) if cursor else None
+        return match.groupdict() if match else {}
 
     def get_data_stats(self) -> Dict:
         snapshot_dir = (
@@ -274,54 +494,101 @@ class DashboardData:
             "hours_with_data": [],
         }
         if snapshot_dir.exists():
-            parquet_files = list(snapshot_dir.rglob("*.parquet"))
-            stats["total_files"] = len(parquet_files)
-            total_size = sum(f.stat().st_size for f in parquet_files)
-            stats["total_size_gb"] = round(total_size / (1024**3), 3)
+            self._list_parquet(snapshot_dir)
             ten_min_ago = datetime.now().timestamp() - 600
-            stats["recent_files"] = sum(1 for f in parquet_files if f.stat().st_mtime > ten_min_ago)
-            hours = set()
-            for f in parquet_files:
-                for part in f.parts:
-                    if part.startswith("hour="):
-                        hours.add(part.replace("hour=", ""))
-            stats["hours_with_data"] = sorted(hours)
+            for path, mtime in list(self._recent_files.items()):
+                if mtime <= ten_min_ago:
+                    del self._recent_files[path]
+            stats["total_files"] = len(self._file_index)
+            stats["total_size_gb"] = round(self._total_size / (1024**3), 3)
+            stats["recent_files"] = len(self._recent_files)
+            stats["hours_with_data"] = sorted(self._hour_counts)
         return stats
 
+    def _list_parquet(self, snapshot_dir: Path) -> List[str]:
+        """Snapshot file paths, walking the tree at most once per half refresh interval."""
+        now = time.monotonic()
+        if now - self._listing_ts >= self.refresh / 2:
+            self._update_file_index(snapshot_dir)
+            self._listing_ts = now
+        return list(self._file_index)
+
+    def _update_file_index(self, snapshot_dir: Path) -> None:
+        """Sync the per-file index with the snapshot tree, stat()ing only new files.
+
+        Snapshot files are written once (tmp + rename), so a file's size, hour
+        and mtime never change after it first appears. Adding, renaming or
+        removing a file bumps its hour=HH directory's mtime, so directories
+        whose mtime is unchanged are not listed again.
+        """
+        now_ns = time.time_ns()
+        live_dirs = set()
+        for hour_entry in os.scandir(snapshot_dir):
+            if not hour_entry.name.startswith("hour=") or not hour_entry.is_dir(follow_symlinks=False):
+                continue
+            live_dirs.add(hour_entry.path)
+            dir_mtime = hour_entry.stat().st_mtime_ns
+            if self._hour_dir_mtime.get(hour_entry.path) == dir_mtime:
+                continue
+            hour = hour_entry.name[5:]
+            seen = set()
+            for entry in os.scandir(hour_entry.path):
+                if not entry.name.endswith(".parquet") or not entry.is_file():
+                    continue
+                path = entry.path
+                seen.add(path)
+                if path in self._file_index:
+                    continue
+                st = entry.stat()
+                self._file_index[path] = (hour, st.st_size, st.st_mtime)
+                self._total_size += st.st_size
+                self._hour_counts[hour] = self._hour_counts.get(hour, 0) + 1
+                self._recent_files[path] = st.st_mtime
+            prefix = hour_entry.path + os.sep
+            self._drop_files([p for p in self._file_index if p.startswith(prefix) and p not in seen])
+            # mtime granularity can hide a change made within the same tick;
+            # only trust directories that have been quiet for a second
+            if now_ns - dir_mtime > 1_000_000_000:
+                self._hour_dir_mtime[hour_entry.path] = dir_mtime
+
+        gone = self._hour_dirs - live_dirs
+        self._hour_dirs = live_dirs
+        if gone:
+            for dir_path in gone:
+                self._hour_dir_mtime.pop(dir_path, None)
+            self._drop_files([p for p in self._file_index if os.path.dirname(p) in gone])
+
+    def _drop_files(self, paths: List[str]) -> None:
+        for path in paths:
+            hour, size, _ = self._file_index.pop(path)
+            self._total_size -= size
+            self._hour_counts[hour] -= 1
+            if not self._hour_counts[hour]:
+                del self._hour_counts[hour]
+            self._recent_files.pop(path, None)
+
     def get_top_markets(self, limit: int = 10, title_map: Optional[Dict[str, str]] = None) -> List[Dict]:
         snapshot_dir = (
             self.data_dir / "orderbook_snapshots" / f"venue={self.venue}" / f"date={self.date}"
         )
         if not snapshot_dir.exists():
             return []
-        parquet_files = list(snapshot_dir.rglob("*.parquet"))
-        if not parquet_files:
+        if not self._list_parquet(snapshot_dir):
             return []
-        dfs = []
-        for pf in parquet_files[:50]:
-            try:
-                df = pl.read_parquet(pf)
-                dfs.append(df)
-            except Exception:
-                continue
-        if not dfs:
-            return []
-        combined = pl.concat(dfs)
-        # Filter out rows with NaN spread before aggregation
-        valid_data = combined.filter(pl.col("spread").is_not_nan())
-        top_markets = (
-            valid_data.group_by(["market_id", "outcome_id"])
-            .agg(
-                [
-                    pl.len().alias("updates"),
-                    pl.mean("spread").alias("avg_spread"),
-                    (pl.mean("best_bid_sz") + pl.mean("best_ask_sz")).alias("avg_depth"),
-                ]
-            )
-            .sort("updates", descending=True)
-            .head(limit)
-        )
-        rows = top_markets.to_dicts()
+        # Rank over the recent rotation window (the newest files by mtime) so the
+        # scan stays bounded as the day's snapshots accumulate
+        recent = heapq.nlargest(TOP_MARKETS_FILES, self._file_index.items(), key=lambda item: item[1][2])
+        parquet_files = [path for path, _ in recent]
+        # Snapshot files are immutable, so the window's paths identify the aggregate
+        signature = (limit, frozenset(parquet_files))
+        if signature != self._top_key:
+            rows = self._aggregate_top_markets(parquet_files, limit)
+            if rows is None:
+                return []
+            self._top_key = signature
+            self._top_rows = rows
+        # Copy so titles can be attached without touching the cached rows
+        rows = [dict(row) for row in self._top_rows]
         if title_map:
             for row in rows:
                 title = title_map.get(row["market_id"])
@@ -331,18 +598,66 @@ class DashboardData:
                 row["title"] = title
         return rows
 
+    @staticmethod
+    def _aggregate_top_markets(parquet_files: List[str], limit: int) -> Optional[List[Dict]]:
+        try:
+            return _top_markets_query(parquet_files, limit).collect(engine="streaming").to_dicts()
+        except Exception:
+            pass
+        # One corrupt or half-written file fails the whole scan; drop the
+        # unreadable files and aggregate the rest
+        readable = []
+        for path in parquet_files:
+            try:
+                pl.scan_parquet(path).select(TOP_MARKETS_COLUMNS).collect()
+            except Exception as e:
+                print(f"Warning: skipping unreadable snapshot file {path}: {e}", file=sys.stderr)
+                continue
+            readable.append(path)
+        if not readable:
+            return []
+        try:
+            return _top_markets_query(readable, limit).collect(engine="streaming").to_dicts()
+        except Exception as e:
+            print(f"Warning: top markets aggregation failed: {e}", file=sys.stderr)
+            return None
+
+    def _refresh(self) -> None:
+        """Recompute the payload if older than one refresh interval. Caller holds _lock."""
+        now = time.monotonic()
+        if self._cache is not None and now - self._cache_ts < self.refresh:
+            return
+        self._cache = self._compute_payload()
+        self._json_bytes = json_dumps(self._cache)
+        self._json_etag = content_etag(self._json_bytes)
+        self._html_bytes = None
+        self._cache_ts = now
+
     def build_payload(self) -> Dict:
-        markets = self.load_universe()
-        # Load titles from all available universe files (including previous days)
-        title_map = self.load_all_market_titles()
-        # Add any titles from current universe that might not be in the map
-        for m in markets:
-            if m.get("market_id") and m.get("title"):
-                title_map.setdefault(m["market_id"], m["title"])
+        """Return the dashboard payload, reusing it for one refresh interval."""
+        with self._lock:
+            self._refresh()
+            return self._cache
+
+    def get_json_response(self) -> Tuple[bytes, str]:
+        """Return (JSON body, ETag), encoded once per refresh interval."""
+        with self._lock:
+            self._refresh()
+            return self._json_bytes, self._json_etag
+
+    def get_html_response(self) -> Tuple[bytes, str]:
+        """Return (server-rendered page, ETag), rendered at most once per refresh interval."""
+        with self._lock:
+            self._refresh()
+            if self._html_bytes is None:
+                self._html_bytes = render_html(self._cache).encode()
+                self._html_etag = content_etag(self._html_bytes)
+            return self._html_bytes, self._html_etag
+
+    def _compute_payload(self) -> Dict:
+        markets, title_map = self.load_universe_with_titles()
         journal = self.get_journal_lines()
-        metrics, metrics_timestamp = self.parse_latest_metrics(journal)
-        sizes = self.parse_latest_sizes(journal)
-        cursor, cursor_timestamp = self.parse_latest_cursor(journal)
+        (metrics, metrics_timestamp), (cursor, cursor_timestamp), sizes = self.parse_latest(journal)
         activity = self.get_recent_activity(journal, minutes=5)
         return {
             "venue": self.venue,
@@ -360,12 +675,19 @@ class DashboardData:
             "sizes_fields": self.parse_sizes_fields(sizes),
             "data_stats": self.get_data_stats(),
             "markets_total": len(markets),
-            "markets_with_tokens": sum(1 for m in markets if m.get("token_ids")),
+            "markets_with_tokens": self._uni_with_tokens,
             "top_markets": self.get_top_markets(limit=10, title_map=title_map),
             "activity": activity,
         }
 
 
+class _SafeDict(dict):
+    """format_map mapping that renders unknown placeholders as empty strings."""
+
+    def __missing__(self, key: str) -> str:
+        return ""
+
+
 def render_html(payload: Dict) -> str:
     collector = payload["collector"]
     collector_status = "RUNNING" if collector["running"] else "STOPPED"
@@ -388,44 +710,45 @@ def render_html(payload: Dict) -> str:
     hours = payload["data_stats"]["hours_with_data"]
     hours_str = ", ".join(hours) if hours else "-"
 
+    # The *_fields values are regex captures of [0-9.]+ and the activity
+    # values are ints, so only free-form strings go through html.escape
     replacements = {
-        "{{venue}}": html.escape(payload["venue"]),
-        "{{date}}": html.escape(payload["date"]),
-        "{{refresh}}": str(payload["refresh"]),
-        "{{updated_at}}": html.escape(payload["updated_at"]),
-        "{{collector_status}}": collector_status,
-        "{{collector_status_class}}": collector_status_class,
-        "{{collector_pid}}": str(collector.get("pid") or "-"),
-        "{{collector_mem}}": str(collector.get("memory_mb") or "-"),
-        "{{metric_msg_rate}}": html.escape(payload.get("metrics_fields", {}).get("msg_rate") or "-"),
-        "{{metric_update_rate}}": html.escape(payload.get("metrics_fields", {}).get("update_rate") or "-"),
-        "{{metric_queue_depth}}": html.escape(payload.get("metrics_fields", {}).get("queue_depth") or "-"),
-        "{{metric_total_msg}}": html.escape(payload.get("metrics_fields", {}).get("total_msg") or "-"),
-        "{{metric_total_updates}}": html.escape(payload.get("metrics_fields", {}).get("total_updates") or "-"),
-        "{{total_files}}": str(payload["data_stats"]["total_files"]),
-        "{{total_size}}": str(payload["data_stats"]["total_size_gb"]),
-        "{{recent_files}}": str(payload["data_stats"]["recent_files"]),
-        "{{hours_with_data}}": html.escape(hours_str),
-        "{{markets_total}}": str(payload["markets_total"]),
-        "{{markets_with_tokens}}": str(payload["markets_with_tokens"]),
-        "{{size_hot}}": html.escape(payload.get("sizes_fields", {}).get("hot_size") or "-"),
-        "{{size_warm}}": html.escape(payload.get("sizes_fields", {}).get("warm_size") or "-"),
-        "{{cursor_start}}": html.escape(payload.get("cursor_fields", {}).get("cursor_start") or "-"),
-        "{{cursor_next}}": html.escape(payload.get("cursor_fields", {}).get("cursor_next") or "-"),
-        "{{cursor_remaining}}": html.escape(payload.get("cursor_fields", {}).get("cursor_remaining") or "-"),
-        "{{cursor_capacity}}": html.escape(payload.get("cursor_fields", {}).get("cursor_capacity") or "-"),
-        "{{cursor_pct}}": html.escape(payload.get("cursor_fields", {}).get("cursor_pct") or "-"),
-        "{{activity_subs}}": html.escape(str(payload.get("activity", {}).get("subscriptions") or "0")),
-        "{{activity_rotations}}": html.escape(str(payload.get("activity", {}).get("rotations") or "0")),
-        "{{activity_writes}}": html.escape(str(payload.get("activity", {}).get("writes") or "0")),
-        "{{metrics_timestamp}}": html.escape(payload.get("metrics_timestamp") or "-"),
-        "{{cursor_timestamp}}": html.escape(payload.get("cursor_timestamp") or "-"),
-        "{{top_markets_rows}}": "\n".join(rows_html),
+        "meta_refresh": f'<meta http-equiv="refresh" content="{payload["refresh"]}" />',
+        "scripts": "",
+        "venue": html.escape(payload["venue"]),
+        "date": html.escape(payload["date"]),
+        "refresh": str(payload["refresh"]),
+        "updated_at": html.escape(payload["updated_at"]),
+        "collector_status": collector_status,
+        "collector_status_class": collector_status_class,
+        "collector_pid": str(collector.get("pid") or "-"),
+        "collector_mem": str(collector.get("memory_mb") or "-"),
+        "metric_msg_rate": payload.get("metrics_fields", {}).get("msg_rate") or "-",
+        "metric_update_rate": payload.get("metrics_fields", {}).get("update_rate") or "-",
+        "metric_queue_depth": payload.get("metrics_fields", {}).get("queue_depth") or "-",
+        "metric_total_msg": payload.get("metrics_fields", {}).get("total_msg") or "-",
+        "metric_total_updates": payload.get("metrics_fields", {}).get("total_updates") or "-",
+        "total_files": str(payload["data_stats"]["total_files"]),
+        "total_size": str(payload["data_stats"]["total_size_gb"]),
+        "recent_files": str(payload["data_stats"]["recent_files"]),
+        "hours_with_data": html.escape(hours_str),
+        "markets_total": str(payload["markets_total"]),
+        "markets_with_tokens": str(payload["markets_with_tokens"]),
+        "size_hot": payload.get("sizes_fields", {}).get("hot_size") or "-",
+        "size_warm": payload.get("sizes_fields", {}).get("warm_size") or "-",
+        "cursor_start": payload.get("cursor_fields", {}).get("cursor_start") or "-",
+        "cursor_next": payload.get("cursor_fields", {}).get("cursor_next") or "-",
+        "cursor_remaining": payload.get("cursor_fields", {}).get("cursor_remaining") or "-",
+        "cursor_capacity": payload.get("cursor_fields", {}).get("cursor_capacity") or "-",
+        "cursor_pct": payload.get("cursor_fields", {}).get("cursor_pct") or "-",
+        "activity_subs": str(payload.get("activity", {}).get("subscriptions") or "0"),
+        "activity_rotations": str(payload.get("activity", {}).get("rotations") or "0"),
+        "activity_writes": str(payload.get("activity", {}).get("writes") or "0"),
+        "metrics_timestamp": html.escape(payload.get("metrics_timestamp") or "-"),
+        "cursor_timestamp": html.escape(payload.get("cursor_timestamp") or "-"),
+        "top_markets_rows": "\n".join(rows_html),
     }
-    html_out = HTML_TEMPLATE
-    for key, value in replacements.items():
-        html_out = html_out.replace(key, value)
-    return html_out
+    return HTML_TEMPLATE.format_map(_SafeDict(replacements))
 
 
 HTML_TEMPLATE = """<!doctype html>
@@ -433,101 +756,101 @@ HTML_TEMPLATE = """<!doctype html>
   <head>
     <meta charset="utf-8" />
     <title>Surveillance Dashboard</title>
-    <meta http-equiv="refresh" content="{{refresh}}" />
+    {meta_refresh}
     <style>
-      body { font-family: Arial, sans-serif; margin: 16px; color: #111; }
-      .header { display: flex; justify-content: space-between; align-items: center; }
-      .grid { display: grid; grid-template-columns: 1fr 1fr; gap: 16px; margin-top: 16px; }
-      .card { border: 1px solid #ddd; border-radius: 6px; padding: 12px; }
-      .card h3 { margin: 0 0 8px 0; }
-      .kv { display: grid; grid-template-columns: 1fr 1fr; gap: 4px 12px; margin-top: 8px; }
-      .label { color: #666; }
-      table { width: 100%; border-collapse: collapse; margin-top: 8px; table-layout: fixed; }
-      th, td { padding: 6px 8px; border-bottom: 1px solid #eee; text-align: left; }
-      th.market, td.market { width: 55%; }
-      th.outcome, td.outcome { width: 10%; }
-      th.updates, td.updates { width: 10%; }
-      th.spread, td.spread { width: 12%; }
-      th.depth, td.depth { width: 13%; }
-      td.market { white-space: nowrap; overflow: hidden; text-overflow: ellipsis; }
-      .muted { color: #666; }
-      .ok { color: #0a7; font-weight: bold; }
-      .warn { color: #b50; font-weight: bold; }
-      code { font-family: Menlo, monospace; font-size: 12px; }
+      body {{ font-family: Arial, sans-serif; margin: 16px; color: #111; }}
+      .header {{ display: flex; justify-content: space-between; align-items: center; }}
+      .grid {{ display: grid; grid-template-columns: 1fr 1fr; gap: 16px; margin-top: 16px; }}
+      .card {{ border: 1px solid #ddd; border-radius: 6px; padding: 12px; }}
+      .card h3 {{ margin: 0 0 8px 0; }}
+      .kv {{ display: grid; grid-template-columns: 1fr 1fr; gap: 4px 12px; margin-top: 8px; }}
+      .label {{ color: #666; }}
+      table {{ width: 100%; border-collapse: collapse; margin-top: 8px; table-layout: fixed; }}
+      th, td {{ padding: 6px 8px; border-bottom: 1px solid #eee; text-align: left; }}
+      th.market, td.market {{ width: 55%; }}
+      th.outcome, td.outcome {{ width: 10%; }}
+      th.updates, td.updates {{ width: 10%; }}
+      th.spread, td.spread {{ width: 12%; }}
+      th.depth, td.depth {{ width: 13%; }}
+      td.market {{ white-space: nowrap; overflow: hidden; text-overflow: ellipsis; }}
+      .muted {{ color: #666; }}
+      .ok {{ color: #0a7; font-weight: bold; }}
+      .warn {{ color: #b50; font-weight: bold; }}
+      code {{ font-family: Menlo, monospace; font-size: 12px; }}
     </style>
   </head>
   <body>
     <div class="header">
       <div>
         <h2>Surveillance Dashboard</h2>
-        <div class="muted">Venue: {{venue}} | Date: {{date}} | Refresh: {{refresh}}s</div>
+        <div class="muted">Venue: {venue} | Date: {date} | Refresh: {refresh}s</div>
       </div>
-      <div class="muted">Updated: {{updated_at}}</div>
+      <div class="muted">Updated: {updated_at}</div>
     </div>
 
     <div class="grid">
       <div class="card">
         <h3>System Health</h3>
-        <div>Collector: <span class="{{collector_status_class}}">{{collector_status}}</span></div>
-        <div class="muted">PID: {{collector_pid}} | Mem: {{collector_mem}} MB</div>
+        <div>Collector: <span id="collector_status" class="{collector_status_class}">{collector_status}</span></div>
+        <div class="muted">PID: {collector_pid} | Mem: {collector_mem} MB</div>
         <div class="kv">
           <div class="label">Message Rate</div>
-          <div>{{metric_msg_rate}}/s</div>
+          <div>{metric_msg_rate}/s</div>
           <div class="label">Update Rate</div>
-          <div>{{metric_update_rate}}/s</div>
+          <div>{metric_update_rate}/s</div>
           <div class="label">Queue Depth</div>
-          <div>{{metric_queue_depth}}</div>
+          <div>{metric_queue_depth}</div>
           <div class="label">Total Messages</div>
-          <div>{{metric_total_msg}}</div>
+          <div>{metric_total_msg}</div>
           <div class="label">Total Updates</div>
-          <div>{{metric_total_updates}}</div>
+          <div>{metric_total_updates}</div>
         </div>
-        <div class="muted">Last metrics: {{metrics_timestamp}}</div>
+        <div class="muted">Last metrics: {metrics_timestamp}</div>
       </div>
       <div class="card">
         <h3>Data Coverage</h3>
-        <div>Total files: {{total_files}}</div>
-        <div>Total size: {{total_size}} GB</div>
-        <div>Recent files (10m): {{recent_files}}</div>
-        <div>Hours: {{hours_with_data}}</div>
+        <div>Total files: {total_files}</div>
+        <div>Total size: {total_size} GB</div>
+        <div>Recent files (10m): {recent_files}</div>
+        <div>Hours: {hours_with_data}</div>
       </div>
       <div class="card">
         <h3>Universe Progress</h3>
-        <div>Markets: {{markets_total}}</div>
-        <div>With token IDs: {{markets_with_tokens}}</div>
+        <div>Markets: {markets_total}</div>
+        <div>With token IDs: {markets_with_tokens}</div>
         <div class="kv">
           <div class="label">HOT Size</div>
-          <div>{{size_hot}}</div>
+          <div>{size_hot}</div>
           <div class="label">WARM Size</div>
-          <div>{{size_warm}}</div>
+          <div>{size_warm}</div>
           <div class="label">Cursor Start</div>
-          <div>{{cursor_start}}</div>
+          <div>{cursor_start}</div>
           <div class="label">Cursor Next</div>
-          <div>{{cursor_next}}</div>
+          <div>{cursor_next}</div>
           <div class="label">Remaining</div>
-          <div>{{cursor_remaining}}</div>
+          <div>{cursor_remaining}</div>
           <div class="label">Capacity</div>
-          <div>{{cursor_capacity}}</div>
+          <div>{cursor_capacity}</div>
           <div class="label">% Through</div>
-          <div>{{cursor_pct}}%</div>
+          <div>{cursor_pct}%</div>
         </div>
-        <div class="muted">Last cursor: {{cursor_timestamp}}</div>
+        <div class="muted">Last cursor: {cursor_timestamp}</div>
       </div>
       <div class="card">
         <h3>Recent Activity (5m)</h3>
         <div class="kv">
           <div class="label">Subscription Updates</div>
-          <div>{{activity_subs}}</div>
+          <div>{activity_subs}</div>
           <div class="label">Rotations</div>
-          <div>{{activity_rotations}}</div>
+          <div>{activity_rotations}</div>
           <div class="label">Parquet Writes</div>
-          <div>{{activity_writes}}</div>
+          <div>{activity_writes}</div>
         </div>
       </div>
     </div>
 
     <div class="card" style="margin-top:16px;">
-      <h3>Top Markets (updates)</h3>
+      <h3>Top Markets (updates, recent files)</h3>
       <table>
         <thead>
           <tr>
@@ -538,39 +861,164 @@ HTML_TEMPLATE = """<!doctype html>
             <th class="depth">Avg Depth</th>
           </tr>
         </thead>
-        <tbody>
-          {{top_markets_rows}}
+        <tbody id="top_markets_rows">
+          {top_markets_rows}
         </tbody>
       </table>
     </div>
+    {scripts}
   </body>
 </html>
 """
 
 
+# Static page for "/": the template with every field left as a placeholder
+# span, filled in by polling /data. It never changes while the server runs,
+# so it is gzipped and hashed once.
+SHELL_SCRIPT = """<script>
+      function text(v) { return v === null || v === undefined || v === "" ? "-" : String(v); }
+      function render(p) {
+        const c = p.collector, mf = p.metrics_fields || {}, sf = p.sizes_fields || {};
+        const cf = p.cursor_fields || {}, a = p.activity || {}, ds = p.data_stats;
+        const fields = {
+          venue: p.venue, date: p.date, refresh: p.refresh, updated_at: p.updated_at,
+          collector_status: c.running ? "RUNNING" : "STOPPED",
+          collector_pid: c.pid, collector_mem: c.memory_mb,
+          metric_msg_rate: mf.msg_rate, metric_update_rate: mf.update_rate,
+          metric_queue_depth: mf.queue_depth, metric_total_msg: mf.total_msg,
+          metric_total_updates: mf.total_updates,
+          total_files: ds.total_files, total_size: ds.total_size_gb, recent_files: ds.recent_files,
+          hours_with_data: ds.hours_with_data.join(", "),
+          markets_total: p.markets_total, markets_with_tokens: p.markets_with_tokens,
+          size_hot: sf.hot_size, size_warm: sf.warm_size,
+          cursor_start: cf.cursor_start, cursor_next: cf.cursor_next,
+          cursor_remaining: cf.cursor_remaining, cursor_capacity: cf.cursor_capacity,
+          cursor_pct: cf.cursor_pct,
+          activity_subs: a.subscriptions || 0, activity_rotations: a.rotations || 0,
+          activity_writes: a.writes || 0,
+          metrics_timestamp: p.metrics_timestamp, cursor_timestamp: p.cursor_timestamp,
+        };
+        document.querySelectorAll("[data-field]").forEach(function (el) {
+          el.textContent = text(fields[el.dataset.field]);
+        });
+        document.getElementById("collector_status").className = c.running ? "ok" : "warn";
+        const body = document.getElementById("top_markets_rows");
+        body.replaceChildren();
+        (p.top_markets.length ? p.top_markets : [null]).forEach(function (m) {
+          const tr = body.insertRow();
+          if (m === null) {
+            const td = tr.insertCell();
+            td.colSpan = 5;
+            td.textContent = "No market data available";
+            return;
+          }
+          [m.title || "N/A", m.outcome_id, m.updates, Number(m.avg_spread).toFixed(6),
+           Number(m.avg_depth).toFixed(2)].forEach(function (v) {
+            tr.insertCell().textContent = String(v);
+          });
+        });
+      }
+      function poll() {
+        fetch("/data", { cache: "no-cache" })
+          .then(function (r) { return r.json(); })
+          .then(function (p) { render(p); setTimeout(poll, p.refresh * 1000); })
+          .catch(function () { setTimeout(poll, 5000); });
+      }
+      poll();
+    </script>"""
+
+
+class _ShellFields(dict):
+    """format_map mapping that renders every field as an empty placeholder span."""
+
+    def __missing__(self, key: str) -> str:
+        return f'<span data-field="{key}">-</span>'
+
+
+HTML_SHELL = HTML_TEMPLATE.format_map(
+    _ShellFields(
+        meta_refresh="",
+        scripts=SHELL_SCRIPT,
+        collector_status_class="",
+        top_markets_rows='<tr><td colspan="5">Loading...</td></tr>',
+    )
+).encode()
+HTML_SHELL_GZ = gzip.compress(HTML_SHELL)
+HTML_SHELL_ETAG = '"' + hashlib.sha1(HTML_SHELL).hexdigest() + '"'
+
+
+class PooledHTTPServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer that serves requests on a bounded thread pool.
+
+    Concurrent clients share the cached payload, so a few workers suffice and
+    a burst of connections cannot spawn an unbounded number of threads.
+    """
+
+    def __init__(self, server_address: Tuple[str, int], handler_class: type, workers: int) -> None:
+        super().__init__(server_address, handler_class)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="http")
+
+    def process_request(self, request, client_address) -> None:
+        self._pool.submit(self.process_request_thread, request, client_address)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._pool.shutdown(wait=False)
+
+
 class Handler(BaseHTTPRequestHandler):
     def do_GET(self) -> None:
         if self.path == "/":
-            payload = self.server.data_builder.build_payload()
-            content = render_html(payload).encode()
-            self.send_response(200)
-            self.send_header("Content-Type", "text/html; charset=utf-8")
-            self.send_header("Content-Length", str(len(content)))
-            self.end_headers()
-            self.wfile.write(content)
+            self.send_shell()
+            return
+        if self.path == "/html":
+            # Server-rendered page for clients without JavaScript
+            content, etag = self.server.data_builder.get_html_response()
+            self.send_cached(content, etag, "text/html; charset=utf-8")
             return
         if self.path == "/data":
-            payload = self.server.data_builder.build_payload()
-            content = json.dumps(payload).encode()
-            self.send_response(200)
-            self.send_header("Content-Type", "application/json")
-            self.send_header("Content-Length", str(len(content)))
-            self.end_headers()
-            self.wfile.write(content)
+            content, etag = self.server.data_builder.get_json_response()
+            self.send_cached(content, etag, "application/json")
             return
         self.send_response(404)
         self.end_headers()
 
+    def send_cached(self, content: bytes, etag: str, content_type: str) -> None:
+        """Send a payload-derived body, or 304 if the client already has it."""
+        cache_control = f"max-age={self.server.refresh}"
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", cache_control)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", cache_control)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def send_shell(self) -> None:
+        if self.headers.get("If-None-Match") == HTML_SHELL_ETAG:
+            self.send_response(304)
+            self.send_header("ETag", HTML_SHELL_ETAG)
+            self.end_headers()
+            return
+        gzip_ok = "gzip" in self.headers.get("Accept-Encoding", "")
+        content = HTML_SHELL_GZ if gzip_ok else HTML_SHELL
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        if gzip_ok:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Content-Length", str(len(content)))
+        self.send_header("ETag", HTML_SHELL_ETAG)
+        self.send_header("Cache-Control", "max-age=60")
+        self.end_headers()
+        self.wfile.write(content)
+
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="HTML Dashboard for Market Surveillance")
@@ -579,12 +1027,13 @@ def main() -> None:
     parser.add_argument("--refresh", type=int, default=5, help="Refresh interval in seconds")
     parser.add_argument("--port", type=int, default=8787, help="HTTP port (default: 8787)")
     parser.add_argument("--data-dir", default="data", help="Base data directory (default: data)")
+    parser.add_argument("--workers", type=int, default=8, help="HTTP worker threads (default: 8)")
     args = parser.parse_args()
 
     date = args.date or datetime.now(timezone.utc).strftime("%Y-%m-%d")
     data_builder = DashboardData(args.venue, date, args.data_dir, args.refresh)
 
-    server = HTTPServer(("0.0.0.0", args.port), Handler)
+    server = PooledHTTPServer(("0.0.0.0", args.port), Handler, args.workers)
     server.data_builder = data_builder  # type: ignore[attr-defined]
     server.refresh = args.refresh  # type: ignore[attr-defined]
 
@@ -593,6 +1042,8 @@ def main() -> None:
         server.serve_forever()
     except KeyboardInterrupt:
         pass
+    finally:
+        server.server_close()
 
 
 if __name__ == "__main__":
@@ -3,6 +3,8 @@ import argparse
 from pathlib import Path
 
 import polars as pl
+import pyarrow as pa
+import pyarrow.dataset as ds
 
 
 def parse_args() -> argparse.Namespace:
@@ -28,15 +30,25 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
+HOUR_SCHEMA = pa.schema([("hour", pa.string())])
+HOUR_PARTITIONING = ds.partitioning(HOUR_SCHEMA, flavor="hive")
+
+
 def collect_files(base_dir: Path, hour: str | None) -> list[Path]:
-    if hour is not None:
-        hour_dir = base_dir / f"hour={hour.zfill(2)}"
-        return sorted(hour_dir.glob("*.parquet")) if hour_dir.exists() else []
-    files: list[Path] = []
-    for hour_dir in sorted(base_dir.glob("hour=*")):
-        if hour_dir.is_dir():
-            files.extend(sorted(hour_dir.glob("*.parquet")))
-    return files
+    if not base_dir.exists():
+        return []
+    # Arrow lists the day's hour=HH directories once and prunes partitions
+    # by the hour filter before any file is touched (the explicit schema
+    # skips footer inspection, which could hit an in-progress .tmp file).
+    dataset = ds.dataset(
+        base_dir, schema=HOUR_SCHEMA, format="parquet", partitioning=HOUR_PARTITIONING
+    )
+    expr = ds.field("hour") == hour.zfill(2) if hour is not None else None
+    return sorted(
+        Path(fragment.path)
+        for fragment in dataset.get_fragments(filter=expr)
+        if fragment.path.endswith(".parquet")
+    )
 
 
 def main() -> None:
@@ -61,28 +73,31 @@ def main() -> None:
         ]
     )
 
-    with_source = lf.filter(pl.col("source_ts").is_not_null()).with_columns(
-        (pl.col("ts_recv") - pl.col("source_ts")).alias("latency_ms")
+    latency_ms = (pl.col("ts_recv") - pl.col("source_ts")).filter(
+        pl.col("source_ts").is_not_null()
     )
 
+    # Row counts and latency stats in one plan so the files are scanned once;
+    # the streaming engine processes the files in batches instead of loading
+    # every ts_recv/source_ts value into memory first.
     stats = (
-        with_source.select(
+        lf.select(
             [
-                pl.len().alias("rows_with_source_ts"),
-                pl.col("latency_ms").min().alias("min_ms"),
-                pl.col("latency_ms").mean().alias("mean_ms"),
-                pl.col("latency_ms").median().alias("p50_ms"),
-                pl.col("latency_ms").quantile(0.95, "nearest").alias("p95_ms"),
-                pl.col("latency_ms").quantile(0.99, "nearest").alias("p99_ms"),
-                pl.col("latency_ms").max().alias("max_ms"),
-                (pl.col("latency_ms") < 0).sum().alias("negative_ms"),
+                pl.len().alias("total_rows"),
+                pl.col("source_ts").is_not_null().sum().alias("rows_with_source_ts"),
+                latency_ms.min().alias("min_ms"),
+                latency_ms.mean().alias("mean_ms"),
+                latency_ms.median().alias("p50_ms"),
+                latency_ms.quantile(0.95, "nearest").alias("p95_ms"),
+                latency_ms.quantile(0.99, "nearest").alias("p99_ms"),
+                latency_ms.max().alias("max_ms"),
+                (latency_ms < 0).sum().alias("negative_ms"),
             ]
         )
-        .collect()
+        .collect(engine="streaming")
     )
 
-    total_rows = lf.select(pl.len().alias("total_rows")).collect()
-    total = total_rows.item(0, "total_rows")
+    total = stats.item(0, "total_rows")
     with_source_count = stats.item(0, "rows_with_source_ts")
     missing = total - with_source_count
 
@@ -9,9 +9,14 @@ Uses an LLM to:
 """
 
 import argparse
+import asyncio
+import functools
 import json
 import os
+import sqlite3
 import sys
+import time
+import zlib
 from dataclasses import dataclass, asdict
 from datetime import datetime, timezone
 from pathlib import Path
@@ -24,6 +29,20 @@ except ImportError:
     print("ERROR: polars not installed. pip install polars")
     sys.exit(1)
 
+try:
+    from orjson import OPT_APPEND_NEWLINE, dumps as json_dumps, loads as json_loads
+
+    # One JSONL record, newline included, without a bytes concat per line
+    json_dumps_line = functools.partial(json_dumps, option=OPT_APPEND_NEWLINE)
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj: object) -> bytes:
+        return json.dumps(obj).encode()
+
+    def json_dumps_line(obj: object) -> bytes:
+        return (json.dumps(obj) + "\n").encode()
+
 # Try to import LLM libraries
 ANTHROPIC_AVAILABLE = False
 OPENAI_AVAILABLE = False
@@ -47,6 +66,11 @@ try:
 except ImportError:
     pass
 
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
 
 @dataclass
 class SymbolicProposition:
@@ -90,6 +114,35 @@ class LogicalConstraint:
     reasoning: str
 
 
+# Column types for the parquet outputs, following the dataclasses above
+PROPOSITION_SCHEMA = {
+    "market_id": pl.Utf8,
+    "title": pl.Utf8,
+    "proposition_type": pl.Utf8,
+    "underlier": pl.Utf8,
+    "strike": pl.Float64,
+    "comparator": pl.Utf8,
+    "company_ticker": pl.Utf8,
+    "metric": pl.Utf8,
+    "window_start": pl.Utf8,
+    "window_end": pl.Utf8,
+    "symbolic_form": pl.Utf8,
+    "confidence": pl.Float64,
+    "reasoning": pl.Utf8,
+    "raw_rules": pl.Utf8,
+    "error": pl.Utf8,
+}
+
+CONSTRAINT_SCHEMA = {
+    "constraint_type": pl.Utf8,
+    "market_ids": pl.List(pl.Utf8),
+    "relation": pl.Utf8,
+    "symbolic_form": pl.Utf8,
+    "confidence": pl.Float64,
+    "reasoning": pl.Utf8,
+}
+
+
 SYSTEM_PROMPT = """You are an expert at converting prediction market rules into symbolic logic.
 
 Given a market's title and rules text, extract:
@@ -107,15 +160,7 @@ Be precise about distinguishing:
 
 Return JSON only, no markdown."""
 
-EXTRACTION_PROMPT = """Analyze this prediction market:
-
-Title: {title}
-
-Rules:
-{rules}
-
-Extract the proposition and return ONLY valid JSON:
-{{
+PROPOSITION_JSON = """{{
     "proposition_type": "price_target|earnings_beat|election|sports|binary_event|other",
     "underlier": "asset symbol or null",
     "strike": number or null,
@@ -129,6 +174,39 @@ Extract the proposition and return ONLY valid JSON:
     "reasoning": "brief explanation"
 }}"""
 
+EXTRACTION_PROMPT = """Analyze this prediction market:
+
+Title: {title}
+
+Rules:
+{rules}
+
+Extract the proposition and return ONLY valid JSON:
+""" + PROPOSITION_JSON + """
+
+Reasoning MUST be <=20 words."""
+
+MULTI_EXTRACTION_PROMPT = """Analyze these {count} prediction markets:
+
+{markets}
+
+Extract each market's proposition and return ONLY valid JSON of the form
+{{"results": [...]}}, with exactly {count} objects in the order the markets are given.
+Each object has this shape:
+""" + PROPOSITION_JSON + """
+
+Reasoning MUST be <=20 words."""
+
+MULTI_MARKET_ITEM = """<m id="{index}">
+Title: {title}
+
+Rules:
+{rules}
+</m>"""
+
+
+# A ~10-field extraction answer fits comfortably; the cap stops rambling output
+EXTRACTION_MAX_TOKENS = 300
 
 BATCH_CONSTRAINT_PROMPT = """Given these parsed propositions, identify logical constraints between them.
 
@@ -152,12 +230,104 @@ Return JSON array of constraints:
 }}]"""
 
 
+def strip_code_fence(text: str) -> str:
+    """Drop a markdown code fence (and its json tag) wrapped around a response."""
+    if text.startswith("```"):
+        text = text.split("```")[1]
+        if text.startswith("json"):
+            text = text[4:]
+    return text
+
+
+@functools.lru_cache(maxsize=None)
+def rules_encoding():
+    """Tokenizer used to budget rules text, or None to estimate from characters."""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # The encoding is downloaded on first use; carry on without it offline
+        return None
+
+
+def truncate_rules(rules: str, max_tokens: int) -> str:
+    """Trim rules to about max_tokens, keeping the opening and the closing text.
+    
+    Resolution conditions tend to sit at the end of a rules document, so a
+    third of the budget goes to the tail rather than cutting it off.
+    """
+    encoding = rules_encoding()
+    if encoding is None:
+        # Roughly 4 characters per token
+        limit = max_tokens * 4
+        if len(rules) <= limit:
+            return rules
+        head = limit * 2 // 3
+        return rules[:head] + "\n...\n" + rules[len(rules) - (limit - head):]
+    
+    tokens = encoding.encode(rules, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return rules
+    head = max_tokens * 2 // 3
+    return encoding.decode(tokens[:head]) + "\n...\n" + encoding.decode(tokens[len(tokens) - (max_tokens - head):])
+
+
 class LLMParser:
     """Base class for LLM-based parsing."""
     
+    # Token budget for the rules text in each extraction prompt
+    max_rules_tokens = 750
+    
+    def extraction_prompt(self, title: str, rules: str) -> str:
+        return EXTRACTION_PROMPT.format(title=title, rules=truncate_rules(rules, self.max_rules_tokens))
+    
     def parse_single(self, title: str, rules: str) -> dict:
         raise NotImplementedError
     
+    async def parse_single_async(self, title: str, rules: str) -> dict:
+        # Providers without an async client run the blocking call on a worker thread
+        return await asyncio.to_thread(self.parse_single, title, rules)
+    
+    def parse_batch(self, items: List[tuple], poll_interval: float = 30.0) -> Dict[str, dict]:
+        """Parse (custom_id, title, rules) items through a batch job, keyed by custom_id."""
+        raise NotImplementedError
+    
+    def complete(self, prompt: str, max_tokens: int) -> str:
+        """Send one user prompt under SYSTEM_PROMPT and return the raw response text."""
+        raise NotImplementedError
+    
+    async def complete_async(self, prompt: str, max_tokens: int) -> str:
+        return await asyncio.to_thread(self.complete, prompt, max_tokens)
+    
+    async def parse_multi_async(self, items: List[tuple]) -> List[dict]:
+        """Parse several (title, rules) items in one request; results follow input order.
+        
+        Sharing one request amortises the system prompt and a round-trip across
+        markets. If the reply is not one object per market, each market is
+        retried on its own.
+        """
+        if len(items) == 1:
+            return [await self.parse_single_async(*items[0])]
+        
+        markets = "\n\n".join(
+            MULTI_MARKET_ITEM.format(index=index, title=title, rules=truncate_rules(rules, self.max_rules_tokens))
+            for index, (title, rules) in enumerate(items)
+        )
+        prompt = MULTI_EXTRACTION_PROMPT.format(count=len(items), markets=markets)
+        try:
+            text = strip_code_fence((await self.complete_async(prompt, EXTRACTION_MAX_TOKENS * len(items))).strip())
+            start = text.find("{")
+            end = text.rfind("}") + 1
+            if start >= 0 and end > start:
+                text = text[start:end]
+            results = json_loads(text)["results"]
+            if len(results) == len(items) and all(isinstance(r, dict) for r in results):
+                return results
+        except Exception:
+            pass
+        return [await self.parse_single_async(title, rules) for title, rules in items]
+    
     def find_constraints(self, propositions: List[dict]) -> List[dict]:
         raise NotImplementedError
 
@@ -165,28 +335,83 @@ class LLMParser:
 class AnthropicParser(LLMParser):
     def __init__(self, model: str = "claude-sonnet-4-20250514"):
         self.client = anthropic.Anthropic()
+        # The SDK retries 429/5xx responses with backoff on its own
+        self.async_client = anthropic.AsyncAnthropic(max_retries=5)
         self.model = model
     
     def parse_single(self, title: str, rules: str) -> dict:
-        prompt = EXTRACTION_PROMPT.format(title=title, rules=rules[:3000])
+        prompt = self.extraction_prompt(title, rules)
         
         try:
             response = self.client.messages.create(
                 model=self.model,
-                max_tokens=1024,
+                max_tokens=EXTRACTION_MAX_TOKENS,
                 system=SYSTEM_PROMPT,
                 messages=[{"role": "user", "content": prompt}]
             )
-            text = response.content[0].text.strip()
             # Extract JSON from response
-            if text.startswith("```"):
-                text = text.split("```")[1]
-                if text.startswith("json"):
-                    text = text[4:]
-            return json.loads(text)
+            return json.loads(strip_code_fence(response.content[0].text.strip()))
         except Exception as e:
             return {"error": str(e), "confidence": 0.0}
     
+    async def parse_single_async(self, title: str, rules: str) -> dict:
+        prompt = self.extraction_prompt(title, rules)
+        
+        try:
+            response = await self.async_client.messages.create(
+                model=self.model,
+                max_tokens=EXTRACTION_MAX_TOKENS,
+                system=SYSTEM_PROMPT,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            return json.loads(strip_code_fence(response.content[0].text.strip()))
+        except Exception as e:
+            return {"error": str(e), "confidence": 0.0}
+    
+    async def complete_async(self, prompt: str, max_tokens: int) -> str:
+        response = await self.async_client.messages.create(
+            model=self.model,
+            max_tokens=max_tokens,
+            system=SYSTEM_PROMPT,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        return response.content[0].text
+    
+    def parse_batch(self, items: List[tuple], poll_interval: float = 30.0) -> Dict[str, dict]:
+        batch = self.client.messages.batches.create(requests=[
+            {
+                "custom_id": custom_id,
+                "params": {
+                    "model": self.model,
+                    "max_tokens": EXTRACTION_MAX_TOKENS,
+                    "system": SYSTEM_PROMPT,
+                    "messages": [{"role": "user", "content": self.extraction_prompt(title, rules)}],
+                },
+            }
+            for custom_id, title, rules in items
+        ])
+        print(f"  Submitted batch {batch.id} ({len(items)} requests)")
+        
+        while batch.processing_status != "ended":
+            time.sleep(poll_interval)
+            batch = self.client.messages.batches.retrieve(batch.id)
+            counts = batch.request_counts
+            print(f"\r  Batch {batch.id}: {counts.processing} processing, "
+                  f"{counts.succeeded} succeeded, {counts.errored} errored", end="", flush=True)
+        print()
+        
+        results = {}
+        for entry in self.client.messages.batches.results(batch.id):
+            if entry.result.type != "succeeded":
+                results[entry.custom_id] = {"error": f"batch request {entry.result.type}", "confidence": 0.0}
+                continue
+            try:
+                text = entry.result.message.content[0].text.strip()
+                results[entry.custom_id] = json.loads(strip_code_fence(text))
+            except Exception as e:
+                results[entry.custom_id] = {"error": str(e), "confidence": 0.0}
+        return results
+    
     def find_constraints(self, propositions: List[dict]) -> List[dict]:
         # Summarize propositions for the prompt
         summary = []
@@ -209,11 +434,7 @@ class AnthropicParser(LLMParser):
                 messages=[{"role": "user", "content": prompt}]
             )
             text = response.content[0].text.strip()
-            if text.startswith("```"):
-                text = text.split("```")[1]
-                if text.startswith("json"):
-                    text = text[4:]
-            return json.loads(text)
+            return json.loads(strip_code_fence(text))
         except Exception as e:
             print(f"Constraint detection error: {e}")
             return []
@@ -222,29 +443,114 @@ class AnthropicParser(LLMParser):
 class OpenAIParser(LLMParser):
     def __init__(self, model: str = "gpt-4o"):
         self.client = openai.OpenAI()
+        self.async_client = openai.AsyncOpenAI(max_retries=5)
         self.model = model
     
     def parse_single(self, title: str, rules: str) -> dict:
-        prompt = EXTRACTION_PROMPT.format(title=title, rules=rules[:3000])
+        prompt = self.extraction_prompt(title, rules)
         
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
-                max_tokens=1024,
+                max_tokens=EXTRACTION_MAX_TOKENS,
+                response_format={"type": "json_object"},
                 messages=[
                     {"role": "system", "content": SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ]
             )
-            text = response.choices[0].message.content.strip()
-            if text.startswith("```"):
-                text = text.split("```")[1]
-                if text.startswith("json"):
-                    text = text[4:]
-            return json.loads(text)
+            return json.loads(strip_code_fence(response.choices[0].message.content.strip()))
+        except Exception as e:
+            return {"error": str(e), "confidence": 0.0}
+    
+    async def parse_single_async(self, title: str, rules: str) -> dict:
+        prompt = self.extraction_prompt(title, rules)
+        
+        try:
+            response = await self.async_client.chat.completions.create(
+                model=self.model,
+                max_tokens=EXTRACTION_MAX_TOKENS,
+                response_format={"type": "json_object"},
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ]
+            )
+            return json.loads(strip_code_fence(response.choices[0].message.content.strip()))
         except Exception as e:
             return {"error": str(e), "confidence": 0.0}
     
+    async def complete_async(self, prompt: str, max_tokens: int) -> str:
+        response = await self.async_client.chat.completions.create(
+            model=self.model,
+            max_tokens=max_tokens,
+            response_format={"type": "json_object"},
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ]
+        )
+        return response.choices[0].message.content
+    
+    def parse_batch(self, items: List[tuple], poll_interval: float = 30.0) -> Dict[str, dict]:
+        lines = [
+            json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model,
+                    "max_tokens": EXTRACTION_MAX_TOKENS,
+                    "response_format": {"type": "json_object"},
+                    "messages": [
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": self.extraction_prompt(title, rules)}
+                    ],
+                },
+            })
+            for custom_id, title, rules in items
+        ]
+        batch_file = self.client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode()),
+            purpose="batch",
+        )
+        batch = self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        print(f"  Submitted batch {batch.id} ({len(items)} requests)")
+        
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            time.sleep(poll_interval)
+            batch = self.client.batches.retrieve(batch.id)
+            counts = batch.request_counts
+            if counts is not None:
+                print(f"\r  Batch {batch.id}: {batch.status}, {counts.completed}/{counts.total} completed, "
+                      f"{counts.failed} failed", end="", flush=True)
+        print()
+        
+        results = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                custom_id = entry.get("custom_id")
+                try:
+                    if entry.get("error"):
+                        raise RuntimeError(entry["error"].get("message", "batch request failed"))
+                    body = entry["response"]["body"]
+                    if entry["response"].get("status_code") != 200:
+                        raise RuntimeError(body.get("error", {}).get("message", "batch request failed"))
+                    text = body["choices"][0]["message"]["content"].strip()
+                    results[custom_id] = json.loads(strip_code_fence(text))
+                except Exception as e:
+                    results[custom_id] = {"error": str(e), "confidence": 0.0}
+        return results
+    
     def find_constraints(self, propositions: List[dict]) -> List[dict]:
         summary = []
         for p in propositions[:100]:
@@ -268,11 +574,7 @@ class OpenAIParser(LLMParser):
                 ]
             )
             text = response.choices[0].message.content.strip()
-            if text.startswith("```"):
-                text = text.split("```")[1]
-                if text.startswith("json"):
-                    text = text[4:]
-            return json.loads(text)
+            return json.loads(strip_code_fence(text))
         except Exception as e:
             print(f"Constraint detection error: {e}")
             return []
@@ -281,12 +583,14 @@ class OpenAIParser(LLMParser):
 class OllamaParser(LLMParser):
     """Local LLM parser using Ollama."""
     
+    max_rules_tokens = 500  # Smaller context for local models
+    
     def __init__(self, model: str = "qwen2.5:7b", base_url: str = "http://localhost:11434"):
         self.model = model
         self.base_url = base_url
     
     def parse_single(self, title: str, rules: str) -> dict:
-        prompt = EXTRACTION_PROMPT.format(title=title, rules=rules[:2000])
+        prompt = self.extraction_prompt(title, rules)
         
         try:
             response = requests.post(
@@ -295,7 +599,7 @@ class OllamaParser(LLMParser):
                     "model": self.model,
                     "prompt": f"{SYSTEM_PROMPT}\n\n{prompt}",
                     "stream": False,
-                    "options": {"temperature": 0.1}
+                    "options": {"temperature": 0.1, "num_predict": EXTRACTION_MAX_TOKENS}
                 },
                 timeout=60
             )
@@ -320,6 +624,20 @@ class OllamaParser(LLMParser):
         except Exception as e:
             return {"error": str(e), "confidence": 0.0}
     
+    def complete(self, prompt: str, max_tokens: int) -> str:
+        response = requests.post(
+            f"{self.base_url}/api/generate",
+            json={
+                "model": self.model,
+                "prompt": f"{SYSTEM_PROMPT}\n\n{prompt}",
+                "stream": False,
+                "options": {"temperature": 0.1, "num_predict": max_tokens}
+            },
+            timeout=120
+        )
+        response.raise_for_status()
+        return response.json().get("response", "")
+    
     def find_constraints(self, propositions: List[dict]) -> List[dict]:
         summary = []
         for p in propositions[:50]:  # Smaller batch for local model
@@ -368,21 +686,164 @@ def load_rules(data_dir: Path, venue: str, date: str) -> List[dict]:
     path = data_dir / "rules" / f"venue={venue}" / f"date={date}" / "rules.jsonl"
     rules = []
     if path.exists():
-        for line in path.read_text().splitlines():
-            if line.strip():
-                try:
-                    rules.append(json.loads(line))
-                except:
-                    pass
+        with path.open("rb") as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        rules.append(json_loads(line))
+                    except ValueError:
+                        pass
     return rules
 
 
+def records_frame(records: List[dict], schema: Dict[str, Any]) -> pl.DataFrame:
+    """Build a typed frame from LLM output; values that don't fit a column become null."""
+    columns = {}
+    for name, dtype in schema.items():
+        values = [r.get(name) if isinstance(r, dict) else None for r in records]
+        if isinstance(dtype, pl.List):
+            values = [v if isinstance(v, list) else None for v in values]
+        columns[name] = pl.Series(name, values, dtype=dtype, strict=False)
+    return pl.DataFrame(columns)
+
+
 def cache_key(market_id: str, rules_text: str) -> str:
     """Generate cache key for parsed result."""
     content = f"{market_id}:{rules_text}"
     return hashlib.sha256(content.encode()).hexdigest()[:16]
 
 
+class ParseCache:
+    """Parsed results for one venue/date in a single SQLite file, keyed by cache_key()."""
+    
+    def __init__(self, cache_dir: Path, flush_every: int = 32):
+        self.cache_dir = cache_dir
+        self.flush_every = flush_every
+        self.conn = sqlite3.connect(cache_dir / "cache.sqlite")
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS cache(key TEXT PRIMARY KEY, result BLOB)")
+        self.pending: List[tuple] = []
+    
+    def get_many(self, keys: List[str]) -> Dict[str, dict]:
+        """Cached results for keys, fetched with a few IN queries rather than one per key."""
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        for start in range(0, len(unique), 500):
+            chunk = unique[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for key, blob in self.conn.execute(f"SELECT key, result FROM cache WHERE key IN ({placeholders})", chunk):
+                try:
+                    # Rows are zlib-compressed JSON; plain JSON rows start with "{"
+                    found[key] = json_loads(blob if blob[:1] == b"{" else zlib.decompress(blob))
+                except (ValueError, zlib.error):
+                    pass
+        
+        # Results cached before the SQLite store were one JSON file per key
+        for key in unique:
+            if key in found:
+                continue
+            legacy = self.cache_dir / f"{key}.json"
+            if legacy.exists():
+                try:
+                    found[key] = json_loads(legacy.read_bytes())
+                except ValueError:
+                    continue
+                self.put(key, found[key])
+        return found
+    
+    def put(self, key: str, result: dict) -> None:
+        # raw_rules repeats the full rules text, which compresses well
+        self.pending.append((key, zlib.compress(json_dumps(result))))
+        if len(self.pending) >= self.flush_every:
+            self.flush()
+    
+    def flush(self) -> None:
+        if self.pending:
+            with self.conn:
+                self.conn.executemany("INSERT OR REPLACE INTO cache(key, result) VALUES (?, ?)", self.pending)
+            self.pending.clear()
+    
+    def close(self) -> None:
+        self.flush()
+        self.conn.close()
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at a per-minute rate."""
+    
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.level = self.capacity
+        self.rate = self.capacity / 60.0
+        self.updated = time.monotonic()
+    
+    async def acquire(self, amount: float = 1.0) -> None:
+        # A request larger than the whole bucket waits for a full bucket
+        amount = min(amount, self.capacity)
+        while True:
+            now = time.monotonic()
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.level >= amount:
+                self.level -= amount
+                return
+            await asyncio.sleep((amount - self.level) / self.rate)
+
+
+def estimate_request_tokens(parser: LLMParser, items: List[tuple]) -> int:
+    """Rough input + output token cost of extracting (title, rules) items in one request."""
+    prompt_tokens = (len(SYSTEM_PROMPT) + len(EXTRACTION_PROMPT)) // 4
+    for title, rules in items:
+        prompt_tokens += len(title) // 4 + min(len(rules) // 4, parser.max_rules_tokens)
+    return prompt_tokens + EXTRACTION_MAX_TOKENS * len(items)
+
+
+async def parse_pending(
+    parser: LLMParser,
+    pending: List[tuple],
+    results: List[Optional[dict]],
+    cache: ParseCache,
+    concurrency: int,
+    markets_per_request: int = 1,
+    rpm: Optional[int] = None,
+    tpm: Optional[int] = None,
+) -> None:
+    """Parse uncached rules concurrently, caching each result as it completes.
+    
+    rpm/tpm pace requests under the provider's per-minute limits, so the run
+    holds steady below them instead of bouncing off 429s.
+    """
+    sem = asyncio.Semaphore(max(1, concurrency))
+    requests_bucket = TokenBucket(rpm) if rpm else None
+    tokens_bucket = TokenBucket(tpm) if tpm else None
+    done = 0
+    
+    async def worker(chunk: List[tuple]) -> None:
+        nonlocal done
+        items = [(title, rules_text) for _, _, title, rules_text, _ in chunk]
+        async with sem:
+            if requests_bucket is not None:
+                await requests_bucket.acquire()
+            if tokens_bucket is not None:
+                await tokens_bucket.acquire(estimate_request_tokens(parser, items))
+            parsed = await parser.parse_multi_async(items)
+        for (i, market_id, title, rules_text, key), result in zip(chunk, parsed):
+            result["market_id"] = market_id
+            result["title"] = title
+            result["raw_rules"] = rules_text
+            
+            # Cache result
+            cache.put(key, result)
+            
+            results[i] = result
+        done += len(chunk)
+        print(f"\r  Parsed {done}/{len(pending)}: {chunk[-1][2][:50]}...", end="", flush=True)
+    
+    step = max(1, markets_per_request)
+    await asyncio.gather(*(worker(pending[j:j + step]) for j in range(0, len(pending), step)))
+
+
 def run_llm_parsing(
     data_dir: str,
     venue: str,
@@ -391,11 +852,22 @@ def run_llm_parsing(
     model: Optional[str] = None,
     limit: Optional[int] = None,
     use_cache: bool = True,
+    concurrency: int = 16,
+    batch: bool = False,
+    max_rules_tokens: Optional[int] = None,
+    emit_jsonl: bool = False,
+    markets_per_request: int = 1,
+    rpm: Optional[int] = None,
+    tpm: Optional[int] = None,
 ):
     """Run LLM-based parsing on rules."""
     
     data_path = Path(data_dir)
     
+    if batch and provider not in ("anthropic", "openai"):
+        print("ERROR: --batch needs a provider with a batch API (anthropic or openai)")
+        sys.exit(1)
+    
     # Select LLM provider
     if provider == "anthropic":
         if not ANTHROPIC_AVAILABLE:
@@ -417,6 +889,9 @@ def run_llm_parsing(
         print(f"ERROR: Unknown provider {provider}")
         sys.exit(1)
     
+    if max_rules_tokens:
+        parser.max_rules_tokens = max_rules_tokens
+    
     # Load rules
     rules = load_rules(data_path, venue, date)
     print(f"Loaded {len(rules)} rules")
@@ -429,50 +904,71 @@ def run_llm_parsing(
     cache_dir = data_path / "llm_cache" / f"venue={venue}" / f"date={date}"
     cache_dir.mkdir(parents=True, exist_ok=True)
     
-    # Parse each rule
-    propositions = []
-    for i, rule in enumerate(rules):
-        market_id = rule.get("market_id", "")
-        title = rule.get("title", "")
-        rules_text = rule.get("raw_rules_text", "")
-        
-        # Check cache
-        key = cache_key(market_id, rules_text)
-        cache_file = cache_dir / f"{key}.json"
-        
-        if use_cache and cache_file.exists():
-            try:
-                result = json.loads(cache_file.read_text())
+    cache = ParseCache(cache_dir)
+    try:
+        # Serve cached results first; everything else goes to the LLM
+        keys = [cache_key(rule.get("market_id", ""), rule.get("raw_rules_text", "")) for rule in rules]
+        cached = cache.get_many(keys) if use_cache else {}
+        results: List[Optional[dict]] = [None] * len(rules)
+        pending = []
+        for i, (rule, key) in enumerate(zip(rules, keys)):
+            market_id = rule.get("market_id", "")
+            title = rule.get("title", "")
+            rules_text = rule.get("raw_rules_text", "")
+            
+            if key in cached:
+                # Copy: identical rules share one cached entry
+                result = dict(cached[key])
                 result["market_id"] = market_id
                 result["title"] = title
                 result["raw_rules"] = rules_text
-                propositions.append(result)
+                results[i] = result
                 continue
-            except:
-                pass
-        
-        # Parse with LLM
-        print(f"\r  Parsing {i+1}/{len(rules)}: {title[:50]}...", end="", flush=True)
-        result = parser.parse_single(title, rules_text)
-        result["market_id"] = market_id
-        result["title"] = title
-        result["raw_rules"] = rules_text
-        
-        # Cache result
-        cache_file.write_text(json.dumps(result, indent=2))
+            
+            pending.append((i, market_id, title, rules_text, key))
         
-        propositions.append(result)
+        if pending and batch:
+            # One batch job for everything uncached; the cache key doubles as custom_id
+            print(f"  {len(rules) - len(pending)} cached, submitting {len(pending)} as a batch job")
+            items = {key: (key, title, rules_text) for _, _, title, rules_text, key in pending}
+            parsed = parser.parse_batch(list(items.values()))
+            for i, market_id, title, rules_text, key in pending:
+                result = dict(parsed.get(key) or {"error": "missing from batch results", "confidence": 0.0})
+                result["market_id"] = market_id
+                result["title"] = title
+                result["raw_rules"] = rules_text
+                
+                # Cache result
+                cache.put(key, result)
+                
+                results[i] = result
+        elif pending:
+            # Parse with LLM, keeping up to `concurrency` requests in flight
+            print(f"  {len(rules) - len(pending)} cached, parsing {len(pending)} with concurrency {concurrency}")
+            asyncio.run(parse_pending(parser, pending, results, cache, concurrency, markets_per_request, rpm, tpm))
+    finally:
+        # Persist whatever completed, even if the run is interrupted
+        cache.close()
+    
+    propositions = [r for r in results if r is not None]
     
     print(f"\n\nParsed {len(propositions)} propositions")
     
     # Summarize by type
-    by_type = {}
-    for p in propositions:
-        t = p.get("proposition_type", "unknown")
-        by_type[t] = by_type.get(t, 0) + 1
+    type_counts = (
+        pl.DataFrame(
+            {"proposition_type": [p.get("proposition_type", "unknown") for p in propositions]},
+            schema={"proposition_type": pl.Utf8},
+            strict=False,
+        )
+        .group_by("proposition_type", maintain_order=True)
+        .len()
+        .sort("len", descending=True, maintain_order=True)
+    )
+    by_type = dict(type_counts.iter_rows())
     
     print("\nProposition types:")
-    for t, count in sorted(by_type.items(), key=lambda x: -x[1]):
+    for t, count in by_type.items():
         print(f"  {t}: {count}")
     
     # Find high-confidence price targets
@@ -482,19 +978,31 @@ def run_llm_parsing(
     
     print(f"\nHigh-confidence price targets: {len(price_targets)}")
     
-    # Group by underlier
-    by_underlier = {}
-    for p in price_targets:
-        u = p.get("underlier", "unknown")
-        if u not in by_underlier:
-            by_underlier[u] = []
-        by_underlier[u].append(p)
+    # Group by underlier; a ladder needs at least two markets
+    strike = pl.col("strike").filter(pl.col("strike") != 0).drop_nulls()
+    ladders = (
+        pl.DataFrame(
+            {
+                "underlier": [p.get("underlier", "unknown") for p in price_targets],
+                "strike": [p.get("strike") for p in price_targets],
+            },
+            schema={"underlier": pl.Utf8, "strike": pl.Float64},
+            strict=False,
+        )
+        .group_by("underlier", maintain_order=True)
+        .agg(
+            pl.len().alias("markets"),
+            strike.sort().head(5).alias("strikes"),
+            strike.len().alias("n_strikes"),
+        )
+        .filter(pl.col("markets") >= 2)
+        .sort("markets", descending=True, maintain_order=True)
+    )
     
     print("\nPrice ladders detected:")
-    for underlier, markets in sorted(by_underlier.items(), key=lambda x: -len(x[1])):
-        if len(markets) >= 2:
-            strikes = sorted([m.get("strike", 0) for m in markets if m.get("strike")])
-            print(f"  {underlier}: {len(markets)} markets, strikes: {strikes[:5]}{'...' if len(strikes) > 5 else ''}")
+    for underlier, markets, strikes, n_strikes in ladders.iter_rows():
+        strikes = [int(s) if s.is_integer() else s for s in strikes]
+        print(f"  {underlier}: {markets} markets, strikes: {strikes}{'...' if n_strikes > 5 else ''}")
     
     # Find constraints using LLM
     print("\nFinding logical constraints...")
@@ -506,19 +1014,23 @@ def run_llm_parsing(
     output_dir.mkdir(parents=True, exist_ok=True)
     
     # Save propositions
-    props_file = output_dir / "propositions.jsonl"
-    with open(props_file, "w") as f:
-        for p in propositions:
-            f.write(json.dumps(p) + "\n")
+    props_file = output_dir / "propositions.parquet"
+    records_frame(propositions, PROPOSITION_SCHEMA).write_parquet(props_file, compression="zstd")
     print(f"\nWrote propositions to {props_file}")
     
     # Save constraints
-    constraints_file = output_dir / "constraints.jsonl"
-    with open(constraints_file, "w") as f:
-        for c in constraints:
-            f.write(json.dumps(c) + "\n")
+    constraints_file = output_dir / "constraints.parquet"
+    records_frame(constraints, CONSTRAINT_SCHEMA).write_parquet(constraints_file, compression="zstd")
     print(f"Wrote constraints to {constraints_file}")
     
+    if emit_jsonl:
+        # Raw LLM output, including fields outside the parquet schema
+        with open(output_dir / "propositions.jsonl", "wb") as f:
+            f.writelines(map(json_dumps_line, propositions))
+        with open(output_dir / "constraints.jsonl", "wb") as f:
+            f.writelines(map(json_dumps_line, constraints))
+        print(f"Wrote JSONL copies to {output_dir}")
+    
     # Summary report
     report = {
         "venue": venue,
@@ -527,7 +1039,7 @@ def run_llm_parsing(
         "parsed": len(propositions),
         "by_type": by_type,
         "price_targets": len(price_targets),
-        "ladders": {u: len(m) for u, m in by_underlier.items() if len(m) >= 2},
+        "ladders": dict(ladders.select("underlier", "markets").iter_rows()),
         "constraints": len(constraints),
     }
     
@@ -547,6 +1059,17 @@ def main():
     parser.add_argument("--model", help="Model name (provider-specific)")
     parser.add_argument("--limit", type=int, help="Limit number of rules to parse")
     parser.add_argument("--no-cache", action="store_true", help="Disable caching")
+    parser.add_argument("--concurrency", type=int, default=16, help="Max LLM requests in flight")
+    parser.add_argument("--rpm", type=int, help="Provider requests-per-minute limit to pace under")
+    parser.add_argument("--tpm", type=int, help="Provider tokens-per-minute limit to pace under (input + max output)")
+    parser.add_argument("--batch", action="store_true",
+                        help="Submit uncached rules as one provider batch job (anthropic/openai, ~50%% cheaper, slower)")
+    parser.add_argument("--max-rules-tokens", type=int,
+                        help="Token budget for each market's rules text (default: 750, ollama 500)")
+    parser.add_argument("--markets-per-request", type=int, default=1,
+                        help="Markets to extract per LLM request (not used with --batch)")
+    parser.add_argument("--emit-jsonl", action="store_true",
+                        help="Also write propositions/constraints as JSONL for debugging")
     
     args = parser.parse_args()
     
@@ -558,6 +1081,13 @@ def main():
         model=args.model,
         limit=args.limit,
         use_cache=not args.no_cache,
+        concurrency=args.concurrency,
+        batch=args.batch,
+        max_rules_tokens=args.max_rules_tokens,
+        emit_jsonl=args.emit_jsonl,
+        markets_per_request=args.markets_per_request,
+        rpm=args.rpm,
+        tpm=args.tpm,
     )
 
 
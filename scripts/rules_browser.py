@@ -6,13 +6,16 @@ Rules Pipeline Browser - View propositions, constraints, and violations.
 from __future__ import annotations
 
 import argparse
+import gzip
 import json
 import html
 import os
+import threading
 from datetime import datetime, timezone
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, quote, urlparse
 
 try:
     import polars as pl
@@ -20,65 +23,172 @@ except ImportError:
     print("ERROR: polars not installed. Install with: pip install polars")
     raise
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+# Fields the renderers read from each JSONL record
+RULE_FIELDS = ("market_id", "title", "raw_rules_text", "url")
+REVIEW_FIELDS = ("market_id", "title", "confidence", "reason", "status")
+
+# Parquet columns each table renders, and how many rows it shows
+PROP_COLS = ("market_id", "underlier", "strike_level", "comparator", "proposition_kind", "confidence")
+CONST_COLS = ("constraint_type", "underlier", "market_ids", "constraint_expr")
+VIOL_COLS = ("severity", "constraint_type", "market_ids", "expected", "actual", "margin")
+TABLE_ROWS = 500
+RULES_PAGE_SIZE = 50
+RULES_TEXT_PREVIEW = 500  # characters of rules text shown per row; the rest loads on demand
+
 
 def utc_now_str() -> str:
     return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
 
 
+class ParquetTable(NamedTuple):
+    head: pl.DataFrame  # first TABLE_ROWS rows, rendered columns only
+    total: int
+
+
+def scan_table(path: Path, columns: Tuple[str, ...]) -> ParquetTable:
+    """Read just the rendered columns of the first TABLE_ROWS rows, plus the row count."""
+    lf = pl.scan_parquet(path)
+    schema = lf.collect_schema()
+    head, count = pl.collect_all([
+        lf.select([c for c in columns if c in schema]).head(TABLE_ROWS),
+        lf.select(pl.len()),
+    ])
+    return ParquetTable(head, count.item())
+
+
+def column_values(df: pl.DataFrame, name: str, default: Any = "") -> List[Any]:
+    """Column as a Python list, or `default` per row when the frame lacks it."""
+    if name in df.schema:
+        return df.get_column(name).to_list()
+    return [default] * len(df)
+
+
+def confidence_badge(confidence: float) -> str:
+    return "badge-green" if confidence >= 0.8 else "badge-yellow" if confidence >= 0.6 else "badge-red"
+
+
+def severity_badge(severity: str) -> str:
+    return "badge-red" if severity == "high" else "badge-yellow" if severity == "medium" else "badge-blue"
+
+
 class RulesData:
     def __init__(self, venue: str, date: str, data_dir: str) -> None:
         self.venue = venue
         self.date = date
         self.data_dir = Path(data_dir)
+        # Reused across loads so simdjson keeps its internal buffers
+        self._json_parser = simdjson.Parser() if simdjson is not None else None
+        # path -> ((st_mtime_ns, st_size), loaded value); files only change
+        # when a pipeline run rewrites them
+        self._cache: Dict[Path, Tuple[Tuple[int, int], Any]] = {}
+        self._cache_lock = threading.Lock()
+        # (rules list it was built from, lowercased search text per rule)
+        self._rules_index: Optional[Tuple[List[Dict], pl.Series]] = None
+
+    def _cached(self, path: Path, load: Callable[[Path], Any]) -> Any:
+        """Return load(path), reusing the previous result while the file is unchanged."""
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            with self._cache_lock:
+                self._cache.pop(path, None)
+            return None
+        signature = (st.st_mtime_ns, st.st_size)
+        with self._cache_lock:
+            hit = self._cache.get(path)
+            if hit is not None and hit[0] == signature:
+                return hit[1]
+            value = load(path)
+            self._cache[path] = (signature, value)
+            return value
 
     def load_rules(self) -> List[Dict]:
         rules_file = (
             self.data_dir / "rules" / f"venue={self.venue}" / f"date={self.date}" / "rules.jsonl"
         )
-        rules = []
-        if rules_file.exists():
-            for line in rules_file.read_text().splitlines():
-                if line.strip():
-                    try:
-                        rules.append(json.loads(line))
-                    except json.JSONDecodeError:
-                        pass
-        return rules
+        return self._cached(rules_file, lambda path: self._load_jsonl(path, RULE_FIELDS)) or []
+
+    def search_rules(self, query: str) -> List[Dict]:
+        """Rules whose market id, title or text contains query, ignoring case."""
+        rules = self.load_rules()
+        if not query:
+            return rules
+        index = self._rules_index
+        if index is None or index[0] is not rules:
+            haystack = pl.Series([
+                f"{r.get('market_id') or ''}\n{r.get('title') or ''}\n{r.get('raw_rules_text') or ''}"
+                for r in rules
+            ], dtype=pl.Utf8).str.to_lowercase()
+            index = self._rules_index = (rules, haystack)
+        matches = index[1].str.contains(query.lower(), literal=True).arg_true()
+        return [rules[i] for i in matches.to_list()]
+
+    def find_rule(self, market_id: str) -> Optional[Dict]:
+        for rule in self.load_rules():
+            if rule.get("market_id") == market_id:
+                return rule
+        return None
 
-    def load_propositions(self) -> Optional[pl.DataFrame]:
+    def load_propositions(self) -> Optional[ParquetTable]:
         path = self.data_dir / "logic" / f"venue={self.venue}" / f"date={self.date}" / "propositions.parquet"
-        if path.exists():
-            return pl.read_parquet(path)
-        return None
+        return self._cached(path, lambda path: scan_table(path, PROP_COLS))
 
-    def load_constraints(self) -> Optional[pl.DataFrame]:
+    def load_constraints(self) -> Optional[ParquetTable]:
         path = self.data_dir / "logic" / f"venue={self.venue}" / f"date={self.date}" / "constraints.parquet"
-        if path.exists():
-            return pl.read_parquet(path)
-        return None
+        return self._cached(path, lambda path: scan_table(path, CONST_COLS))
 
-    def load_violations(self) -> Optional[pl.DataFrame]:
+    def load_violations(self) -> Optional[ParquetTable]:
         path = self.data_dir / "logic" / f"venue={self.venue}" / f"date={self.date}" / "violations.parquet"
-        if path.exists():
-            return pl.read_parquet(path)
-        return None
+        return self._cached(path, lambda path: scan_table(path, VIOL_COLS))
 
     def load_review_queue(self) -> List[Dict]:
         queue_file = (
             self.data_dir / "review_queue" / f"venue={self.venue}" / f"date={self.date}" / "queue.jsonl"
         )
+        return self._cached(queue_file, lambda path: self._load_jsonl(path, REVIEW_FIELDS)) or []
+
+    def _load_jsonl(self, path: Path, fields: Tuple[str, ...]) -> List[Dict]:
         items = []
-        if queue_file.exists():
-            for line in queue_file.read_text().splitlines():
+        with path.open("rb") as f:
+            for line in f:
                 if line.strip():
                     try:
-                        items.append(json.loads(line))
-                    except json.JSONDecodeError:
+                        items.append(self._parse_record(line, fields))
+                    except ValueError:
                         pass
         return items
 
-
-def generate_html(data: RulesData, tab: str = "rules") -> str:
+    def _parse_record(self, line: bytes, fields: Tuple[str, ...]) -> Dict:
+        if self._json_parser is None:
+            return json_loads(line)
+        # Copy out only the rendered fields; the lazy document must be gone
+        # before the parser is reused for the next line.
+        doc = self._json_parser.parse(line)
+        if not isinstance(doc, simdjson.Object):
+            raise ValueError("expected a JSON object")
+        record = {}
+        for key in fields:
+            if key in doc:
+                value = doc[key]
+                if isinstance(value, simdjson.Object):
+                    value = value.as_dict()
+                elif isinstance(value, simdjson.Array):
+                    value = value.as_list()
+                record[key] = value
+        return record
+
+
+def generate_html(data: RulesData, tab: str = "rules", query: str = "", page: int = 1) -> str:
     rules = data.load_rules()
     propositions = data.load_propositions()
     constraints = data.load_constraints()
@@ -87,9 +197,9 @@ def generate_html(data: RulesData, tab: str = "rules") -> str:
 
     # Count stats
     rules_count = len(rules)
-    props_count = len(propositions) if propositions is not None else 0
-    constraints_count = len(constraints) if constraints is not None else 0
-    violations_count = len(violations) if violations is not None else 0
+    props_count = propositions.total if propositions is not None else 0
+    constraints_count = constraints.total if constraints is not None else 0
+    violations_count = violations.total if violations is not None else 0
     review_count = len(review_queue)
 
     tabs = [
@@ -107,7 +217,7 @@ def generate_html(data: RulesData, tab: str = "rules") -> str:
 
     content = ""
     if tab == "rules":
-        content = render_rules(rules)
+        content = render_rules(rules, data.search_rules(query), query, page)
     elif tab == "propositions":
         content = render_propositions(propositions)
     elif tab == "constraints":
@@ -165,62 +275,93 @@ def generate_html(data: RulesData, tab: str = "rules") -> str:
                 row.style.display = text.includes(filter) ? '' : 'none';
             }});
         }}
+        function expandRules(link) {{
+            fetch(link.href)
+                .then(r => r.json())
+                .then(rule => {{ link.parentElement.textContent = rule.raw_rules_text; }});
+            return false;
+        }}
     </script>
 </body>
 </html>"""
 
 
-def render_rules(rules: List[Dict]) -> str:
+def rule_row(r: Dict) -> str:
+    market_id = r.get("market_id", "")
+    title = html.escape(r.get("title", ""))  # same escaping for the cell and its tooltip
+    rules_text = r.get("raw_rules_text", "")
+    more = ""
+    if len(rules_text) > RULES_TEXT_PREVIEW:
+        more = f' <a href="?detail={quote(market_id)}" onclick="return expandRules(this)">more</a>'
+    return f"""<tr>
+            <td class="truncate" title="{html.escape(market_id)}">{market_id[:16]}...</td>
+            <td class="truncate" title="{title}">{title}</td>
+            <td class="wrap">{html.escape(rules_text[:RULES_TEXT_PREVIEW])}{more}</td>
+            <td><a href="{r.get("url", "")}" target="_blank">Link</a></td>
+        </tr>"""
+
+
+def render_rules(rules: List[Dict], matches: List[Dict], query: str = "", page: int = 1) -> str:
     if not rules:
         return '<div class="empty">No rules fetched yet. Run: cargo run --bin surveillance_rules -- ingest</div>'
 
-    rows = ""
-    for r in rules[:500]:  # Limit to 500 for performance
-        title = html.escape(r.get("title", ""))
-        market_id = r.get("market_id", "")[:16] + "..."
-        rules_text = html.escape(r.get("raw_rules_text", "")[:500])
-        url = r.get("url", "")
-        
-        rows += f"""<tr>
-            <td class="truncate" title="{html.escape(r.get('market_id', ''))}">{market_id}</td>
-            <td class="truncate" title="{html.escape(r.get('title', ''))}">{title}</td>
-            <td class="wrap">{rules_text}</td>
-            <td><a href="{url}" target="_blank">Link</a></td>
-        </tr>"""
+    pages = max(1, -(-len(matches) // RULES_PAGE_SIZE))
+    page = min(max(page, 1), pages)
+    start = (page - 1) * RULES_PAGE_SIZE
+    shown = matches[start:start + RULES_PAGE_SIZE]
+    rows = "".join(map(rule_row, shown))
+
+    status = f"Showing {start + 1}-{start + len(shown)} of {len(matches)}" if shown else "Showing 0 of 0"
+    if query:
+        status += f" (filtered from {len(rules)})"
+    base = f"?tab=rules&q={quote(query)}"
+    pager = ""
+    if page > 1:
+        pager += f' <a href="{base}&page={page - 1}">&laquo; Prev</a>'
+    if page < pages:
+        pager += f' <a href="{base}&page={page + 1}">Next &raquo;</a>'
 
     return f"""
-    <div class="search">
-        <input type="text" id="rulesSearch" placeholder="Filter rules..." onkeyup="filterTable('rulesSearch', 'rulesTable')">
-        <span style="color:#888; margin-left:10px;">Showing {min(len(rules), 500)} of {len(rules)}</span>
-    </div>
+    <form class="search" method="get">
+        <input type="hidden" name="tab" value="rules">
+        <input type="text" name="q" value="{html.escape(query)}" placeholder="Filter rules...">
+        <span style="color:#888; margin-left:10px;">{status} | Page {page} of {pages}{pager}</span>
+    </form>
     <table id="rulesTable">
         <thead><tr><th>Market ID</th><th>Title</th><th>Rules Text</th><th>URL</th></tr></thead>
         <tbody>{rows}</tbody>
     </table>"""
 
 
-def render_propositions(df: Optional[pl.DataFrame]) -> str:
-    if df is None or len(df) == 0:
+def render_propositions(table: Optional[ParquetTable]) -> str:
+    if table is None or table.total == 0:
         return '<div class="empty">No propositions yet. Run: cargo run --bin surveillance_rules -- normalize</div>'
 
-    rows = ""
-    for row in df.head(500).iter_rows(named=True):
-        confidence = row.get("confidence", 0)
-        conf_class = "badge-green" if confidence >= 0.8 else "badge-yellow" if confidence >= 0.6 else "badge-red"
-        
-        rows += f"""<tr>
-            <td class="truncate">{row.get('market_id', '')[:20]}...</td>
-            <td>{html.escape(str(row.get('underlier', '') or ''))}</td>
-            <td>{row.get('strike_level', '')}</td>
-            <td>{row.get('comparator', '')}</td>
-            <td>{row.get('proposition_kind', '')}</td>
-            <td><span class="badge {conf_class}">{confidence:.2f}</span></td>
+    # Pull each column out once instead of building a dict per row
+    head = table.head
+    rows = "".join(
+        f"""<tr>
+            <td class="truncate">{market_id[:20]}...</td>
+            <td>{html.escape(str(underlier or ''))}</td>
+            <td>{strike_level}</td>
+            <td>{comparator}</td>
+            <td>{kind}</td>
+            <td><span class="badge {confidence_badge(confidence)}">{confidence:.2f}</span></td>
         </tr>"""
+        for market_id, underlier, strike_level, comparator, kind, confidence in zip(
+            column_values(head, "market_id"),
+            column_values(head, "underlier"),
+            column_values(head, "strike_level"),
+            column_values(head, "comparator"),
+            column_values(head, "proposition_kind"),
+            column_values(head, "confidence", 0),
+        )
+    )
 
     return f"""
     <div class="search">
         <input type="text" id="propsSearch" placeholder="Filter propositions..." onkeyup="filterTable('propsSearch', 'propsTable')">
-        <span style="color:#888; margin-left:10px;">Showing {min(len(df), 500)} of {len(df)}</span>
+        <span style="color:#888; margin-left:10px;">Showing {len(table.head)} of {table.total}</span>
     </div>
     <table id="propsTable">
         <thead><tr><th>Market ID</th><th>Underlier</th><th>Strike</th><th>Comparator</th><th>Kind</th><th>Confidence</th></tr></thead>
@@ -228,23 +369,30 @@ def render_propositions(df: Optional[pl.DataFrame]) -> str:
     </table>"""
 
 
-def render_constraints(df: Optional[pl.DataFrame]) -> str:
-    if df is None or len(df) == 0:
+def render_constraints(table: Optional[ParquetTable]) -> str:
+    if table is None or table.total == 0:
         return '<div class="empty">No constraints yet. Run: cargo run --bin surveillance_rules -- constraints</div>'
 
-    rows = ""
-    for row in df.head(500).iter_rows(named=True):
-        rows += f"""<tr>
-            <td>{row.get('constraint_type', '')}</td>
-            <td>{html.escape(str(row.get('underlier', '') or ''))}</td>
-            <td class="truncate">{row.get('market_ids', '')}</td>
-            <td><pre>{html.escape(str(row.get('constraint_expr', '') or ''))}</pre></td>
+    head = table.head
+    rows = "".join(
+        f"""<tr>
+            <td>{constraint_type}</td>
+            <td>{html.escape(str(underlier or ''))}</td>
+            <td class="truncate">{market_ids}</td>
+            <td><pre>{html.escape(str(constraint_expr or ''))}</pre></td>
         </tr>"""
+        for constraint_type, underlier, market_ids, constraint_expr in zip(
+            column_values(head, "constraint_type"),
+            column_values(head, "underlier"),
+            column_values(head, "market_ids"),
+            column_values(head, "constraint_expr"),
+        )
+    )
 
     return f"""
     <div class="search">
         <input type="text" id="constSearch" placeholder="Filter constraints..." onkeyup="filterTable('constSearch', 'constTable')">
-        <span style="color:#888; margin-left:10px;">{len(df)} constraints</span>
+        <span style="color:#888; margin-left:10px;">{table.total} constraints</span>
     </div>
     <table id="constTable">
         <thead><tr><th>Type</th><th>Underlier</th><th>Market IDs</th><th>Constraint</th></tr></thead>
@@ -252,27 +400,33 @@ def render_constraints(df: Optional[pl.DataFrame]) -> str:
     </table>"""
 
 
-def render_violations(df: Optional[pl.DataFrame]) -> str:
-    if df is None or len(df) == 0:
+def render_violations(table: Optional[ParquetTable]) -> str:
+    if table is None or table.total == 0:
         return '<div class="empty">No violations detected. This is good! (or run: cargo run --bin surveillance_rules -- detect-arb)</div>'
 
-    rows = ""
-    for row in df.head(500).iter_rows(named=True):
-        severity = row.get('severity', 'low')
-        sev_class = "badge-red" if severity == "high" else "badge-yellow" if severity == "medium" else "badge-blue"
-        
-        rows += f"""<tr>
-            <td><span class="badge {sev_class}">{severity}</span></td>
-            <td>{row.get('constraint_type', '')}</td>
-            <td class="truncate">{row.get('market_ids', '')}</td>
-            <td>{row.get('expected', '')}</td>
-            <td>{row.get('actual', '')}</td>
-            <td>{row.get('margin', '')}</td>
+    head = table.head
+    rows = "".join(
+        f"""<tr>
+            <td><span class="badge {severity_badge(severity)}">{severity}</span></td>
+            <td>{constraint_type}</td>
+            <td class="truncate">{market_ids}</td>
+            <td>{expected}</td>
+            <td>{actual}</td>
+            <td>{margin}</td>
         </tr>"""
+        for severity, constraint_type, market_ids, expected, actual, margin in zip(
+            column_values(head, "severity", "low"),
+            column_values(head, "constraint_type"),
+            column_values(head, "market_ids"),
+            column_values(head, "expected"),
+            column_values(head, "actual"),
+            column_values(head, "margin"),
+        )
+    )
 
     return f"""
     <div style="background:#f8d7da;padding:15px;border-radius:5px;margin-bottom:15px;">
-        <strong>⚠️ {len(df)} violations detected!</strong> These may indicate arbitrage opportunities.
+        <strong>⚠️ {table.total} violations detected!</strong> These may indicate arbitrage opportunities.
     </div>
     <table id="violTable">
         <thead><tr><th>Severity</th><th>Type</th><th>Markets</th><th>Expected</th><th>Actual</th><th>Margin</th></tr></thead>
@@ -284,15 +438,16 @@ def render_review(items: List[Dict]) -> str:
     if not items:
         return '<div class="empty">No items in review queue. All propositions have high confidence!</div>'
 
-    rows = ""
-    for item in items[:500]:
-        rows += f"""<tr>
+    rows = "".join(
+        f"""<tr>
             <td class="truncate">{item.get('market_id', '')[:20]}...</td>
             <td class="truncate">{html.escape(item.get('title', '')[:60])}</td>
             <td>{item.get('confidence', 0):.2f}</td>
             <td class="truncate">{html.escape(item.get('reason', ''))}</td>
             <td>{item.get('status', 'pending')}</td>
         </tr>"""
+        for item in items[:500]
+    )
 
     return f"""
     <div style="background:#fff3cd;padding:15px;border-radius:5px;margin-bottom:15px;">
@@ -308,15 +463,39 @@ class RequestHandler(BaseHTTPRequestHandler):
     data: RulesData
 
     def do_GET(self):
-        from urllib.parse import urlparse, parse_qs
         parsed = urlparse(self.path)
         params = parse_qs(parsed.query)
         tab = params.get("tab", ["rules"])[0]
+        query = params.get("q", [""])[0].strip()
+        try:
+            page = int(params.get("page", ["1"])[0])
+        except ValueError:
+            page = 1
+
+        if "detail" in params:
+            # Full rules text for one market, fetched when a truncated row is expanded
+            rule = self.data.find_rule(params["detail"][0])
+            if rule is None:
+                self.send_error(404, "Unknown market")
+                return
+            self.send_body(json.dumps(rule).encode(), "application/json")
+            return
+
+        self.send_body(generate_html(self.data, tab, query, page).encode(), "text/html")
+
+    def send_body(self, body: bytes, content_type: str) -> None:
+        gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+        if gzipped:
+            body = gzip.compress(body, compresslevel=5)
 
         self.send_response(200)
-        self.send_header("Content-type", "text/html")
+        self.send_header("Content-type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Vary", "Accept-Encoding")
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
         self.end_headers()
-        self.wfile.write(generate_html(self.data, tab).encode())
+        self.wfile.write(body)
 
     def log_message(self, format, *args):
         pass  # Suppress logs
@@ -333,7 +512,7 @@ def main():
     data = RulesData(args.venue, args.date, args.data_dir)
     RequestHandler.data = data
 
-    server = HTTPServer(("0.0.0.0", args.port), RequestHandler)
+    server = ThreadingHTTPServer(("0.0.0.0", args.port), RequestHandler)
     print(f"Rules Browser running at http://localhost:{args.port}")
     print(f"Venue: {args.venue}, Date: {args.date}")
     print("Press Ctrl+C to stop")
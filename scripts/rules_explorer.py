@@ -5,13 +5,16 @@ Shows propositions, constraints, and violations with clickable navigation.
 """
 
 import argparse
+import functools
 import json
 import html
+import threading
+import zlib
 from datetime import datetime, timezone
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from urllib.parse import urlparse, parse_qs
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 try:
     import polars as pl
@@ -19,117 +22,240 @@ except ImportError:
     print("ERROR: polars not installed. Install with: pip install polars")
     raise
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+
+def read_jsonl(path: Path) -> Iterator[dict]:
+    """Yield each JSON object line of path, skipping blank and malformed lines."""
+    with path.open("rb") as f:
+        for line in f:
+            if line.strip():
+                try:
+                    record = json_loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict):
+                    yield record
+
+
+def html_escape(expr: pl.Expr) -> pl.Expr:
+    """html.escape() as a column expression, so a whole column is escaped in one pass."""
+    for char, entity in (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"), ('"', "&quot;"), ("'", "&#x27;")):
+        expr = expr.str.replace_all(char, entity, literal=True)
+    return expr
+
 
 class RulesExplorer:
     def __init__(self, venue: str, date: str, data_dir: str):
         self.venue = venue
         self.date = date
         self.data_dir = Path(data_dir)
-        self._cache = {}
+        # name -> ((st_mtime_ns, st_size) or None if missing, loaded value);
+        # a pipeline run that rewrites a file is picked up on the next request
+        self._cache: Dict[str, Tuple[Optional[Tuple[int, int]], Any]] = {}
+        # name -> (source objects it was built from, derived value)
+        self._derived_cache: Dict[str, Tuple[Tuple[Any, ...], Any]] = {}
+        # Held while checking and filling either cache, so concurrent first
+        # hits on a page load each file once
+        self._cache_lock = threading.Lock()
+    
+    def _cached(self, name: str, path: Path, load: Callable[[Path], Any], missing: Callable[[], Any]) -> Any:
+        """Return load(path), reusing the previous result while the file is unchanged."""
+        try:
+            st = path.stat()
+            signature = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            signature = None
+        with self._cache_lock:
+            hit = self._cache.get(name)
+            if hit is not None and hit[0] == signature:
+                return hit[1]
+            value = load(path) if signature is not None else missing()
+            self._cache[name] = (signature, value)
+            return value
+    
+    def _derived(self, name: str, build: Callable[..., Any], *sources: Any) -> Any:
+        """Return build(*sources), rebuilt only when a loader hands back a new source object."""
+        with self._cache_lock:
+            hit = self._derived_cache.get(name)
+            if hit is not None and len(hit[0]) == len(sources) and all(a is b for a, b in zip(hit[0], sources)):
+                return hit[1]
+            value = build(*sources)
+            self._derived_cache[name] = (sources, value)
+            return value
     
     def load_rules(self) -> Dict[str, dict]:
-        if "rules" in self._cache:
-            return self._cache["rules"]
         path = self.data_dir / "rules" / f"venue={self.venue}" / f"date={self.date}" / "rules.jsonl"
+        return self._cached("rules", path, self._read_rules, dict)
+    
+    def _read_rules(self, path: Path) -> Dict[str, dict]:
         rules = {}
-        if path.exists():
-            for line in path.read_text().splitlines():
-                if line.strip():
-                    try:
-                        r = json.loads(line)
-                        rules[r.get("market_id", "")] = r
-                    except:
-                        pass
-        self._cache["rules"] = rules
+        for r in read_jsonl(path):
+            rules[r.get("market_id", "")] = r
         return rules
     
     def load_propositions(self) -> pl.DataFrame:
-        if "propositions" in self._cache:
-            return self._cache["propositions"]
         path = self.data_dir / "logic" / f"venue={self.venue}" / f"date={self.date}" / "propositions.parquet"
-        if path.exists():
-            df = pl.read_parquet(path)
-            self._cache["propositions"] = df
-            return df
-        return pl.DataFrame()
+        return self._cached("propositions", path, self._read_propositions, pl.DataFrame)
+    
+    def _read_propositions(self, path: Path) -> pl.DataFrame:
+        df = pl.read_parquet(path)
+        if "comparator" not in df.columns:
+            # Older files lack it; treat it as not extracted
+            df = df.with_columns(pl.lit(None, dtype=pl.Utf8).alias("comparator"))
+        # Display symbol for the comparator, worked out once per load
+        comparator = pl.col("comparator").str.to_lowercase()
+        return df.with_columns(
+            pl.when(comparator.str.contains("gte", literal=True)).then(pl.lit("≥"))
+            .when(comparator.str.contains("lte", literal=True)).then(pl.lit("≤"))
+            .otherwise(pl.lit(""))
+            .alias("comp_symbol")
+        )
     
     def load_constraints(self) -> pl.DataFrame:
-        if "constraints" in self._cache:
-            return self._cache["constraints"]
         path = self.data_dir / "logic" / f"venue={self.venue}" / f"date={self.date}" / "constraints.parquet"
-        if path.exists():
-            df = pl.read_parquet(path)
-            self._cache["constraints"] = df
-            return df
-        return pl.DataFrame()
+        return self._cached("constraints", path, pl.read_parquet, pl.DataFrame)
     
     def load_violations(self) -> pl.DataFrame:
-        if "violations" in self._cache:
-            return self._cache["violations"]
         path = self.data_dir / "logic" / f"venue={self.venue}" / f"date={self.date}" / "violations.parquet"
-        if path.exists():
-            df = pl.read_parquet(path)
-            self._cache["violations"] = df
-            return df
-        return pl.DataFrame()
+        return self._cached("violations", path, pl.read_parquet, pl.DataFrame)
     
     def load_review_queue(self) -> List[dict]:
-        if "review" in self._cache:
-            return self._cache["review"]
         # Review queue is in data/review_queue/ not data/logic/
         path = self.data_dir / "review_queue" / f"venue={self.venue}" / f"date={self.date}" / "queue.jsonl"
-        items = []
-        if path.exists():
-            for line in path.read_text().splitlines():
-                if line.strip():
-                    try:
-                        items.append(json.loads(line))
-                    except:
-                        pass
-        self._cache["review"] = items
-        return items
+        return self._cached("review", path, self._read_review_queue, list)
+    
+    def _read_review_queue(self, path: Path) -> List[dict]:
+        return list(read_jsonl(path))
+    
+    def get_proposition(self, market_id: str) -> dict:
+        return self._derived("props_index", self._index_propositions, self.load_propositions())[0].get(market_id, {})
+    
+    def get_underlier_propositions(self, underlier: str) -> List[dict]:
+        return self._derived("props_index", self._index_propositions, self.load_propositions())[1].get(underlier, [])
+    
+    def get_market_constraints(self, market_id: str) -> List[dict]:
+        return self._derived("constraints_index", self._index_constraints, self.load_constraints()).get(market_id, [])
+    
+    def search_rules(self, query: str, limit: int = 50) -> List[dict]:
+        """First `limit` rules whose title or rules text contains query, ignoring case."""
+        table = self._derived("rules_search", self._build_rules_search, self.load_rules())
+        query_lower = query.lower()
+        title_hit = pl.col("title_lc").str.contains(query_lower, literal=True)
+        hits = table.filter(
+            title_hit | pl.col("rules_lc").str.contains(query_lower, literal=True)
+        ).head(limit).select(
+            "market_id",
+            pl.col("title").fill_null(""),
+            pl.when(title_hit).then(pl.lit("title")).otherwise(pl.lit("rules")).alias("match"),
+            pl.col("url").fill_null(""),
+        )
+        return hits.to_dicts()
+    
+    def _build_rules_search(self, rules: Dict[str, dict]) -> pl.DataFrame:
+        values = list(rules.values())
+        return pl.DataFrame([
+            pl.Series("market_id", list(rules.keys()), dtype=pl.Utf8, strict=False),
+            pl.Series("title", [r.get("title", "") for r in values], dtype=pl.Utf8, strict=False),
+            pl.Series("url", [r.get("url", "") for r in values], dtype=pl.Utf8, strict=False),
+            pl.Series("raw_rules_text", [r.get("raw_rules_text", "") for r in values], dtype=pl.Utf8, strict=False),
+        ]).with_columns(
+            pl.col("title").str.to_lowercase().alias("title_lc"),
+            pl.col("raw_rules_text").str.to_lowercase().alias("rules_lc"),
+        ).drop("raw_rules_text")
+    
+    def get_underlier_constraints(self, underlier: str) -> List[dict]:
+        """Constraints whose notes mention underlier."""
+        constraints = self.load_constraints()
+        index = self._derived(
+            "constraints_by_underlier", self._index_underlier_constraints, constraints, self.get_underliers()
+        )
+        if underlier in index:
+            return index[underlier]
+        if constraints.is_empty():
+            return []
+        return constraints.filter(pl.col("notes").str.contains(underlier, literal=True)).to_dicts()
+    
+    def _index_underlier_constraints(self, constraints: pl.DataFrame, underliers: List[str]) -> Dict[str, List[dict]]:
+        by_underlier = {}
+        if constraints.is_empty():
+            return by_underlier
+        notes = constraints.get_column("notes")
+        for underlier in underliers:
+            by_underlier[underlier] = constraints[notes.str.contains(underlier, literal=True).arg_true()].to_dicts()
+        return by_underlier
+    
+    def _index_propositions(self, props: pl.DataFrame) -> Tuple[Dict[str, dict], Dict[str, List[dict]]]:
+        """Rows by market_id (first wins) and by underlier, in file order."""
+        by_id = {}
+        by_underlier = {}
+        for row in props.iter_rows(named=True):
+            by_id.setdefault(row["market_id"], row)
+            by_underlier.setdefault(row["underlier"], []).append(row)
+        return by_id, by_underlier
+    
+    def _index_constraints(self, constraints: pl.DataFrame) -> Dict[str, List[dict]]:
+        """Rows under both their a_market_id and b_market_id, in file order."""
+        by_market = {}
+        if constraints.is_empty():
+            return by_market
+        for row in constraints.iter_rows(named=True):
+            by_market.setdefault(row["a_market_id"], []).append(row)
+            if row["b_market_id"] != row["a_market_id"]:
+                by_market.setdefault(row["b_market_id"], []).append(row)
+        return by_market
     
     def get_underliers(self) -> List[str]:
-        props = self.load_propositions()
+        return self._derived("underliers", self._build_underliers, self.load_propositions())
+    
+    def _build_underliers(self, props: pl.DataFrame) -> List[str]:
         if props.is_empty():
             return []
-        return sorted([u for u in props["underlier"].unique().to_list() if u])
+        underliers = props.get_column("underlier").drop_nulls().unique().sort()
+        return underliers.filter(underliers != "").to_list()
     
     def get_ladders(self) -> Dict[str, List[dict]]:
         """Group markets into ladders by underlier."""
-        props = self.load_propositions()
-        rules = self.load_rules()
-        
+        return self._derived("ladders", self._build_ladders, self.load_propositions(), self.load_rules())
+    
+    def _build_ladders(self, props: pl.DataFrame, rules: Dict[str, dict]) -> Dict[str, List[dict]]:
         ladders = {}
         if props.is_empty():
             return ladders
         
-        # Group by underlier
-        for underlier in self.get_underliers():
-            markets = props.filter(
-                (pl.col("underlier") == underlier) &
-                (pl.col("strike").is_not_null())
-            ).sort("strike")
-            
-            if len(markets) > 1:
-                ladder = []
-                for row in markets.iter_rows(named=True):
-                    rule = rules.get(row["market_id"], {})
-                    ladder.append({
-                        "market_id": row["market_id"],
-                        "title": row["title"],
-                        "strike": row["strike"],
-                        "comparator": row["comparator"],
-                        "confidence": row["confidence"],
-                        "url": rule.get("url", ""),
-                    })
-                ladders[underlier] = ladder
+        # One sort + group_by instead of a filter per underlier
+        grouped = props.filter(
+            (pl.col("underlier").is_not_null()) &
+            (pl.col("underlier") != "") &
+            (pl.col("strike").is_not_null())
+        ).sort(["underlier", "strike"], maintain_order=True).group_by("underlier", maintain_order=True).agg(
+            pl.col("market_id"), pl.col("title"), pl.col("strike"), pl.col("comparator"), pl.col("confidence"),
+            html_escape(pl.col("title").str.slice(0, 50)).alias("title_html"), pl.col("comp_symbol"),
+        ).filter(pl.col("market_id").list.len() > 1)
+        
+        for underlier, market_ids, titles, strikes, comparators, confidences, titles_html, comp_symbols in grouped.iter_rows():
+            ladders[underlier] = [
+                {
+                    "market_id": market_id,
+                    "title": title,
+                    "title_html": title_html,
+                    "comp_symbol": comp_symbol,
+                    "strike": strike,
+                    "comparator": comparator,
+                    "confidence": confidence,
+                    "url": rules.get(market_id, {}).get("url", ""),
+                }
+                for market_id, title, strike, comparator, confidence, title_html, comp_symbol
+                in zip(market_ids, titles, strikes, comparators, confidences, titles_html, comp_symbols)
+            ]
         
         return ladders
 
 
-def css_styles() -> str:
-    return """
+CSS_STYLES = """
     <style>
         * { box-sizing: border-box; }
         body { 
@@ -234,6 +360,33 @@ def css_styles() -> str:
     </style>
     """
 
+NAV_SEARCH_FORM = """
+    <form action="" method="get" style="margin-left:auto;display:flex;gap:5px;">
+        <input type="hidden" name="page" value="search">
+        <input type="text" name="q" placeholder="Search markets..." 
+               style="padding:8px 12px;border-radius:5px;border:1px solid #333;background:#0f3460;color:#fff;">
+        <button type="submit" style="padding:8px 15px;border-radius:5px;border:none;background:#00d4ff;color:#000;cursor:pointer;">Search</button>
+    </form>
+    """
+
+
+@functools.lru_cache(maxsize=None)
+def page_head(venue: str, date: str) -> str:
+    """Everything before the nav bar; it only depends on venue and date."""
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+    <title>Rules Explorer - {venue} - {date}</title>
+    <meta charset="utf-8">
+    {CSS_STYLES}
+</head>
+<body>
+    <div class="header">
+        <h1>🔍 Rules Explorer</h1>
+        <div class="meta">Venue: {venue} | Date: {date} | Interactive browser for arbitrage detection</div>
+    </div>
+    """
+
 
 def render_home(explorer: RulesExplorer) -> str:
     props = explorer.load_propositions()
@@ -257,32 +410,34 @@ def render_home(explorer: RulesExplorer) -> str:
     """
     
     # Underliers summary
-    underliers_html = ""
+    underliers_parts = []
     for underlier in explorer.get_underliers()[:10]:
-        count = len(props.filter(pl.col("underlier") == underlier))
+        count = len(explorer.get_underlier_propositions(underlier))
         ladder_count = len(ladders.get(underlier, []))
-        underliers_html += f"""
+        underliers_parts.append(f"""
         <tr>
             <td><a href="?page=underlier&u={underlier}" class="link">{underlier}</a></td>
             <td>{count}</td>
             <td>{ladder_count} markets</td>
         </tr>
-        """
+        """)
+    underliers_html = "".join(underliers_parts)
     
     # Recent violations
-    violations_html = ""
+    violations_parts = []
     if not violations.is_empty():
         for row in violations.head(5).iter_rows(named=True):
-            violations_html += f"""
+            violations_parts.append(f"""
             <tr>
                 <td><span class="badge badge-red">Violation</span></td>
                 <td><a href="?page=market&id={row.get('a_market_id','')}" class="link">{row.get('a_market_id','')[:20]}...</a></td>
                 <td>{row.get('constraint_type', '')}</td>
                 <td>{row.get('violation_magnitude', 0):.4f}</td>
             </tr>
-            """
+            """)
     else:
-        violations_html = '<tr><td colspan="4" class="empty">No violations detected</td></tr>'
+        violations_parts.append('<tr><td colspan="4" class="empty">No violations detected</td></tr>')
+    violations_html = "".join(violations_parts)
     
     return f"""
     <div class="container">
@@ -311,40 +466,34 @@ def render_home(explorer: RulesExplorer) -> str:
 def render_underlier(explorer: RulesExplorer, underlier: str) -> str:
     props = explorer.load_propositions()
     rules = explorer.load_rules()
-    constraints = explorer.load_constraints()
     
-    markets = props.filter(pl.col("underlier") == underlier).sort("strike")
+    markets = props.filter(pl.col("underlier") == underlier).sort("strike").select(
+        "market_id", "title", "strike", "comp_symbol", "confidence"
+    )
     
     # Build ladder visualization
-    ladder_html = ""
-    for row in markets.iter_rows(named=True):
-        rule = rules.get(row["market_id"], {})
-        conf = row.get("confidence", 0)
+    ladder_parts = []
+    for market_id, title, strike, comp_symbol, conf in markets.iter_rows():
+        rule = rules.get(market_id, {})
         conf_class = "conf-high" if conf >= 0.6 else "conf-med" if conf >= 0.4 else "conf-low"
-        strike = row.get("strike")
         strike_str = f"${strike:,.0f}" if strike else "N/A"
-        comp = row.get("comparator", "")
-        comp_symbol = "≥" if comp and "gte" in comp.lower() else "≤" if comp and "lte" in comp.lower() else ""
         
-        ladder_html += f"""
+        ladder_parts.append(f"""
         <div class="ladder-item">
             <div class="strike">{comp_symbol} {strike_str}</div>
             <div class="title">
-                <a href="?page=market&id={row['market_id']}" class="link">{html.escape(row.get('title', '')[:60])}</a>
+                <a href="?page=market&id={market_id}" class="link">{html.escape(title[:60])}</a>
             </div>
             <div class="confidence {conf_class}">{conf:.0%}</div>
             <a href="{rule.get('url', '#')}" target="_blank" class="link">↗</a>
         </div>
-        """
+        """)
+    ladder_html = "".join(ladder_parts)
     
     # Find related constraints
-    constraint_html = ""
-    if not constraints.is_empty():
-        related = constraints.filter(
-            pl.col("notes").str.contains(underlier)
-        )
-        for row in related.iter_rows(named=True):
-            constraint_html += f"""
+    constraint_parts = []
+    for row in explorer.get_underlier_constraints(underlier):
+        constraint_parts.append(f"""
             <div class="constraint-viz">
                 <div class="market">
                     <a href="?page=market&id={row['a_market_id']}" class="link">{row['a_market_id'][:20]}...</a>
@@ -354,7 +503,8 @@ def render_underlier(explorer: RulesExplorer, underlier: str) -> str:
                     <a href="?page=market&id={row['b_market_id']}" class="link">{row['b_market_id'][:20]}...</a>
                 </div>
             </div>
-            """
+            """)
+    constraint_html = "".join(constraint_parts)
     
     return f"""
     <div class="container">
@@ -379,13 +529,10 @@ def render_underlier(explorer: RulesExplorer, underlier: str) -> str:
 
 
 def render_market(explorer: RulesExplorer, market_id: str) -> str:
-    props = explorer.load_propositions()
     rules = explorer.load_rules()
-    constraints = explorer.load_constraints()
     
     rule = rules.get(market_id, {})
-    prop_rows = props.filter(pl.col("market_id") == market_id)
-    prop = prop_rows.row(0, named=True) if len(prop_rows) > 0 else {}
+    prop = explorer.get_proposition(market_id)
     
     # Basic info
     title = rule.get("title") or prop.get("title", "Unknown")
@@ -409,37 +556,34 @@ def render_market(explorer: RulesExplorer, market_id: str) -> str:
     """
     
     # Related markets (same underlier)
-    related_html = ""
+    related_parts = []
     if prop.get("underlier"):
-        related = props.filter(
-            (pl.col("underlier") == prop["underlier"]) &
-            (pl.col("market_id") != market_id)
-        ).head(10)
-        for row in related.iter_rows(named=True):
-            related_html += f"""
+        related = [
+            row for row in explorer.get_underlier_propositions(prop["underlier"])
+            if row["market_id"] != market_id
+        ][:10]
+        for row in related:
+            related_parts.append(f"""
             <tr>
                 <td><a href="?page=market&id={row['market_id']}" class="link">{html.escape(row.get('title', '')[:50])}</a></td>
                 <td>{f"${row.get('strike'):,.0f}" if row.get('strike') else '-'}</td>
                 <td>{row.get('confidence', 0):.0%}</td>
             </tr>
-            """
+            """)
+    related_html = "".join(related_parts)
     
     # Constraints involving this market
-    constraint_html = ""
-    if not constraints.is_empty():
-        involved = constraints.filter(
-            (pl.col("a_market_id") == market_id) |
-            (pl.col("b_market_id") == market_id)
-        )
-        for row in involved.iter_rows(named=True):
-            other_id = row["b_market_id"] if row["a_market_id"] == market_id else row["a_market_id"]
-            constraint_html += f"""
+    constraint_parts = []
+    for row in explorer.get_market_constraints(market_id):
+        other_id = row["b_market_id"] if row["a_market_id"] == market_id else row["a_market_id"]
+        constraint_parts.append(f"""
             <tr>
                 <td>{row.get('constraint_type', '')}</td>
                 <td><a href="?page=market&id={other_id}" class="link">{other_id[:20]}...</a></td>
                 <td>{row.get('relation', '')}</td>
             </tr>
-            """
+            """)
+    constraint_html = "".join(constraint_parts)
     
     return f"""
     <div class="container">
@@ -481,35 +625,18 @@ def render_market(explorer: RulesExplorer, market_id: str) -> str:
 
 
 def render_search(explorer: RulesExplorer, query: str) -> str:
-    props = explorer.load_propositions()
-    rules = explorer.load_rules()
+    results = explorer.search_rules(query)
     
-    query_lower = query.lower()
-    results = []
-    
-    # Search in rules
-    for market_id, rule in rules.items():
-        title = rule.get("title", "")
-        rules_text = rule.get("raw_rules_text", "")
-        if query_lower in title.lower() or query_lower in rules_text.lower():
-            results.append({
-                "market_id": market_id,
-                "title": title,
-                "match": "title" if query_lower in title.lower() else "rules",
-                "url": rule.get("url", ""),
-            })
-            if len(results) >= 50:
-                break
-    
-    results_html = ""
+    results_parts = []
     for r in results:
-        results_html += f"""
+        results_parts.append(f"""
         <tr>
             <td><a href="?page=market&id={r['market_id']}" class="link">{html.escape(r['title'][:60])}</a></td>
             <td><span class="badge badge-blue">{r['match']}</span></td>
             <td><a href="{r['url']}" target="_blank" class="link">↗</a></td>
         </tr>
-        """
+        """)
+    results_html = "".join(results_parts)
     
     return f"""
     <div class="container">
@@ -529,35 +656,35 @@ def render_ladders(explorer: RulesExplorer) -> str:
     ladders = explorer.get_ladders()
     rules = explorer.load_rules()
     
-    ladders_html = ""
+    ladders_parts = []
     for underlier, markets in sorted(ladders.items()):
-        items_html = ""
+        items_parts = []
         for m in markets:
             conf = m.get("confidence", 0)
             conf_class = "conf-high" if conf >= 0.6 else "conf-med" if conf >= 0.4 else "conf-low"
             strike = m.get("strike")
             strike_str = f"${strike:,.0f}" if strike else "N/A"
-            comp = m.get("comparator", "")
-            comp_symbol = "≥" if comp and "gte" in comp.lower() else "≤" if comp and "lte" in comp.lower() else ""
             
-            items_html += f"""
+            items_parts.append(f"""
             <div class="ladder-item">
-                <div class="strike">{comp_symbol} {strike_str}</div>
+                <div class="strike">{m['comp_symbol']} {strike_str}</div>
                 <div class="title">
-                    <a href="?page=market&id={m['market_id']}" class="link">{html.escape(m.get('title', '')[:50])}</a>
+                    <a href="?page=market&id={m['market_id']}" class="link">{m['title_html']}</a>
                 </div>
                 <div class="confidence {conf_class}">{conf:.0%}</div>
                 <a href="{m.get('url', '#')}" target="_blank" class="link">↗</a>
             </div>
-            """
+            """)
+        items_html = "".join(items_parts)
         
-        ladders_html += f"""
+        ladders_parts.append(f"""
         <div class="card">
             <h2><a href="?page=underlier&u={underlier}" class="link">{underlier}</a></h2>
             <p style="color:#888;margin-bottom:10px;">{len(markets)} markets in ladder</p>
             <div class="ladder">{items_html}</div>
         </div>
-        """
+        """)
+    ladders_html = "".join(ladders_parts)
     
     return f"""
     <div class="container">
@@ -588,11 +715,11 @@ def render_constraints(explorer: RulesExplorer) -> str:
     # Group constraints by type
     constraint_types = constraints["constraint_type"].unique().to_list() if "constraint_type" in constraints.columns else []
     
-    content_html = ""
+    content_parts = []
     for ctype in constraint_types:
         type_constraints = constraints.filter(pl.col("constraint_type") == ctype)
         
-        items_html = ""
+        items_parts = []
         for row in type_constraints.head(50).iter_rows(named=True):
             a_id = row.get("a_market_id", "")
             b_id = row.get("b_market_id", "")
@@ -601,7 +728,7 @@ def render_constraints(explorer: RulesExplorer) -> str:
             a_title = a_rule.get("title", a_id[:30] + "...")[:40]
             b_title = b_rule.get("title", b_id[:30] + "...")[:40]
             
-            items_html += f"""
+            items_parts.append(f"""
             <div class="constraint-viz">
                 <div class="market">
                     <a href="?page=market&id={a_id}" class="link">{html.escape(a_title)}</a>
@@ -611,15 +738,17 @@ def render_constraints(explorer: RulesExplorer) -> str:
                     <a href="?page=market&id={b_id}" class="link">{html.escape(b_title)}</a>
                 </div>
             </div>
-            """
+            """)
+        items_html = "".join(items_parts)
         
-        content_html += f"""
+        content_parts.append(f"""
         <div class="card">
             <h2>{ctype}</h2>
             <p style="color:#888;margin-bottom:15px;">{len(type_constraints)} constraints</p>
             {items_html}
         </div>
-        """
+        """)
+    content_html = "".join(content_parts)
     
     return f"""
     <div class="container">
@@ -646,7 +775,7 @@ def render_violations(explorer: RulesExplorer) -> str:
         </div>
         """
     
-    rows_html = ""
+    rows_parts = []
     for row in violations.iter_rows(named=True):
         a_id = row.get("a_market_id", "")
         b_id = row.get("b_market_id", "")
@@ -659,7 +788,7 @@ def render_violations(explorer: RulesExplorer) -> str:
         # Color code by severity
         severity_class = "badge-red" if magnitude > 0.1 else "badge-yellow" if magnitude > 0.05 else "badge-blue"
         
-        rows_html += f"""
+        rows_parts.append(f"""
         <tr>
             <td><span class="badge {severity_class}">{magnitude:.4f}</span></td>
             <td><a href="?page=market&id={a_id}" class="link">{html.escape(a_title)}</a></td>
@@ -669,7 +798,8 @@ def render_violations(explorer: RulesExplorer) -> str:
             <td>{row.get('b_prob', 0):.2%}</td>
             <td>{row.get('constraint_type', '')}</td>
         </tr>
-        """
+        """)
+    rows_html = "".join(rows_parts)
     
     return f"""
     <div class="container">
@@ -719,9 +849,9 @@ def render_review(explorer: RulesExplorer) -> str:
             by_reason[reason] = []
         by_reason[reason].append(item)
     
-    content_html = ""
+    content_parts = []
     for reason, items in sorted(by_reason.items(), key=lambda x: -len(x[1])):
-        rows_html = ""
+        rows_parts = []
         for item in items[:30]:  # Limit per reason
             market_id = item.get("market_id", "")
             rule = rules.get(market_id, {})
@@ -729,16 +859,17 @@ def render_review(explorer: RulesExplorer) -> str:
             conf = item.get("confidence", 0)
             conf_class = "badge-red" if conf < 0.3 else "badge-yellow"
             
-            rows_html += f"""
+            rows_parts.append(f"""
             <tr>
                 <td><a href="?page=market&id={market_id}" class="link">{html.escape(title[:50])}</a></td>
                 <td><span class="badge {conf_class}">{conf:.0%}</span></td>
                 <td style="max-width:300px;word-wrap:break-word;font-size:11px;color:#888;">{html.escape(item.get('parse_notes', '')[:100])}</td>
                 <td><a href="{rule.get('url', '#')}" target="_blank" class="link">↗</a></td>
             </tr>
-            """
+            """)
+        rows_html = "".join(rows_parts)
         
-        content_html += f"""
+        content_parts.append(f"""
         <div class="card">
             <h2>{html.escape(reason)}</h2>
             <p style="color:#888;margin-bottom:15px;">{len(items)} markets</p>
@@ -747,7 +878,8 @@ def render_review(explorer: RulesExplorer) -> str:
                 <tbody>{rows_html}</tbody>
             </table>
         </div>
-        """
+        """)
+    content_html = "".join(content_parts)
     
     return f"""
     <div class="container">
@@ -763,7 +895,10 @@ def render_review(explorer: RulesExplorer) -> str:
     """
 
 
-def generate_html(explorer: RulesExplorer, page: str, params: dict) -> str:
+def generate_html(explorer: RulesExplorer, page: str, params: dict) -> Iterator[str]:
+    """Yield the page in pieces, so the head goes out before the content is rendered."""
+    yield page_head(explorer.venue, explorer.date)
+    
     # Count items for badges
     violations = explorer.load_violations()
     review_items = explorer.load_review_queue()
@@ -778,19 +913,11 @@ def generate_html(explorer: RulesExplorer, page: str, params: dict) -> str:
         ("review", f"👀 Review ({review_count})", "?page=review"),
     ]
     
-    nav_html = ""
-    for key, label, href in nav_items:
-        active = "active" if page == key else ""
-        nav_html += f'<a href="{href}" class="{active}">{label}</a>'
-    
-    # Add search form
-    nav_html += """
-    <form action="" method="get" style="margin-left:auto;display:flex;gap:5px;">
-        <input type="hidden" name="page" value="search">
-        <input type="text" name="q" placeholder="Search markets..." 
-               style="padding:8px 12px;border-radius:5px;border:1px solid #333;background:#0f3460;color:#fff;">
-        <button type="submit" style="padding:8px 15px;border-radius:5px;border:none;background:#00d4ff;color:#000;cursor:pointer;">Search</button>
-    </form>
+    nav_html = "".join(
+        f'<a href="{href}" class="{"active" if page == key else ""}">{label}</a>'
+        for key, label, href in nav_items
+    ) + NAV_SEARCH_FORM
+    yield f"""<div class="nav">{nav_html}</div>
     """
     
     # Render page content
@@ -811,20 +938,8 @@ def generate_html(explorer: RulesExplorer, page: str, params: dict) -> str:
     else:
         content = render_home(explorer)
     
-    return f"""<!DOCTYPE html>
-<html>
-<head>
-    <title>Rules Explorer - {explorer.venue} - {explorer.date}</title>
-    <meta charset="utf-8">
-    {css_styles()}
-</head>
-<body>
-    <div class="header">
-        <h1>🔍 Rules Explorer</h1>
-        <div class="meta">Venue: {explorer.venue} | Date: {explorer.date} | Interactive browser for arbitrage detection</div>
-    </div>
-    <div class="nav">{nav_html}</div>
-    {content}
+    yield content
+    yield """
 </body>
 </html>"""
 
@@ -837,10 +952,29 @@ class RequestHandler(BaseHTTPRequestHandler):
         params = parse_qs(parsed.query)
         page = params.get("page", ["home"])[0]
         
+        self.send_chunks(generate_html(self.explorer, page, params), "text/html")
+
+    def send_chunks(self, chunks: Iterable[str], content_type: str) -> None:
+        """Write each chunk as soon as it is produced; closing the connection ends the body."""
+        # Gzip stream (wbits | 16), flushed per chunk so nothing waits in the compressor
+        compressor = None
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            compressor = zlib.compressobj(5, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
         self.send_response(200)
-        self.send_header("Content-type", "text/html")
+        self.send_header("Content-type", content_type)
+        self.send_header("Vary", "Accept-Encoding")
+        if compressor is not None:
+            self.send_header("Content-Encoding", "gzip")
         self.end_headers()
-        self.wfile.write(generate_html(self.explorer, page, params).encode())
+
+        for chunk in chunks:
+            data = chunk.encode()
+            if compressor is not None:
+                data = compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            self.wfile.write(data)
+        if compressor is not None:
+            self.wfile.write(compressor.flush())
 
     def log_message(self, format, *args):
         pass
@@ -857,7 +991,7 @@ def main():
     explorer = RulesExplorer(args.venue, args.date, args.data_dir)
     RequestHandler.explorer = explorer
 
-    server = HTTPServer(("0.0.0.0", args.port), RequestHandler)
+    server = ThreadingHTTPServer(("0.0.0.0", args.port), RequestHandler)
     print(f"🔍 Rules Explorer running at http://localhost:{args.port}")
     print(f"   Venue: {args.venue}, Date: {args.date}")
     print("   Press Ctrl+C to stop")
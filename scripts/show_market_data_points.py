@@ -5,6 +5,17 @@ import polars as pl
 import json
 from pathlib import Path
 
+def count_rows_by_market(parquet_files) -> pl.DataFrame:
+    """Rows per market_id over the files, most first; only market_id is decoded"""
+    return (
+        pl.scan_parquet(parquet_files, hive_partitioning=False)
+        .select('market_id')
+        .group_by(['market_id'])
+        .agg([pl.len().alias('n_rows')])
+        .sort('n_rows', descending=True)
+        .collect(engine="streaming")
+    )
+
 def show_market_data_points(venue: str, date: str):
     """Show market data points summary by reading all parquet files for the date"""
     # Find all parquet files for the date
@@ -15,11 +26,7 @@ def show_market_data_points(venue: str, date: str):
         sys.exit(1)
     
     # Collect all parquet file paths
-    parquet_files = []
-    for hour_dir in sorted(base_path.glob("hour=*")):
-        if hour_dir.is_dir():
-            for parquet_file in hour_dir.glob("*.parquet"):
-                parquet_files.append(parquet_file)
+    parquet_files = sorted(base_path.glob("hour=*/*.parquet"))
     
     if not parquet_files:
         print(f"Error: No parquet files found for {venue} on {date}")
@@ -27,27 +34,28 @@ def show_market_data_points(venue: str, date: str):
     
     print(f"Reading {len(parquet_files)} parquet files...")
     
-    # Read all parquet files and concatenate
-    dfs = []
-    for parquet_file in parquet_files:
+    # Group by market_id only (aggregate across all outcomes) - no translation first
+    try:
+        summary = count_rows_by_market(parquet_files)
+    except Exception:
+        # One corrupt or half-written file fails the whole scan; skip the
+        # unreadable files and count the rest
+        readable = []
+        for parquet_file in parquet_files:
+            try:
+                pl.scan_parquet(parquet_file).select('market_id').collect()
+            except Exception as e:
+                print(f"Warning: Failed to read {parquet_file}: {e}", file=sys.stderr)
+                continue
+            readable.append(parquet_file)
+        if not readable:
+            print("Error: No valid parquet files could be read")
+            sys.exit(1)
         try:
-            df = pl.read_parquet(parquet_file)
-            dfs.append(df)
+            summary = count_rows_by_market(readable)
         except Exception as e:
-            print(f"Warning: Failed to read {parquet_file}: {e}", file=sys.stderr)
-            continue
-    
-    if not dfs:
-        print("Error: No valid parquet files could be read")
-        sys.exit(1)
-    
-    # Concatenate all dataframes
-    df_all = pl.concat(dfs)
-    
-    # Group by market_id only (aggregate across all outcomes) - no translation first
-    summary = df_all.group_by(['market_id']).agg([
-        pl.len().alias('n_rows')
-    ]).sort('n_rows', descending=True)
+            print(f"Error: Failed to read parquet files: {e}")
+            sys.exit(1)
     
     # Load market titles from universe file for display
     universe_path = Path(f'data/metadata/venue={venue}/date={date}/universe.jsonl')
@@ -63,12 +71,15 @@ def show_market_data_points(venue: str, date: str):
     
     # Add market titles for display (but keep market_id for grouping)
     if market_info:
-        summary = summary.with_columns([
-            pl.col('market_id').map_elements(
-                lambda x: market_info.get(x, f'Market {x[:20]}...'),
-                return_dtype=pl.Utf8
-            ).alias('market_title')
+        titles = pl.DataFrame([
+            pl.Series('market_id', list(market_info.keys()), dtype=pl.Utf8, strict=False),
+            pl.Series('market_title', list(market_info.values()), dtype=pl.Utf8, strict=False),
         ])
+        summary = summary.join(titles, on='market_id', how='left', maintain_order='left').with_columns(
+            pl.col('market_title').fill_null(
+                pl.lit('Market ') + pl.col('market_id').str.slice(0, 20) + pl.lit('...')
+            )
+        )
         result = summary.select(['market_id', 'market_title', 'n_rows'])
     else:
         result = summary.select(['market_id', 'n_rows'])
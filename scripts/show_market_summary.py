@@ -6,21 +6,20 @@ import json
 from pathlib import Path
 from collections import defaultdict
 
+from snapshot_cache import combined_snapshots
+
 def show_market_summary(venue: str, date: str):
     """Show market summary by reading all parquet files for the date"""
     # Find all parquet files for the date
-    base_path = Path(f'data/orderbook_snapshots/venue={venue}/date={date}')
+    data_dir = Path('data')
+    base_path = data_dir / 'orderbook_snapshots' / f'venue={venue}' / f'date={date}'
     
     if not base_path.exists():
         print(f"Error: No data directory found at {base_path}")
         sys.exit(1)
     
     # Collect all parquet file paths
-    parquet_files = []
-    for hour_dir in sorted(base_path.glob("hour=*")):
-        if hour_dir.is_dir():
-            for parquet_file in hour_dir.glob("*.parquet"):
-                parquet_files.append(parquet_file)
+    parquet_files = sorted(base_path.glob("hour=*/*.parquet"))
     
     if not parquet_files:
         print(f"Error: No parquet files found for {venue} on {date}")
@@ -28,29 +27,19 @@ def show_market_summary(venue: str, date: str):
     
     print(f"Reading {len(parquet_files)} parquet files...")
     
-    # Read all parquet files and concatenate
-    dfs = []
-    for parquet_file in parquet_files:
-        try:
-            df = pl.read_parquet(parquet_file)
-            dfs.append(df)
-        except Exception as e:
-            print(f"Warning: Failed to read {parquet_file}: {e}", file=sys.stderr)
-            continue
+    # Scan all hour partitions lazily; only the grouping columns are decoded
+    lf = combined_snapshots(data_dir, venue, date, parquet_files).select(['market_id', 'outcome_id'])
     
-    if not dfs:
-        print("Error: No valid parquet files could be read")
+    # Group by market_id and outcome_id, count rows
+    try:
+        summary = lf.group_by(['market_id', 'outcome_id']).agg([
+            pl.len().alias('row_count')
+        ]).sort('row_count', descending=True).collect(engine="streaming")
+    except Exception as e:
+        print(f"Error: Failed to read parquet files: {e}")
         sys.exit(1)
     
-    # Concatenate all dataframes
-    df_all = pl.concat(dfs)
-    
-    print(f"Total rows across all files: {len(df_all)}")
-    
-    # Group by market_id and outcome_id, count rows
-    summary = df_all.group_by(['market_id', 'outcome_id']).agg([
-        pl.len().alias('row_count')
-    ]).sort('row_count', descending=True)
+    print(f"Total rows across all files: {summary['row_count'].sum()}")
     
     # Try to load market titles from universe file
     universe_path = Path(f'data/metadata/venue={venue}/date={date}/universe.jsonl')
@@ -66,12 +55,15 @@ def show_market_summary(venue: str, date: str):
     
     # Add market titles if available
     if market_info:
-        summary = summary.with_columns([
-            pl.col('market_id').map_elements(
-                lambda x: market_info.get(x, f'Market {x[:20]}...'),
-                return_dtype=pl.Utf8
-            ).alias('market_title')
+        titles = pl.DataFrame([
+            pl.Series('market_id', list(market_info.keys()), dtype=pl.Utf8, strict=False),
+            pl.Series('market_title', list(market_info.values()), dtype=pl.Utf8, strict=False),
         ])
+        summary = summary.join(titles, on='market_id', how='left', maintain_order='left').with_columns(
+            pl.col('market_title').fill_null(
+                pl.lit('Market ') + pl.col('market_id').str.slice(0, 20) + pl.lit('...')
+            )
+        )
         # Reorder columns
         summary = summary.select(['market_title', 'market_id', 'outcome_id', 'row_count'])
     else:
@@ -83,23 +75,24 @@ def show_market_summary(venue: str, date: str):
     print("=" * 120)
     print()
     
-    if 'market_title' in summary.columns:
+    label = 'market_title' if 'market_title' in summary.columns else 'market_id'
+    if label == 'market_title':
         print(f"{'Market Title':<80} {'Outcome':<10} {'Row Count':<12}")
     else:
         print(f"{'Market ID':<80} {'Outcome':<10} {'Row Count':<12}")
     print("-" * 120)
     
-    for row in summary.iter_rows(named=True):
-        if 'market_title' in row:
-            title = row['market_title']
-            if len(title) > 78:
-                title = title[:75] + "..."
-            print(f"{title:<80} {row['outcome_id']:<10} {row['row_count']:<12}")
-        else:
-            market_id = row['market_id']
-            if len(market_id) > 78:
-                market_id = market_id[:75] + "..."
-            print(f"{market_id:<80} {row['outcome_id']:<10} {row['row_count']:<12}")
+    # Format every line in polars and print them in one go
+    lines = summary.select(pl.concat_str([
+        pl.when(pl.col(label).str.len_chars() > 78)
+        .then(pl.col(label).str.slice(0, 75) + '...')
+        .otherwise(pl.col(label))
+        .str.pad_end(80),
+        pl.col('outcome_id').cast(pl.Utf8).str.pad_end(10),
+        pl.col('row_count').cast(pl.Utf8).str.pad_end(12),
+    ], separator=' ')).to_series()
+    if len(lines):
+        print('\n'.join(lines))
     
     print("-" * 120)
     print(f"{'TOTAL':<80} {'':<10} {summary['row_count'].sum():<12}")
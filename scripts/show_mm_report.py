@@ -1,20 +1,42 @@
 #!/usr/bin/env python3
-"""Display MM viability report from parquet file"""
+"""Display MM viability report from parquet file
+
+Shows the first PREVIEW_ROWS rows; pass --full to read the whole file.
+"""
 import sys
 from pathlib import Path
 
+PREVIEW_ROWS = 50
+
+path = sys.argv[1]
+full = '--full' in sys.argv[2:]
+
 try:
     import polars as pl
-    df = pl.read_parquet(sys.argv[1])
-    print(df)
+    lf = pl.scan_parquet(path)
+    if full:
+        with pl.Config(tbl_rows=-1):
+            print(lf.collect(engine="streaming"))
+    else:
+        # Only the leading rows are decoded; the row count comes from the footer
+        total = lf.select(pl.len()).collect().item()
+        with pl.Config(tbl_rows=PREVIEW_ROWS):
+            print(lf.head(PREVIEW_ROWS).collect())
+        if total > PREVIEW_ROWS:
+            print(f"Showing first {PREVIEW_ROWS} of {total} rows (--full for all)")
 except ImportError:
     try:
         import pandas as pd
-        df = pd.read_parquet(sys.argv[1])
+        df = pd.read_parquet(path)
+        total = len(df)
+        if not full:
+            df = df.head(PREVIEW_ROWS)
         pd.set_option('display.max_columns', None)
         pd.set_option('display.width', None)
         pd.set_option('display.max_colwidth', 80)
         print(df.to_string())
+        if len(df) < total:
+            print(f"Showing first {PREVIEW_ROWS} of {total} rows (--full for all)")
     except ImportError:
         print("Error: Need polars or pandas installed")
         print("Install with: pip install polars pyarrow")
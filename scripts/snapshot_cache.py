@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Combined per-day orderbook snapshot files, shared by the report scripts.
+
+Once a day is over its hour=*/ snapshot files are written once to
+data/_cache/orderbook_snapshots/venue=*/date=*/combined.parquet, and later
+scans read that single file instead of every hour file.
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+
+import polars as pl
+
+# Parquet metadata key holding the source-file signature of a combined snapshot file
+COMBINED_KEY = "source_signature"
+
+
+def combined_snapshots(data_dir: Path, venue: str, date: str, parquet_files: List[Path]) -> pl.LazyFrame:
+    """Scan a day's snapshot files, through one combined parquet file once the day is over.
+
+    The combined file is rewritten whenever a source file is added, removed
+    or changed.
+    """
+    lf = pl.scan_parquet(parquet_files, hive_partitioning=False, missing_columns="insert", extra_columns="ignore")
+    # Today's files are still being written; combining them would go stale at once
+    if date >= datetime.now(timezone.utc).strftime("%Y-%m-%d"):
+        return lf
+
+    cache_path = data_dir / "_cache" / "orderbook_snapshots" / f"venue={venue}" / f"date={date}" / "combined.parquet"
+    tmp_path = None
+    try:
+        stats = sorted((str(p.relative_to(data_dir)), st.st_mtime_ns, st.st_size) for p in parquet_files for st in [p.stat()])
+        signature = hashlib.sha1(repr(stats).encode()).hexdigest()
+        if cache_path.exists() and pl.read_parquet_metadata(cache_path).get(COMBINED_KEY) == signature:
+            return pl.scan_parquet(cache_path)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Unique temp name, so concurrent reports for the same day don't collide
+        with tempfile.NamedTemporaryFile(dir=cache_path.parent, prefix=cache_path.name + ".", suffix=".tmp", delete=False) as tmp:
+            tmp_path = Path(tmp.name)
+        lf.sink_parquet(tmp_path, compression="zstd", row_group_size=128_000, statistics=True, metadata={COMBINED_KEY: signature})
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        print(f"Warning: Not using combined snapshot file {cache_path}: {e}", file=sys.stderr)
+        if tmp_path is not None:
+            tmp_path.unlink(missing_ok=True)
+        return lf
+    return pl.scan_parquet(cache_path)
@@ -15,9 +15,10 @@ Dynamic info (from orderbook snapshots/stats):
 import argparse
 import json
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Tuple
 
 try:
     import polars as pl
@@ -25,52 +26,70 @@ except ImportError:
     print("ERROR: polars not installed. Install with: pip install polars")
     sys.exit(1)
 
+from snapshot_cache import combined_snapshots
 
-def load_universe(data_dir: Path, venue: str, date: str) -> Dict[str, dict]:
-    """Load universe and index by market_id."""
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+# Snapshot column -> report field, for the columns the latest-snapshot loader keeps
+SNAPSHOT_FIELDS = (
+    ("mid", "mid_price"),
+    ("spread", "spread"),
+    ("best_bid_sz", "bid_depth"),
+    ("best_ask_sz", "ask_depth"),
+    ("best_bid_px", "best_bid"),
+    ("best_ask_px", "best_ask"),
+)
+
+# Fields the report reads from each source
+PROPOSITION_FIELDS = ("underlier", "strike_level", "comparator", "proposition_kind", "confidence")
+SNAPSHOT_REPORT_FIELDS = ("last_ts", "update_count") + tuple(alias for _, alias in SNAPSHOT_FIELDS)
+MM_FIELDS = ("avg_spread", "toxicity_30s")
+
+# Fields read from the JSONL metadata; anything else in a record is ignored.
+# close_ts is read as a float so that values written as 1.7e12 still parse.
+UNIVERSE_SCHEMA = {
+    "market_id": pl.Utf8,
+    "title": pl.Utf8,
+    "close_ts": pl.Float64,
+    "status": pl.Utf8,
+    "token_ids": pl.List(pl.Utf8),
+    "outcome_ids": pl.List(pl.Utf8),
+}
+RULES_SCHEMA = {"market_id": pl.Utf8, "raw_rules_text": pl.Utf8, "url": pl.Utf8}
+
+# Millisecond timestamps of 0001-01-01 and the end of 9999, the range datetime can format
+MIN_TS_MS = -62_135_596_800_000
+MAX_TS_MS = 253_402_300_799_999
+
+
+def load_universe(data_dir: Path, venue: str, date: str) -> pl.DataFrame:
+    """Load universe, one row per market_id (the last one wins)."""
     path = data_dir / "metadata" / f"venue={venue}" / f"date={date}" / "universe.jsonl"
-    markets = {}
-    if path.exists():
-        for line in path.read_text().splitlines():
-            if line.strip():
-                try:
-                    m = json.loads(line)
-                    markets[m.get("market_id", "")] = m
-                except json.JSONDecodeError:
-                    pass
-    return markets
-
-
-def load_rules(data_dir: Path, venue: str, date: str) -> Dict[str, dict]:
-    """Load rules and index by market_id."""
+    return read_jsonl(path, UNIVERSE_SCHEMA)
+
+
+def load_rules(data_dir: Path, venue: str, date: str) -> pl.DataFrame:
+    """Load rules, one row per market_id (the last one wins)."""
     path = data_dir / "rules" / f"venue={venue}" / f"date={date}" / "rules.jsonl"
-    rules = {}
-    if path.exists():
-        for line in path.read_text().splitlines():
-            if line.strip():
-                try:
-                    r = json.loads(line)
-                    rules[r.get("market_id", "")] = r
-                except json.JSONDecodeError:
-                    pass
-    return rules
-
-
-def load_propositions(data_dir: Path, venue: str, date: str) -> Dict[str, dict]:
-    """Load propositions and index by market_id."""
+    return read_jsonl(path, RULES_SCHEMA)
+
+
+def load_propositions(data_dir: Path, venue: str, date: str) -> pl.LazyFrame:
+    """Load propositions, one row per market_id (the last one wins)."""
     path = data_dir / "logic" / f"venue={venue}" / f"date={date}" / "propositions.parquet"
-    props = {}
-    if path.exists():
-        df = pl.read_parquet(path)
-        for row in df.iter_rows(named=True):
-            props[row.get("market_id", "")] = row
-    return props
+    if not path.exists():
+        return empty_frame(["market_id"], PROPOSITION_FIELDS)
+    lf = select_fields(pl.scan_parquet(path), ["market_id"], PROPOSITION_FIELDS)
+    return lf.unique("market_id", keep="last", maintain_order=True)
 
 
-def load_latest_snapshots(data_dir: Path, venue: str, date: str) -> Dict[str, dict]:
-    """Load latest orderbook snapshot per token_id."""
+def load_latest_snapshots(data_dir: Path, venue: str, date: str) -> pl.LazyFrame:
+    """Load latest orderbook snapshot per (market_id, outcome_id)."""
     snapshot_dir = data_dir / "orderbook_snapshots" / f"venue={venue}" / f"date={date}"
-    snapshots = {}
+    snapshots = empty_frame(["market_id", "outcome_id"], SNAPSHOT_REPORT_FIELDS)
     
     if not snapshot_dir.exists():
         return snapshots
@@ -80,170 +99,241 @@ def load_latest_snapshots(data_dir: Path, venue: str, date: str) -> Dict[str, di
     if not parquet_files:
         return snapshots
     
-    for pf in parquet_files:
-        try:
-            df = pl.read_parquet(pf)
-            if df.is_empty():
-                continue
-            
-            # Get latest snapshot per token (use actual column names)
-            agg_cols = [
-                pl.col("ts_recv").max().alias("last_ts"),
-                pl.len().alias("update_count"),
-            ]
-            
-            # Add columns that exist
-            if "mid" in df.columns:
-                agg_cols.append(pl.col("mid").last().alias("mid_price"))
-            if "spread" in df.columns:
-                agg_cols.append(pl.col("spread").last().alias("spread"))
-            if "best_bid_sz" in df.columns:
-                agg_cols.append(pl.col("best_bid_sz").last().alias("bid_depth"))
-            if "best_ask_sz" in df.columns:
-                agg_cols.append(pl.col("best_ask_sz").last().alias("ask_depth"))
-            if "best_bid_px" in df.columns:
-                agg_cols.append(pl.col("best_bid_px").last().alias("best_bid"))
-            if "best_ask_px" in df.columns:
-                agg_cols.append(pl.col("best_ask_px").last().alias("best_ask"))
-            
-            latest = df.group_by(["market_id", "outcome_id"]).agg(agg_cols)
-            
-            for row in latest.iter_rows(named=True):
-                key = f"{row['market_id']}_{row['outcome_id']}"
-                if key not in snapshots or row['last_ts'] > snapshots[key].get('last_ts', 0):
-                    snapshots[key] = row
-        except Exception as e:
-            print(f"Warning: Failed to read {pf}: {e}", file=sys.stderr)
+    # One lazy scan over every file; each value is taken from the token's
+    # row with the greatest ts_recv
+    lf = combined_snapshots(data_dir, venue, date, parquet_files)
+    try:
+        columns = lf.collect_schema().names()
+        latest = pl.col("ts_recv").arg_max()
+        agg_cols = [
+            pl.col("ts_recv").max().alias("last_ts"),
+            pl.len().alias("update_count"),
+        ]
+        # Add columns that exist
+        for column, alias in SNAPSHOT_FIELDS:
+            if column in columns:
+                agg_cols.append(pl.col(column).get(latest).alias(alias))
+        
+        # Collected here so a bad file is reported instead of failing the report;
+        # the result is one small row per token
+        latest_df = lf.group_by(["market_id", "outcome_id"]).agg(agg_cols).collect(engine="streaming")
+    except Exception as e:
+        print(f"Warning: Failed to read snapshots under {snapshot_dir}: {e}", file=sys.stderr)
+        return snapshots
     
-    return snapshots
+    return select_fields(latest_df.lazy(), ["market_id", "outcome_id"], SNAPSHOT_REPORT_FIELDS)
 
 
-def load_mm_viability(data_dir: Path, venue: str, date: str) -> Dict[str, dict]:
-    """Load MM viability stats if available."""
+def load_mm_viability(data_dir: Path, venue: str, date: str) -> pl.LazyFrame:
+    """Load MM viability stats if available, one row per (market_id, outcome_id)."""
     # Check for stats cache
     stats_path = data_dir / "stats" / f"venue={venue}" / f"date={date}" / "stats.parquet"
-    stats = {}
+    stats = empty_frame(["market_id", "outcome_id"], MM_FIELDS)
     
     if stats_path.exists():
         try:
-            df = pl.read_parquet(stats_path)
-            for row in df.iter_rows(named=True):
-                key = f"{row.get('market_id', '')}_{row.get('outcome_id', '')}"
-                stats[key] = row
+            lf = select_fields(pl.scan_parquet(stats_path), ["market_id", "outcome_id"], MM_FIELDS)
+            stats = lf.unique(["market_id", "outcome_id"], keep="last", maintain_order=True)
         except Exception:
             pass
     
     return stats
 
 
-def format_ts(ts_ms: Optional[int]) -> str:
-    """Format timestamp in milliseconds to readable string."""
-    if ts_ms is None or ts_ms == 0:
-        return ""
-    try:
-        dt = datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc)
-        return dt.strftime("%Y-%m-%d %H:%M")
-    except Exception:
-        return ""
+def read_jsonl(path: Path, schema: Dict[str, pl.DataType]) -> pl.DataFrame:
+    """Read the schema's fields from a JSONL file, one row per market_id (the last one wins)."""
+    if not path.exists():
+        df = pl.DataFrame(schema=schema)
+    else:
+        try:
+            df = pl.read_ndjson(path, schema=schema, ignore_errors=True)
+        except pl.exceptions.PolarsError:
+            # The native reader gives up on a malformed line; skip those instead
+            records = []
+            for line in path.read_bytes().splitlines():
+                if line.strip():
+                    try:
+                        record = json_loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(record, dict):
+                        records.append(record)
+            df = pl.DataFrame([
+                pl.Series(name, [r.get(name) for r in records], dtype=dtype, strict=False)
+                for name, dtype in schema.items()
+            ])
+    return (
+        df.with_columns(pl.col("market_id").fill_null(""))
+        .group_by("market_id", maintain_order=True)
+        .agg(pl.all().last())
+        .with_columns(pl.col(name).cast(pl.Int64, strict=False) for name, dtype in schema.items() if dtype == pl.Float64)
+    )
+
 
+def select_fields(lf: pl.LazyFrame, keys: List[str], fields: Tuple[str, ...]) -> pl.LazyFrame:
+    """Keys as strings ("" if absent) plus fields (null if absent), nothing else."""
+    names = lf.collect_schema().names()
+    return lf.select(
+        [pl.col(k).cast(pl.Utf8) if k in names else pl.lit("").alias(k) for k in keys]
+        + [pl.col(f) if f in names else pl.lit(None).alias(f) for f in fields]
+    )
 
-def truncate(s: str, max_len: int = 60) -> str:
-    """Truncate string to max length."""
-    if not s:
-        return ""
-    s = s.replace("\n", " ").replace("\r", " ")
-    if len(s) > max_len:
-        return s[:max_len-3] + "..."
-    return s
+
+def empty_frame(keys: List[str], fields: Tuple[str, ...]) -> pl.LazyFrame:
+    return pl.LazyFrame(schema={**{k: pl.Utf8 for k in keys}, **{f: pl.Null for f in fields}})
+
+
+def format_ts(column: str) -> pl.Expr:
+    """Timestamp column in milliseconds as a readable UTC string ("" when null, zero or out of range)."""
+    ts = pl.col(column).cast(pl.Int64, strict=False)
+    return (
+        pl.when(ts.is_between(MIN_TS_MS, MAX_TS_MS) & (ts != 0))
+        .then(pl.from_epoch(ts, time_unit="ms").dt.strftime("%Y-%m-%d %H:%M"))
+        .otherwise(pl.lit(""))
+        .alias(column)
+    )
+
+
+def truncate(column: str, max_len: int = 60) -> pl.Expr:
+    """Column as a single line, truncated to max length ("" when null)."""
+    s = pl.col(column).cast(pl.Utf8).fill_null("").str.replace_all("[\n\r]", " ")
+    return pl.when(s.str.len_chars() > max_len).then(s.str.slice(0, max_len - 3) + "...").otherwise(s)
+
+
+def fixed(column: str, digits: int) -> pl.Expr:
+    """Column to `digits` places, ties half to even, or "" when null or zero.
+
+    Not identical to f"{value:.{digits}f}": the Decimal cast rounds the
+    shortest decimal form of the float, not its exact binary value, so
+    2.675 gives "2.68" (Python "2.67") and 0.005 gives "0.00" (Python
+    "0.01"). A negative value that rounds to zero loses its sign.
+    """
+    x = pl.col(column).cast(pl.Float64)
+    return (
+        pl.when(x.is_null() | (x == 0)).then(pl.lit(""))
+        .when(x.is_nan()).then(pl.lit("nan"))
+        .when(x.is_infinite()).then(pl.when(x > 0).then(pl.lit("inf")).otherwise(pl.lit("-inf")))
+        .otherwise(x.cast(pl.Decimal(38, digits), strict=False).cast(pl.Utf8))
+        .alias(column)
+    )
 
 
 def generate_report(data_dir: Path, venue: str, date: str, output_format: str = "csv") -> None:
     """Generate unified report."""
     print(f"Loading data for {venue}/{date}...", file=sys.stderr)
     
-    universe = load_universe(data_dir, venue, date)
-    rules = load_rules(data_dir, venue, date)
-    propositions = load_propositions(data_dir, venue, date)
-    snapshots = load_latest_snapshots(data_dir, venue, date)
-    mm_stats = load_mm_viability(data_dir, venue, date)
+    # The loaders are independent; the JSONL reads and the snapshot
+    # aggregation run in polars without holding the GIL, so they overlap
+    loaders = (load_universe, load_rules, load_propositions, load_latest_snapshots, load_mm_viability)
+    with ThreadPoolExecutor(max_workers=len(loaders)) as pool:
+        futures = [pool.submit(load, data_dir, venue, date) for load in loaders]
+        universe, rules, propositions, snapshots, mm_stats = [f.result() for f in futures]
     
-    print(f"  Universe: {len(universe)} markets", file=sys.stderr)
-    print(f"  Rules: {len(rules)} markets", file=sys.stderr)
-    print(f"  Propositions: {len(propositions)} markets", file=sys.stderr)
-    print(f"  Snapshots: {len(snapshots)} tokens", file=sys.stderr)
-    print(f"  MM Stats: {len(mm_stats)} tokens", file=sys.stderr)
+    # One row per token (primary source), with the static fields as they are printed.
+    # Without token_ids the outcome_ids are the tokens, and without either a
+    # market gets tokens "0" and "1"; outcome_id falls back to the token's index.
+    outcome_ids = pl.col("outcome_ids").fill_null(pl.lit([], dtype=pl.List(pl.Utf8)))
+    tokens = (
+        universe.lazy()
+        .with_columns(
+            pl.when(pl.col("token_ids").list.len() > 0).then(pl.col("token_ids"))
+            .when(outcome_ids.list.len() > 0).then(outcome_ids)
+            .otherwise(pl.lit(["0", "1"], dtype=pl.List(pl.Utf8)))
+            .alias("token_id"),
+            outcome_ids.alias("outcome_ids"),
+        )
+        .with_columns(pl.int_ranges(pl.col("token_id").list.len()).alias("i"))
+        .explode(["token_id", "i"])
+        .select(
+            "market_id",
+            pl.col("token_id").fill_null(""),
+            pl.col("outcome_ids").list.get(pl.col("i"), null_on_oob=True)
+            .fill_null(pl.col("i").cast(pl.Utf8)).alias("outcome_id"),
+            pl.col("title").fill_null(""),
+            "close_ts",
+            pl.col("status").fill_null(""),
+        )
+    )
     
-    # Build unified records
-    rows = []
+    # Join everything lazily and run it as one query
+    report = (
+        tokens
+        .join(rules.lazy(), on="market_id", how="left", maintain_order="left")
+        .join(propositions, on="market_id", how="left", maintain_order="left")
+        .join(snapshots, on=["market_id", "outcome_id"], how="left", maintain_order="left")
+        .join(mm_stats, on=["market_id", "outcome_id"], how="left", maintain_order="left")
+    )
+    token_count, props_count, snap_count, mm_count = pl.collect_all([
+        tokens.select(pl.len()), propositions.select(pl.len()), snapshots.select(pl.len()), mm_stats.select(pl.len()),
+    ], engine="streaming")
     
-    # Iterate through universe (primary source)
-    for market_id, market in universe.items():
-        token_ids = market.get("token_ids", [])
-        outcome_ids = market.get("outcome_ids", [])
-        
-        # If no token_ids, use outcome_ids as tokens
-        if not token_ids:
-            token_ids = outcome_ids if outcome_ids else ["0", "1"]
-        
-        rule = rules.get(market_id, {})
-        prop = propositions.get(market_id, {})
-        
-        for i, token_id in enumerate(token_ids):
-            outcome_id = outcome_ids[i] if i < len(outcome_ids) else str(i)
-            snap_key = f"{market_id}_{outcome_id}"
-            
-            snap = snapshots.get(snap_key, {})
-            mm = mm_stats.get(snap_key, {})
-            
-            row = {
-                # Identifiers
-                "token_id": str(token_id) if token_id else "",
-                "market_id": (market_id[:20] + "...") if len(market_id) > 20 else market_id,
-                "outcome_id": str(outcome_id) if outcome_id else "",
-                
-                # Static info
-                "title": truncate(str(market.get("title", "")), 50),
-                "close_ts": format_ts(market.get("close_ts")),
-                "status": str(market.get("status", "")),
-                
-                # Rules info
-                "rules_text": truncate(str(rule.get("raw_rules_text", "")), 80),
-                "url": str(rule.get("url", "") or ""),
-                
-                # Proposition info
-                "underlier": str(prop.get("underlier", "") or ""),
-                "strike": str(prop.get("strike_level", "") or ""),
-                "comparator": str(prop.get("comparator", "") or ""),
-                "prop_kind": str(prop.get("proposition_kind", "") or ""),
-                "confidence": f"{prop.get('confidence', 0):.2f}" if prop.get("confidence") else "",
-                
-                # Dynamic info (snapshots)
-                "mid_price": f"{snap.get('mid_price', 0):.4f}" if snap.get("mid_price") else "",
-                "spread": f"{snap.get('spread', 0):.4f}" if snap.get("spread") else "",
-                "bid_depth": f"{snap.get('bid_depth', 0):.2f}" if snap.get("bid_depth") else "",
-                "ask_depth": f"{snap.get('ask_depth', 0):.2f}" if snap.get("ask_depth") else "",
-                "updates": str(snap.get("update_count", "")),
-                "last_update": format_ts(snap.get("last_ts")),
-                
-                # MM viability metrics
-                "avg_spread": f"{mm.get('avg_spread', 0):.4f}" if mm.get("avg_spread") else "",
-                "toxicity": f"{mm.get('toxicity_30s', 0):.4f}" if mm.get("toxicity_30s") else "",
-            }
-            rows.append(row)
+    print(f"  Universe: {universe.height} markets", file=sys.stderr)
+    print(f"  Rules: {rules.height} markets", file=sys.stderr)
+    print(f"  Propositions: {props_count.item()} markets", file=sys.stderr)
+    print(f"  Snapshots: {snap_count.item()} tokens", file=sys.stderr)
+    print(f"  MM Stats: {mm_count.item()} tokens", file=sys.stderr)
     
-    if not rows:
+    # Every source is deduplicated on its join keys, so there is one report row per token
+    if token_count.item() == 0:
         print("No data found.", file=sys.stderr)
         return
     
-    # Create DataFrame and output
-    df = pl.DataFrame(rows)
+    def text(column: str) -> pl.Expr:
+        """A column as printed: its string value, "" when null."""
+        return pl.col(column).cast(pl.Utf8).fill_null("")
+    
+    # Format the report column by column on top of the joins
+    report = report.select(
+        # Identifiers
+        "token_id",
+        pl.when(pl.col("market_id").str.len_chars() > 20)
+        .then(pl.col("market_id").str.slice(0, 20) + "...")
+        .otherwise(pl.col("market_id")),
+        "outcome_id",
+        
+        # Static info
+        truncate("title", 50),
+        format_ts("close_ts"),
+        "status",
+        
+        # Rules info
+        truncate("raw_rules_text", 80).alias("rules_text"),
+        text("url"),
+        
+        # Proposition info
+        text("underlier"),
+        pl.when(pl.col("strike_level") == 0).then(pl.lit("")).otherwise(text("strike_level")).alias("strike"),
+        text("comparator"),
+        text("proposition_kind").alias("prop_kind"),
+        fixed("confidence", 2),
+        
+        # Dynamic info (snapshots)
+        fixed("mid_price", 4),
+        fixed("spread", 4),
+        fixed("bid_depth", 2),
+        fixed("ask_depth", 2),
+        text("update_count").alias("updates"),
+        format_ts("last_ts").alias("last_update"),
+        
+        # MM viability metrics
+        fixed("avg_spread", 4),
+        fixed("toxicity_30s", 4).alias("toxicity"),
+    )
     
     if output_format == "csv":
-        print(df.write_csv())
+        # Streamed to stdout in batches; the report is never held whole.
+        # Polars releases that cannot sink to a file object collect it instead.
+        sys.stdout.flush()
+        try:
+            report.sink_csv(sys.stdout.buffer)
+        except TypeError:
+            report.collect(engine="streaming").write_csv(sys.stdout)
     elif output_format == "json":
-        print(df.write_json(row_oriented=True))
+        # One JSON array of row objects
+        report.collect(engine="streaming").write_json(sys.stdout)
+        print()
     else:  # table
-        print(df)
+        print(report.collect(engine="streaming"))
 
 
 def main():
@@ -9,6 +9,9 @@ use tokio::sync::Mutex;
 use tokio::time::{interval, Duration};
 use tracing::{info, warn};
 
+/// Rows per Parquet row group in snapshot files
+const ROW_GROUP_SIZE: usize = 128 * 1024;
+
 pub struct ParquetWriter {
     config: Arc<Config>,
     buffer: Arc<Mutex<Vec<SnapshotRow>>>,
@@ -107,15 +110,29 @@ impl ParquetWriter {
         Ok(())
     }
 
+    /// Keep each token's rows contiguous and in time order, so row-group
+    /// statistics on market_id/ts_recv let readers skip most of a file.
+    /// The sort is stable: rows with equal ts_recv stay in arrival order.
+    fn sort_rows(rows: &mut [SnapshotRow]) {
+        rows.sort_by(|a, b| {
+            a.market_id
+                .cmp(&b.market_id)
+                .then_with(|| a.outcome_id.cmp(&b.outcome_id))
+                .then_with(|| a.ts_recv.cmp(&b.ts_recv))
+        });
+    }
+
     async fn write_parquet_file(
         config: &Config,
         bucket: &TimeBucket,
         venue: &str,
-        rows: Vec<SnapshotRow>,
+        mut rows: Vec<SnapshotRow>,
     ) -> Result<()> {
         if rows.is_empty() {
             return Ok(());
         }
+
+        Self::sort_rows(&mut rows);
         
         let (date_str, hour_str) = bucket.path_segments();
         let file_prefix = bucket.file_prefix();
@@ -185,11 +202,17 @@ impl ParquetWriter {
         // Write Parquet using Polars lazy API
         // Polars 0.40: use sink_parquet on LazyFrame
         let file_path = temp_file.clone();
+        // Field types follow the pinned polars 0.40: `statistics` is a bool there
+        // (0.41 replaced it with a StatisticsOptions struct), so revisit this
+        // when bumping polars.
+        let write_options = ParquetWriteOptions {
+            compression: ParquetCompression::Zstd(None),
+            statistics: true,
+            row_group_size: Some(ROW_GROUP_SIZE),
+            ..Default::default()
+        };
         df.lazy()
-            .sink_parquet(
-                file_path,
-                ParquetWriteOptions::default(),
-            )
+            .sink_parquet(file_path, write_options)
             .context("Failed to write Parquet file")?;
 
         // Atomic rename
@@ -293,4 +316,51 @@ mod tests {
         // Now file should exist
         assert!(expected_file.exists() || expected_file.parent().unwrap().exists());
     }
+
+    #[test]
+    fn test_sort_rows_orders_by_market_outcome_ts() {
+        let row = |ts: i64, market_id: &str, outcome_id: &str, seq: i64| {
+            SnapshotRow::new(
+                ts,
+                "polymarket".to_string(),
+                market_id.to_string(),
+                outcome_id.to_string(),
+                seq,
+                vec![0.5],
+                vec![100.0],
+                vec![0.51],
+                vec![150.0],
+                None,
+            )
+        };
+        let mut rows = vec![
+            row(300, "market_b", "yes", 0),
+            row(200, "market_a", "yes", 1),
+            row(100, "market_a", "yes", 2),
+            row(150, "market_b", "no", 3),
+            row(200, "market_a", "no", 4),
+            row(200, "market_a", "yes", 5),
+            row(100, "market_a", "no", 6),
+        ];
+
+        ParquetWriter::sort_rows(&mut rows);
+
+        let order: Vec<(&str, &str, i64, i64)> = rows
+            .iter()
+            .map(|r| (r.market_id.as_str(), r.outcome_id.as_str(), r.ts_recv, r.seq))
+            .collect();
+        assert_eq!(
+            order,
+            vec![
+                ("market_a", "no", 100, 6),
+                ("market_a", "no", 200, 4),
+                ("market_a", "yes", 100, 2),
+                // Equal ts_recv keeps arrival order
+                ("market_a", "yes", 200, 1),
+                ("market_a", "yes", 200, 5),
+                ("market_b", "no", 150, 3),
+                ("market_b", "yes", 300, 0),
+            ]
+        );
+    }
 }